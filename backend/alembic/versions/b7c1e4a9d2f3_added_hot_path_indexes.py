@@ -0,0 +1,57 @@
+"""added hot path indexes
+
+Revision ID: b7c1e4a9d2f3
+Revises: 9e47c0952f70
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c1e4a9d2f3'
+down_revision: Union[str, None] = '9e47c0952f70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_dsa_test_case_responses_task_id', 'dsa_test_case_responses', ['task_id']),
+    ('ix_interviews_job_status_created', 'interviews', ['ai_interviewed_job_id', 'status', 'created_at']),
+    ('ix_quiz_options_quiz_question_id', 'quiz_options', ['quiz_question_id']),
+    ('ix_interview_question_and_responses_interview_id', 'interview_question_and_responses', ['interview_id']),
+    ('ix_jobs_min_work_experience', 'jobs', ['min_work_experience']),
+    ('ix_jobs_max_work_experience', 'jobs', ['max_work_experience']),
+    ('ix_jobs_min_salary_per_month', 'jobs', ['min_salary_per_month']),
+    ('ix_jobs_max_salary_per_month', 'jobs', ['max_salary_per_month']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and keeps the
+    # hot tables writable while the indexes build.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,48 @@
+"""added rescore jobs
+
+Revision ID: b8d2f4a6c0e3
+Revises: a3c5e7f9b1d2
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d2f4a6c0e3'
+down_revision: Union[str, None] = 'a3c5e7f9b1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rescore_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('ai_interviewed_job_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), server_default='queued', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('processed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('failed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_interview_id', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('run_after', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['ai_interviewed_job_id'], ['ai_interviewed_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rescore_jobs_ai_interviewed_job_id'), 'rescore_jobs', ['ai_interviewed_job_id'], unique=False)
+    op.create_index('ix_rescore_jobs_status_run_after', 'rescore_jobs', ['status', 'run_after'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rescore_jobs_status_run_after', table_name='rescore_jobs')
+    op.drop_index(op.f('ix_rescore_jobs_ai_interviewed_job_id'), table_name='rescore_jobs')
+    op.drop_table('rescore_jobs')
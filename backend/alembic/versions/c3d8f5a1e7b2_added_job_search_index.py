@@ -0,0 +1,76 @@
+"""added job search index
+
+Revision ID: c3d8f5a1e7b2
+Revises: b7c1e4a9d2f3
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8f5a1e7b2'
+down_revision: Union[str, None] = 'b7c1e4a9d2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('jobs', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(job_title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(job_role, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(job_location, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(work_mode, '')), 'C')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.add_column('jobs', sa.Column(
+        'search_text',
+        sa.String(),
+        sa.Computed(
+            "coalesce(job_title, '') || ' ' || coalesce(job_role, '') || ' ' || "
+            "coalesce(job_location, '') || ' ' || coalesce(work_mode, '')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    # Commit the column additions so the indexes can build concurrently.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_jobs_search_vector',
+            'jobs',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_jobs_search_text_trgm',
+            'jobs',
+            ['search_text'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'search_text': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_jobs_search_text_trgm', table_name='jobs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_jobs_search_vector', table_name='jobs', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('jobs', 'search_text')
+    op.drop_column('jobs', 'search_vector')
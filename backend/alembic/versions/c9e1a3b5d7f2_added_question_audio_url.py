@@ -0,0 +1,30 @@
+"""added question audio url
+
+Revision ID: c9e1a3b5d7f2
+Revises: b8d2f4a6c0e3
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e1a3b5d7f2'
+down_revision: Union[str, None] = 'b8d2f4a6c0e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_question_and_responses', sa.Column('audio_url', sa.String(), nullable=True))
+    op.add_column('interview_questions', sa.Column('audio_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interview_questions', 'audio_url')
+    op.drop_column('interview_question_and_responses', 'audio_url')
@@ -0,0 +1,30 @@
+"""added answer evaluation
+
+Revision ID: d4a6c8e0f2b3
+Revises: c9e1a3b5d7f2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a6c8e0f2b3'
+down_revision: Union[str, None] = 'c9e1a3b5d7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_question_and_responses', sa.Column('evaluation', sa.JSON(), nullable=True))
+    op.add_column('interview_question_responses', sa.Column('evaluation', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interview_question_responses', 'evaluation')
+    op.drop_column('interview_question_and_responses', 'evaluation')
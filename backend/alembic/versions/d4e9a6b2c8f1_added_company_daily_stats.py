@@ -0,0 +1,55 @@
+"""added company daily stats
+
+Revision ID: d4e9a6b2c8f1
+Revises: c3d8f5a1e7b2
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e9a6b2c8f1'
+down_revision: Union[str, None] = 'c3d8f5a1e7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('company_daily_stats',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('interviews_created', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('interviews_completed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('completed_score_sum', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('completed_score_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('company_id', 'day')
+    )
+    # Backfill from existing interviews
+    op.execute("""
+        INSERT INTO company_daily_stats (
+            company_id, day, interviews_created, interviews_completed,
+            completed_score_sum, completed_score_count
+        )
+        SELECT
+            j.company_id,
+            i.created_at::date,
+            count(i.id),
+            count(*) FILTER (WHERE i.status = 'completed'),
+            coalesce(sum(i.overall_score) FILTER (WHERE i.status = 'completed'), 0),
+            count(i.overall_score) FILTER (WHERE i.status = 'completed')
+        FROM interviews i
+        JOIN ai_interviewed_jobs j ON j.id = i.ai_interviewed_job_id
+        WHERE i.created_at IS NOT NULL
+        GROUP BY j.company_id, i.created_at::date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('company_daily_stats')
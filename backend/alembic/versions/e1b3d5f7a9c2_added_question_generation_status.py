@@ -0,0 +1,30 @@
+"""added question generation status
+
+Revision ID: e1b3d5f7a9c2
+Revises: d4a6c8e0f2b3
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b3d5f7a9c2'
+down_revision: Union[str, None] = 'd4a6c8e0f2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interviews', sa.Column('question_generation_status', sa.String(), nullable=True))
+    op.add_column('interviews', sa.Column('question_generation_locked_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interviews', 'question_generation_locked_until')
+    op.drop_column('interviews', 'question_generation_status')
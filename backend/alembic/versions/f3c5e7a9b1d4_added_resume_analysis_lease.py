@@ -0,0 +1,28 @@
+"""added resume analysis lease
+
+Revision ID: f3c5e7a9b1d4
+Revises: e1b3d5f7a9c2
+Create Date: 2026-10-21 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c5e7a9b1d4'
+down_revision: Union[str, None] = 'e1b3d5f7a9c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interviews', sa.Column('resume_analysis_locked_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interviews', 'resume_analysis_locked_until')
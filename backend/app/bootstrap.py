@@ -0,0 +1,45 @@
+"""One-off setup that used to run on every import/boot of app.main.
+
+Run it after migrations on deploy:
+    python -m app.bootstrap
+"""
+
+import logging
+
+from app.database import Base, SessionLocal, engine
+from app.lib.security import hash_password
+from app.models import AdminUser
+
+logger = logging.getLogger(__name__)
+
+
+def create_schema():
+    Base.metadata.create_all(bind=engine)
+
+
+def create_default_admin():
+    db = SessionLocal()
+    try:
+        admin = db.query(AdminUser).filter(AdminUser.email == "admin@edudiagno.com").first()
+        if not admin:
+            admin = AdminUser(
+                email="admin@edudiagno.com",
+                password_hash=hash_password("EdUdIaGnO364"),
+                is_active=True,
+                role="superadmin"
+            )
+            db.add(admin)
+            db.commit()
+            logger.info("Default admin created")
+    finally:
+        db.close()
+
+
+def run():
+    create_schema()
+    create_default_admin()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run()
@@ -0,0 +1,208 @@
+"""Bulk re-scoring of every resume of an AI-interviewed job.
+
+Editing a job's description or requirements leaves the resume_match_score of
+its existing interviews stale. POST /company/ai-interviewed-job/rescore
+queues a rescore_jobs row; a worker in every app process claims it
+(app/lib/job_queue.py, like report jobs) and:
+
+- streams the job's interviews that have a resume through a server-side
+  cursor, in id order, RESCORE_BATCH_SIZE at a time;
+- scores each batch with the analyze-resume prompt, RESCORE_CONCURRENCY
+  calls in flight, through the LLM gateway;
+- writes the batch's scores back in one executemany UPDATE, together with
+  the job's progress and checkpoint (the last interview id done).
+
+A retried or taken-over job carries on after the checkpoint. A candidate
+whose call fails twice is counted in `failed` and skipped; a batch where every
+call fails (OpenAI down, say) fails the job attempt instead, so it is retried
+with backoff rather than marking everyone failed.
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.orm import aliased
+
+from app import database
+from app.config import settings
+from app.interview import services as interview_services
+from app.lib.job_queue import LeaseQueue
+from app.models import AiInterviewedJob, Interview, RescoreJob
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = 5
+
+
+def job_status(job) -> dict:
+    done = job.processed + job.failed
+    if job.status == "succeeded":
+        progress = 100
+    elif job.total:
+        progress = min(99, round(done * 100 / job.total))
+    else:
+        progress = 0
+    return {
+        "job_id": job.id,
+        "ai_interviewed_job_id": job.ai_interviewed_job_id,
+        "status": job.status,
+        "total": job.total,
+        "processed": job.processed,
+        "failed": job.failed,
+        "progress": progress,
+        "attempts": job.attempts,
+        "error": job.error,
+    }
+
+
+async def enqueue(db, ai_interviewed_job_id: int):
+    """The job's queued re-score, or a new one.
+
+    A re-score that is already running may have read the old requirements, so
+    it does not count: a new one is queued and starts once it finishes.
+    """
+    job = (
+        await db.execute(
+            select(RescoreJob)
+            .where(
+                RescoreJob.ai_interviewed_job_id == ai_interviewed_job_id,
+                RescoreJob.status == "queued",
+                RescoreJob.last_interview_id == 0,
+            )
+            .order_by(RescoreJob.id.desc())
+            .limit(1)
+        )
+    ).scalars().first()
+    if job is None:
+        job = RescoreJob(ai_interviewed_job_id=ai_interviewed_job_id)
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        queue.wakeup()
+    return job
+
+
+def _candidates(ai_interviewed_job_id, after_id):
+    return (
+        select(Interview.id, Interview.resume_text)
+        .where(
+            Interview.ai_interviewed_job_id == ai_interviewed_job_id,
+            Interview.id > after_id,
+            Interview.resume_text.is_not(None),
+            Interview.resume_text != "",
+        )
+        .order_by(Interview.id)
+    )
+
+
+def _one_per_ai_interviewed_job(now):
+    """One re-score per AI-interviewed job runs at a time."""
+    running = aliased(RescoreJob)
+    return [
+        ~exists().where(
+            running.ai_interviewed_job_id == RescoreJob.ai_interviewed_job_id,
+            running.id != RescoreJob.id,
+            running.status == "running",
+            running.locked_until >= now,
+        )
+    ]
+
+
+async def _score_batch(ai_job, batch, slots):
+    async def score(candidate):
+        async with slots:
+            try:
+                return await interview_services.score_resume(
+                    candidate.resume_text, ai_job.description, ai_job.requirements
+                )
+            except Exception as e:
+                logger.warning(f"Could not re-score interview {candidate.id}: {e!r}")
+                return e
+
+    scores = await asyncio.gather(*(score(candidate) for candidate in batch))
+    # One more go for the failures, which are often a blip that has passed.
+    retry = [i for i, result in enumerate(scores) if isinstance(result, Exception)]
+    if len(retry) < len(batch):
+        for i, result in zip(retry, await asyncio.gather(*(score(batch[i]) for i in retry))):
+            scores[i] = result
+    return scores
+
+
+async def _rescore(db, job):
+    ai_job = (
+        await db.execute(
+            select(AiInterviewedJob.description, AiInterviewedJob.requirements).where(
+                AiInterviewedJob.id == job.ai_interviewed_job_id
+            )
+        )
+    ).one()
+    if job.total is None:
+        total = (
+            await db.execute(
+                select(func.count()).select_from(_candidates(job.ai_interviewed_job_id, 0).subquery())
+            )
+        ).scalar_one()
+        await db.execute(update(RescoreJob).where(RescoreJob.id == job.id).values(total=total))
+        await db.commit()
+
+    slots = asyncio.Semaphore(settings.RESCORE_CONCURRENCY)
+    stmt = _candidates(job.ai_interviewed_job_id, job.last_interview_id).execution_options(
+        yield_per=settings.RESCORE_BATCH_SIZE
+    )
+    # The cursor gets a connection of its own: the writes below commit per
+    # batch, which would close it.
+    async with database.async_engine.connect() as cursor_connection:
+        result = await cursor_connection.stream(stmt)
+        async for batch in result.partitions():
+            scores = await _score_batch(ai_job, batch, slots)
+            rows = [
+                {"id": candidate.id, **score}
+                for candidate, score in zip(batch, scores)
+                if not isinstance(score, Exception)
+            ]
+            if not rows:
+                raise scores[0]
+            await db.execute(update(Interview), rows)
+            await db.execute(
+                update(RescoreJob)
+                .where(RescoreJob.id == job.id)
+                .values(
+                    processed=RescoreJob.processed + len(rows),
+                    failed=RescoreJob.failed + len(batch) - len(rows),
+                    last_interview_id=batch[-1].id,
+                    attempts=0,
+                    locked_until=queue.lease(),
+                )
+            )
+            await db.commit()
+
+
+async def _run(db, job):
+    await _rescore(db, job)
+    await queue.save(db, job.id, status="succeeded", error=None, locked_until=None)
+
+
+# One job at a time per process; each job already keeps RESCORE_CONCURRENCY
+# LLM calls busy.
+queue = LeaseQueue(
+    RescoreJob,
+    label="Rescore",
+    run=_run,
+    lease_seconds=settings.RESCORE_JOB_LEASE_SECONDS,
+    max_attempts=settings.RESCORE_JOB_MAX_ATTEMPTS,
+    retry_base_seconds=10,
+    poll_seconds=POLL_SECONDS,
+    claimable=_one_per_ai_interviewed_job,
+    describe=lambda job: f" after interview {job.last_interview_id}",
+)
+
+
+def start_worker():
+    queue.start_worker()
+
+
+async def stop_worker():
+    """Stop the worker. A job in flight is picked up again from its
+    checkpoint once its lease expires."""
+    await queue.stop_worker()
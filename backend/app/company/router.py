@@ -14,7 +14,6 @@ from fastapi import (
     Query
 )
 from sqlalchemy import (
-    Float,
     asc,
     delete,
     desc,
@@ -25,17 +24,18 @@ from sqlalchemy import (
     case,
     and_,
 )
-from sqlalchemy.orm import Session, joinedload
-from app.configs import openai
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 import os
 from os import path
 import uuid
 
 from app import database, config
-from app.company import services
+from app.company import rescore_jobs, services
 from app.company import schemas
 from app.dependencies.authorization import authorize_company
 from app.lib import jwt, security
+from app.lib import pagination as pagination_lib
 from app.lib.errors import CustomException
 from app.company import services
 from app.models import (
@@ -52,8 +52,9 @@ from app.models import (
     Job,
     JobApplication,
     JobSeeker,
+    RescoreJob,
 )
-from app.services import brevo
+from app.services import brevo, company_stats, interview_question_response, llm_cache, response_cache, resume_match
 from app.services import gcs as gcs_service
 from app.company.schemas import CandidateInviteRequest
 from app.lib.security import hash_password
@@ -66,7 +67,7 @@ router = APIRouter()
 @router.post("/dsa-question")
 async def create_dsa_question(
     dsa_question_data: schemas.CreateDSAQuestion,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     stmt = (
@@ -87,9 +88,10 @@ async def create_dsa_question(
             DSAQuestion.ai_interviewed_job_id,
         )
     )
-    result = db.execute(stmt)
-    db.commit()
+    result = await db.execute(stmt)
+    await db.commit()
     dsa_question = result.mappings().one()
+    response_cache.ai_interviewed_job_changed(dsa_question_data.ai_interviewed_job_id)
 
     data = dict(dsa_question)
     data["test_cases"] = []
@@ -109,15 +111,15 @@ async def create_dsa_question(
                 DSATestCase.dsa_question_id,
             )
         )
-        result = db.execute(stmt)
-        db.commit()
+        result = await db.execute(stmt)
+        await db.commit()
         dsa_test_case = result.mappings().one()
         data["test_cases"].append(dict(dsa_test_case))
     return data
 
 
 @router.get("/dsa-question")
-async def get_dsa_question(ai_interviewed_job_id: str, db: Session = Depends(database.get_db)):
+async def get_dsa_question(ai_interviewed_job_id: str, db: AsyncSession = Depends(database.get_async_db)):
     stmt = (
         select(
             DSAQuestion.id,
@@ -129,7 +131,7 @@ async def get_dsa_question(ai_interviewed_job_id: str, db: Session = Depends(dat
         .where(DSAQuestion.ai_interviewed_job_id == int(ai_interviewed_job_id))
         .order_by(DSAQuestion.id)
     )
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     dsa_questions = [dict(q) for q in result.mappings().all()]
 
     for question in dsa_questions:
@@ -139,7 +141,7 @@ async def get_dsa_question(ai_interviewed_job_id: str, db: Session = Depends(dat
             DSATestCase.input,
             DSATestCase.dsa_question_id,
         ).where(DSATestCase.dsa_question_id == question["id"])
-        result = db.execute(stmt)
+        result = await db.execute(stmt)
         test_cases = [dict(t) for t in result.mappings().all()]
         question["test_cases"] = test_cases
 
@@ -149,7 +151,7 @@ async def get_dsa_question(ai_interviewed_job_id: str, db: Session = Depends(dat
 @router.put("/dsa-question")
 async def update_dsa_question(
     dsa_question_data: schemas.UpdateDSAQuestion,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     dsa_question_data = dsa_question_data.model_dump(exclude_unset=True)
@@ -166,28 +168,34 @@ async def update_dsa_question(
             DSAQuestion.time_minutes,
         )
     )
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     dsa_question = result.mappings().one()
-    db.commit()
+    await db.commit()
     return dsa_question
 
 
 @router.delete("/dsa-question")
 async def delete_dsa_question(
     id: str,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
-    stmt = delete(DSAQuestion).where(DSAQuestion.id == int(id))
-    db.execute(stmt)
-    db.commit()
+    stmt = (
+        delete(DSAQuestion)
+        .where(DSAQuestion.id == int(id))
+        .returning(DSAQuestion.ai_interviewed_job_id)
+    )
+    job_ids = (await db.execute(stmt)).scalars().all()
+    await db.commit()
+    for job_id in job_ids:
+        response_cache.ai_interviewed_job_changed(job_id)
     return {"message": "succesfully deleted dsa question"}
 
 
 @router.post("/dsa-test-case")
 async def create_test_case(
     test_case_data: schemas.CreateDSATestCase,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     dsa_test_case = DSATestCase(
@@ -196,24 +204,24 @@ async def create_test_case(
         dsa_question_id=test_case_data.dsa_question_id,
     )
     db.add(dsa_test_case)
-    db.commit()
-    db.refresh(dsa_test_case)
+    await db.commit()
+    await db.refresh(dsa_test_case)
     return dsa_test_case
 
 
 @router.get("/dsa-test-case")
-async def get_test_case(question_id: str, db: Session = Depends(database.get_db)):
+async def get_test_case(question_id: str, db: AsyncSession = Depends(database.get_async_db)):
     stmt = select(DSATestCase.id, DSATestCase.input, DSATestCase.expected_output).where(
         DSATestCase.dsa_question_id == int(question_id)
     )
-    test_cases = db.execute(stmt).all()
+    test_cases = (await db.execute(stmt)).all()
     return [test_case._mapping for test_case in test_cases]
 
 
 @router.put("")
 async def update_test_case(
     test_case_data: schemas.UpdateDSATestCase,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     stmt = (
@@ -229,24 +237,24 @@ async def update_test_case(
             DSATestCase.dsa_question_id,
         )
     )
-    result = db.execute(stmt)
-    db.commit()
+    result = await db.execute(stmt)
+    await db.commit()
     test_case = result.all()[0]._mapping
     return test_case
 
 
 @router.delete("/dsa-test-case")
-async def delete_test_case(id: str, db: Session = Depends(database.get_db)):
+async def delete_test_case(id: str, db: AsyncSession = Depends(database.get_async_db)):
     stmt = delete(DSATestCase).where(DSATestCase.id == id)
-    db.execute(stmt)
-    db.commit()
+    await db.execute(stmt)
+    await db.commit()
     return {"message": "successfully deleted test case"}
 
 
 @router.post("/ai-interviewed-job")
 async def create_job(
     job_data: schemas.CreateAiInterview,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     if job_data.salary_min is not None and job_data.salary_max is not None:
@@ -274,15 +282,15 @@ async def create_job(
         company_id=recruiter_id,
     )
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
     return job
 
 
 @router.get("/ai-interviewed-job")
 async def get_job(
     id: str,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     stmt = select(
@@ -309,12 +317,74 @@ async def get_job(
         AiInterviewedJob.created_at,
         AiInterviewedJob.updated_at,
     ).where(AiInterviewedJob.id == int(id))
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     job = result.mappings().one()
 
     return job
 
 
+@router.get("/ai-interviewed-job/resume-ranking")
+async def get_resume_ranking(
+    id: int,
+    db: AsyncSession = Depends(database.get_async_db),
+    recruiter_id=Depends(authorize_company),
+):
+    """Candidates of a job ranked by a local resume match score (0-100).
+
+    No LLM calls, so it is cheap enough to run over every applicant; the
+    written feedback still comes from /interview/analyze-resume.
+    """
+    owned = (
+        await db.execute(
+            select(AiInterviewedJob.id).where(
+                AiInterviewedJob.id == id, AiInterviewedJob.company_id == recruiter_id
+            )
+        )
+    ).first()
+    if owned is None:
+        raise CustomException("Job not found", code=404)
+    return await resume_match.rank(db, id)
+
+
+@router.post("/ai-interviewed-job/rescore", status_code=202)
+async def rescore_resumes(
+    id: int,
+    db: AsyncSession = Depends(database.get_async_db),
+    recruiter_id=Depends(authorize_company),
+):
+    """Re-run the LLM resume match for every candidate of the job, e.g. after
+    its requirements changed. Poll the returned job for progress."""
+    owned = (
+        await db.execute(
+            select(AiInterviewedJob.id).where(
+                AiInterviewedJob.id == id, AiInterviewedJob.company_id == recruiter_id
+            )
+        )
+    ).first()
+    if owned is None:
+        raise CustomException("Job not found", code=404)
+    job = await rescore_jobs.enqueue(db, id)
+    return rescore_jobs.job_status(job)
+
+
+@router.get("/ai-interviewed-job/rescore/{job_id}")
+async def get_rescore_status(
+    job_id: int,
+    db: AsyncSession = Depends(database.get_async_db),
+    recruiter_id=Depends(authorize_company),
+):
+    job = (
+        await db.execute(
+            select(RescoreJob)
+            .join(AiInterviewedJob, AiInterviewedJob.id == RescoreJob.ai_interviewed_job_id)
+            .where(RescoreJob.id == job_id, AiInterviewedJob.company_id == recruiter_id)
+        )
+    ).scalars().first()
+    if job is None:
+        raise CustomException("Rescore job not found", code=404)
+    return rescore_jobs.job_status(job)
+
+
 @router.get("/ai-interviewed-job/all")
 async def get_all_job(
     start: str = "0",
@@ -325,7 +395,10 @@ async def get_all_job(
     sort: str = "ascending",
     search: str = None,
     status: str = None,
-    db: Session = Depends(database.get_db),
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: str = None,
+    include_count: bool = False,
+    db: AsyncSession = Depends(database.get_async_read_db),
     recruiter_id=Depends(authorize_company),
 ):
     try:
@@ -339,20 +412,21 @@ async def get_all_job(
         start_int = 0
         limit_int = 10
 
-    order_column = AiInterviewedJob.id
+    sort_column = None
 
     if sort_field == "title":
-        order_column = AiInterviewedJob.title
+        sort_column = AiInterviewedJob.title
     elif sort_field == "department":
-        order_column = AiInterviewedJob.department
+        sort_column = AiInterviewedJob.department
     elif sort_field == "location":
-        order_column = AiInterviewedJob.location
+        sort_column = AiInterviewedJob.location
     elif sort_field == "type":
-        order_column = AiInterviewedJob.type
+        sort_column = AiInterviewedJob.type
     elif sort_field == "show_salary":
-        order_column = AiInterviewedJob.show_salary
+        sort_column = AiInterviewedJob.show_salary
     elif sort_field == "status":
-        order_column = AiInterviewedJob.status
+        sort_column = AiInterviewedJob.status
+    order_column = AiInterviewedJob.id if sort_column is None else sort_column
 
     # Build base filter
     filters = [AiInterviewedJob.company_id == recruiter_id]
@@ -387,7 +461,42 @@ async def get_all_job(
             AiInterviewedJob.updated_at,
         )
         .where(*filters)
-        .order_by(desc(order_column) if sort == "descending" else asc(order_column))
+    )
+
+    if pagination == "cursor" or cursor:
+        descending = sort == "descending"
+        sort_key = f"{sort_field}:{sort}"
+        page_stmt = stmt
+        if cursor:
+            page_stmt = page_stmt.where(
+                pagination_lib.after(
+                    sort_column,
+                    AiInterviewedJob.id,
+                    descending,
+                    pagination_lib.decode_cursor(
+                        cursor, sort_key, 1 if sort_column is None else 2
+                    ),
+                )
+            )
+        page_stmt = page_stmt.order_by(
+            *pagination_lib.order_by(sort_column, AiInterviewedJob.id, descending)
+        ).limit(limit_int + 1)
+        jobs = (await db.execute(page_stmt)).mappings().all()
+
+        next_cursor = None
+        if len(jobs) > limit_int:
+            jobs = jobs[:limit_int]
+            last = jobs[-1]
+            keys = [last["id"]] if sort_column is None else [last[sort_column.key], last["id"]]
+            next_cursor = pagination_lib.encode_cursor(sort_key, keys)
+
+        total_count = None
+        if include_count:
+            total_count = (await db.execute(pagination_lib.capped_count(stmt))).scalar()
+        return {"count": total_count, "jobs": jobs, "next_cursor": next_cursor}
+
+    stmt = (
+        stmt.order_by(desc(order_column) if sort == "descending" else asc(order_column))
         .limit(limit_int)
         .offset(start_int)
     )
@@ -397,9 +506,9 @@ async def get_all_job(
         .select_from(AiInterviewedJob)
         .where(*filters)
     )
-    total_count = db.execute(count_stmt).scalar()
+    total_count = (await db.execute(count_stmt)).scalar()
 
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     jobs = result.mappings().all()
 
     return {"count": total_count, "jobs": jobs}
@@ -422,8 +531,8 @@ async def generate_description(
     Use simple paragraphs and bullet points with dashes (-) if needed.
     """
 
-    print(f"Making OpenAI API call with model: gpt-3.5-turbo")
-    response = await openai.client.chat.completions.create(
+    description = await llm_cache.complete(
+        "generate_description",
         model="gpt-3.5-turbo",
         messages=[
             {
@@ -435,7 +544,6 @@ async def generate_description(
         temperature=0.3,
         max_tokens=500,
     )
-    description = response.choices[0].message.content
 
     return {"description": description}
 
@@ -462,7 +570,8 @@ async def generate_requirements(
     Use simple bullet points with dashes (-) for each requirement.  Keep the requirements specific and measurable.
     """
 
-    response = await openai.client.chat.completions.create(
+    requirements = await llm_cache.complete(
+        "generate_requirements",
         model="gpt-3.5-turbo",
         messages=[
             {
@@ -474,14 +583,13 @@ async def generate_requirements(
         temperature=0.2,
         max_tokens=300,
     )
-    requirements = response.choices[0].message.content
     return {"requirements": requirements}
 
 
 @router.put("/ai-interviewed-job")
 async def update_job(
     job_data: schemas.UpdateAiInterview,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     job_data = job_data.model_dump(exclude_unset=True)
@@ -518,8 +626,9 @@ async def update_job(
             AiInterviewedJob.company_id,
         )
     )
-    result = db.execute(stmt)
-    db.commit()
+    result = await db.execute(stmt)
+    await db.commit()
+    response_cache.ai_interviewed_job_changed(job_id)
     job = result.all()[0]._mapping
     return job
 
@@ -527,7 +636,7 @@ async def update_job(
 @router.delete("/ai-interviewed-job")
 async def delete_ai_interviewed_job(
     id: str,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     company_id=Depends(authorize_company),
 ):
     stmt = select(AiInterviewedJob).where(
@@ -535,7 +644,7 @@ async def delete_ai_interviewed_job(
             AiInterviewedJob.id == int(id), AiInterviewedJob.company_id == company_id
         )
     )
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     job = result.scalar_one_or_none()
 
     if not job:
@@ -544,14 +653,18 @@ async def delete_ai_interviewed_job(
             detail="AiInterview not found or you don't have permission to delete it",
         )
 
-    # Delete the job
+    # Delete the job; its interviews go with it, so take them out of the
+    # analytics rollup in the same transaction.
+    await db.execute(company_stats.job_deleted(int(id)))
     stmt = delete(AiInterviewedJob).where(
         and_(
             AiInterviewedJob.id == int(id), AiInterviewedJob.company_id == company_id
         )
     )
-    db.execute(stmt)
-    db.commit()
+    await db.execute(stmt)
+    await db.commit()
+    response_cache.ai_interviewed_job_changed(id)
+    response_cache.interview_questions_changed(id)
     return
 
 
@@ -563,7 +676,7 @@ async def create_quiz_question(
     ai_interviewed_job_id: int = Form(...),
     time_seconds: Optional[int] = Form(None),
     image: UploadFile = File(None),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     quiz_question = QuizQuestion(
@@ -574,8 +687,9 @@ async def create_quiz_question(
         time_seconds=time_seconds,
     )
     db.add(quiz_question)
-    db.commit()
-    db.refresh(quiz_question)
+    await db.commit()
+    await db.refresh(quiz_question)
+    response_cache.ai_interviewed_job_changed(ai_interviewed_job_id)
 
     if image and image.filename:
         if not path.exists(path.join("uploads", "image")):
@@ -590,8 +704,8 @@ async def create_quiz_question(
         quiz_question.image_url = (
             f"{config.settings.URL}/uploads/image/quiz_{quiz_question.id}.png"
         )
-        db.commit()
-        db.refresh(quiz_question)
+        await db.commit()
+        await db.refresh(quiz_question)
 
     return quiz_question
 
@@ -601,7 +715,7 @@ async def get_quiz_questions(
     response: Response,
     ai_interviewed_job_id: str = None,
     company_id = Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     if ai_interviewed_job_id:
         stmt = select(
@@ -617,14 +731,14 @@ async def get_quiz_questions(
         return {"msg": "job id is required"}
 
     quiz_questions = [
-        dict(quiz_question._mapping) for quiz_question in db.execute(stmt).all()
+        dict(quiz_question._mapping) for quiz_question in (await db.execute(stmt)).all()
     ]
 
     for quiz_question in quiz_questions:
         stmt = select(QuizOption.id, QuizOption.label, QuizOption.correct).where(
             QuizOption.quiz_question_id == quiz_question["id"]
         )
-        options = [option._mapping for option in db.execute(stmt).all()]
+        options = [option._mapping for option in (await db.execute(stmt)).all()]
         quiz_question["options"] = options
 
     return quiz_questions
@@ -637,7 +751,7 @@ async def update_quiz_question(
     category: str = Form(),
     time_seconds: int = Form(),
     id: int = Form(),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     quiz_data = {}
@@ -661,8 +775,8 @@ async def update_quiz_question(
             QuizQuestion.image_url,
         )
     )
-    result = db.execute(stmt)
-    db.commit()
+    result = await db.execute(stmt)
+    await db.commit()
     quiz_question = result.mappings().one()
     return quiz_question
 
@@ -670,12 +784,18 @@ async def update_quiz_question(
 @router.delete("/quiz-question")
 async def delete_quiz_question(
     question_id: str,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
-    stmt = delete(QuizQuestion).where(QuizQuestion.id == int(question_id))
-    db.execute(stmt)
-    db.commit()
+    stmt = (
+        delete(QuizQuestion)
+        .where(QuizQuestion.id == int(question_id))
+        .returning(QuizQuestion.ai_interviewed_job_id)
+    )
+    job_ids = (await db.execute(stmt)).scalars().all()
+    await db.commit()
+    for job_id in job_ids:
+        response_cache.ai_interviewed_job_changed(job_id)
     return
 
 
@@ -696,7 +816,7 @@ async def register_recruiter(
     address: str = Form(...),
     document: UploadFile = File(None),
     document_type: str = Form(None),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     password_hash = security.hash_password(password)
 
@@ -726,8 +846,8 @@ async def register_recruiter(
         document_file_url=document_file_url,
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
@@ -736,7 +856,7 @@ async def login_recruiter(
     request: Request,
     response: Response,
     login_data: schemas.RecruiterLogin,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     stmt = select(
         Company.id,
@@ -760,7 +880,7 @@ async def login_recruiter(
         Company.updated_at,
         Company.is_suspended,
     ).where(Company.email == login_data.email)
-    company = db.execute(stmt).mappings().one()
+    company = (await db.execute(stmt)).mappings().one()
 
     if company.get("is_suspended"):
         response.status_code = 403
@@ -791,11 +911,11 @@ async def login_recruiter(
 @router.get("")
 async def get_recruiter(
     request: Request,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     company_id=Depends(authorize_company),
 ):
     stmt = select(Company).where(Company.id == int(company_id))
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     recruiter = result.scalars().all()[0]
 
     return recruiter
@@ -807,7 +927,7 @@ async def upate_recruiter(
     document: UploadFile = File(None),
     document_type: str = Form(None),
     company_id=Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     password_hash = None
     if recruiter_data.password:
@@ -841,8 +961,11 @@ async def upate_recruiter(
         .returning(Company)
     )
 
-    result = db.execute(stmt)
-    db.commit()
+    result = await db.execute(stmt)
+    await db.commit()
+    response_cache.company_changed(company_id)
+    # Candidate job pages show the company name and logo.
+    response_cache.ai_interviewed_job_changed()
     company = result.scalars().first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -884,10 +1007,10 @@ async def upate_recruiter(
 @router.get("/verify-token")
 async def verify_recruiter_access_token(
     company_id=Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     stmt = select(Company).where(Company.id == company_id)
-    recruiter = db.execute(stmt).scalars().all()[0]
+    recruiter = (await db.execute(stmt)).scalars().all()[0]
 
     return recruiter
 
@@ -895,7 +1018,7 @@ async def verify_recruiter_access_token(
 @router.post("/send-otp")
 async def send_otp(
     send_otp_data: schemas.RecruiterSendEmailOtp,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     otp = str(int(random.random() * 1000000))
     otp = otp + "0" * (6 - len(otp))
@@ -913,8 +1036,8 @@ async def send_otp(
         )
         .where(Company.email == send_otp_data.email)
     )
-    db.execute(stmt)
-    db.commit()
+    await db.execute(stmt)
+    await db.commit()
     return {"message": "successfully sent otp"}
 
 
@@ -922,12 +1045,12 @@ async def send_otp(
 async def verify_otp(
     response: Response,
     verify_otp_data: schemas.RecruiterVerifyEmailOtp,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     stmt = select(Company.email_otp, Company.email_otp_expiry).where(
         Company.email == verify_otp_data.email
     )
-    recruiter = db.execute(stmt).mappings().one()
+    recruiter = (await db.execute(stmt)).mappings().one()
 
     if recruiter["email_otp_expiry"] < datetime.datetime.now().astimezone().astimezone(
         tz=datetime.timezone.utc
@@ -945,8 +1068,8 @@ async def verify_otp(
         .where(Company.email == verify_otp_data.email)
         .returning(Company)
     )
-    result = db.execute(stmt)
-    db.commit()
+    result = await db.execute(stmt)
+    await db.commit()
     recruiter = result.scalars().all()[0]
 
     encoded_jwt = jwt.encode(
@@ -965,9 +1088,9 @@ async def verify_otp(
 async def create_interview_questions(
     interview_question_data: schemas.CreateInterviewQuestion,
     recruiter_id: int = Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    return services.create_interview_question(
+    return await services.create_interview_question(
         interview_question_data, db
     )
 
@@ -976,9 +1099,9 @@ async def create_interview_questions(
 async def update_interview_question(
     interview_question_data: schemas.UpdateInterviewQuestion,
     recruiter_id: int = Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    return services.interview_question.update_interview_question(
+    return await services.update_interview_question(
         interview_question_data, db
     )
 
@@ -987,18 +1110,18 @@ async def update_interview_question(
 async def delete_interview_question(
     id: int,
     recruiter_id: int = Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    return services.delete_interview_question(id, db)
+    return await services.delete_interview_question(id, db)
 
 
 @router.get("/interview-question")
 async def get_interview_question_by_job(
     ai_interviewed_job_id: int,
     recruiter_id: int = Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    return services.get_interview_question_by_job_id(
+    return await services.get_interview_question_by_job_id(
         ai_interviewed_job_id, db
     )
 
@@ -1007,9 +1130,9 @@ async def get_interview_question_by_job(
 async def get_interview_question_response_by_interview(
     interview_id: int,
     recruiter_id: int = Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    return services.interview_question_response.get_interview_question_response_by_interview_id(
+    return await interview_question_response.get_interview_question_response_by_interview_id(
         interview_id, db
     )
 
@@ -1017,191 +1140,33 @@ async def get_interview_question_response_by_interview(
 @router.get("/analytics")
 async def get_analytics(
     recruiter_id: int = Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_read_db),
 ):
-    now = datetime.datetime.utcnow()
-    first_day_this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    first_day_prev_month = (first_day_this_month - datetime.timedelta(days=1)).replace(
-        day=1
-    )
-    last_day_prev_month = first_day_this_month - datetime.timedelta(seconds=1)
-
-    today = now.date()
-    start_of_week = today - datetime.timedelta(days=today.weekday())
-    daily_interviews_this_week = []
-    for i in range((today - start_of_week).days + 1):
-        day = start_of_week + datetime.timedelta(days=i)
-        day_start = datetime.datetime.combine(day, datetime.time.min)
-        day_end = datetime.datetime.combine(day, datetime.time.max)
-        count = db.execute(
-            select(func.count(Interview.id))
-            .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-            .where(
-                AiInterviewedJob.company_id == recruiter_id,
-                AiInterviewedJob.created_at >= day_start,
-                AiInterviewedJob.created_at <= day_end,
-            )
-        ).scalar()
-        daily_interviews_this_week.append({"date": day.isoformat(), "count": count})
-
-    interviews_completed_this_month = db.execute(
-        select(func.count(Interview.id))
-        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-        .where(
-            AiInterviewedJob.company_id == recruiter_id,
-            Interview.status == "completed",
-            Interview.created_at >= first_day_this_month,
-            Interview.created_at
-            < (first_day_this_month + datetime.timedelta(days=32)).replace(day=1),
-        )
-    ).scalar()
-
-    interviews_completed_prev_month = db.execute(
-        select(func.count(Interview.id))
-        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-        .where(
-            AiInterviewedJob.company_id == recruiter_id,
-            Interview.status == "completed",
-            Interview.created_at >= first_day_prev_month,
-            Interview.created_at <= last_day_prev_month,
-        )
-    ).scalar()
-
-    total_jobs = db.execute(
-        select(func.count(AiInterviewedJob.id)).where(
-            AiInterviewedJob.company_id == recruiter_id
-        )
-    ).scalar()
-
-    total_interviews_conducted = db.execute(
-        select(func.count(Interview.id))
-        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-        .where(AiInterviewedJob.company_id == recruiter_id)
-    ).scalar()
-
-    interviews_conducted_this_month = db.execute(
-        select(func.count(Interview.id))
-        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-        .where(
-            AiInterviewedJob.company_id == recruiter_id,
-            Interview.created_at >= first_day_this_month,
-            Interview.created_at
-            < (first_day_this_month + datetime.timedelta(days=32)).replace(day=1),
-        )
-    ).scalar()
+    stmt, week_days = company_stats.dashboard(recruiter_id, datetime.datetime.utcnow())
+    row = (await db.execute(stmt)).mappings().one()
 
-    interviews_conducted_prev_month = db.execute(
-        select(func.count(Interview.id))
-        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-        .where(
-            AiInterviewedJob.company_id == recruiter_id,
-            Interview.created_at >= first_day_prev_month,
-            Interview.created_at <= last_day_prev_month,
-        )
-    ).scalar()
-
-    total_interviews_completed = db.execute(
-        select(func.count(Interview.id))
-        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-        .where(
-            AiInterviewedJob.company_id == recruiter_id,
-            Interview.status == "completed",
-        )
-    ).scalar()
-
-    avg_score = (
-        db.execute(
-            select(func.avg(Interview.overall_score.cast(Float)))
-            .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-            .where(
-                AiInterviewedJob.company_id == recruiter_id,
-                Interview.status == "completed",
-                Interview.created_at >= first_day_this_month,
-                Interview.created_at
-                < (first_day_this_month + datetime.timedelta(days=32)).replace(day=1),
-            )
-        ).scalar()
-        or 0
-    )
-
-    total_candidates = db.execute(
-        select(func.count(func.distinct(Interview.email)))
-        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-        .where(
-            AiInterviewedJob.company_id == recruiter_id
-        )
-    ).scalar()
-
-    candidates_this_month = db.execute(
-        select(func.count(func.distinct(Interview.email)))
-        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-        .where(
-            AiInterviewedJob.company_id == recruiter_id,
-            Interview.created_at >= first_day_this_month,
-            Interview.created_at
-            < (first_day_this_month + datetime.timedelta(days=32)).replace(day=1),
-        )
-    ).scalar()
-
-    candidates_prev_month = db.execute(
-        select(func.count(func.distinct(Interview.email)))
-        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
-        .where(
-            AiInterviewedJob.company_id == recruiter_id,
-            Interview.created_at >= first_day_prev_month,
-            Interview.created_at <= last_day_prev_month,
-        )
-    ).scalar()
-
-    total_open_jobs = db.execute(
-        select(func.count(AiInterviewedJob.id)).where(
-            AiInterviewedJob.company_id == recruiter_id,
-            AiInterviewedJob.status == "active",
-        )
-    ).scalar()
-
-    total_closed_jobs = db.execute(
-        select(func.count(AiInterviewedJob.id)).where(
-            AiInterviewedJob.company_id == recruiter_id,
-            AiInterviewedJob.status == "closed",
-        )
-    ).scalar()
-
-    active_jobs_this_month = db.execute(
-        select(func.count(AiInterviewedJob.id)).where(
-            AiInterviewedJob.company_id == recruiter_id,
-            AiInterviewedJob.status == "active",
-            AiInterviewedJob.created_at >= first_day_this_month,
-            AiInterviewedJob.created_at
-            < (first_day_this_month + datetime.timedelta(days=32)).replace(day=1),
-        )
-    ).scalar()
-
-    active_jobs_prev_month = db.execute(
-        select(func.count(AiInterviewedJob.id)).where(
-            AiInterviewedJob.company_id == recruiter_id,
-            AiInterviewedJob.status == "active",
-            AiInterviewedJob.created_at >= first_day_prev_month,
-            AiInterviewedJob.created_at <= last_day_prev_month,
-        )
-    ).scalar()
+    daily_interviews_this_week = [
+        {"date": day.isoformat(), "count": row[f"day_{i}"]}
+        for i, day in enumerate(week_days)
+    ]
+    avg_score = row["average_candidate_score"]
 
     return {
-        "total_jobs": total_jobs,
-        "total_open_jobs": total_open_jobs,
-        "total_closed_jobs": total_closed_jobs,
-        "total_interviews_conducted": total_interviews_conducted,
-        "total_interviews_conducted_this_month": interviews_conducted_this_month,
-        "total_interviews_conducted_prev_month": interviews_conducted_prev_month,
-        "total_interviews_completed": total_interviews_completed,
-        "interviews_completed_this_month": interviews_completed_this_month,
-        "interviews_completed_prev_month": interviews_completed_prev_month,
-        "total_candidates": total_candidates,
+        "total_jobs": row["total_jobs"],
+        "total_open_jobs": row["total_open_jobs"],
+        "total_closed_jobs": row["total_closed_jobs"],
+        "total_interviews_conducted": row["total_interviews_conducted"],
+        "total_interviews_conducted_this_month": row["total_interviews_conducted_this_month"],
+        "total_interviews_conducted_prev_month": row["total_interviews_conducted_prev_month"],
+        "total_interviews_completed": row["total_interviews_completed"],
+        "interviews_completed_this_month": row["interviews_completed_this_month"],
+        "interviews_completed_prev_month": row["interviews_completed_prev_month"],
+        "total_candidates": row["total_candidates"],
         "average_candidate_score": round(avg_score, 2) if avg_score else 0,
-        "active_jobs_this_month": active_jobs_this_month,
-        "active_jobs_prev_month": active_jobs_prev_month,
-        "candidates_this_month": candidates_this_month,
-        "candidates_prev_month": candidates_prev_month,
+        "active_jobs_this_month": row["active_jobs_this_month"],
+        "active_jobs_prev_month": row["active_jobs_prev_month"],
+        "candidates_this_month": row["candidates_this_month"],
+        "candidates_prev_month": row["candidates_prev_month"],
         "daily_interviews_this_week": daily_interviews_this_week,
     }
 
@@ -1209,7 +1174,7 @@ async def get_analytics(
 @router.post("/quiz-option")
 async def create_quiz_option(
     option_data: schemas.CreateQuizOption,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     quiz_option = QuizOption(
@@ -1218,15 +1183,15 @@ async def create_quiz_option(
         quiz_question_id=option_data.quiz_question_id,
     )
     db.add(quiz_option)
-    db.commit()
-    db.refresh(quiz_option)
+    await db.commit()
+    await db.refresh(quiz_option)
     return quiz_option
 
 
 @router.put("/quiz-option")
 async def update_quiz_option(
     option_data: schemas.UpdateQuizOption,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     stmt = (
@@ -1235,8 +1200,8 @@ async def update_quiz_option(
         .where(QuizOption.id == option_data.id)
         .returning(QuizOption.label, QuizOption.correct)
     )
-    result = db.execute(stmt)
-    db.commit()
+    result = await db.execute(stmt)
+    await db.commit()
     quiz_option = result.all()[0]._mapping
     return quiz_option
 
@@ -1244,12 +1209,12 @@ async def update_quiz_option(
 @router.delete("/quiz-option")
 async def delete_quiz_option(
     option_id: str,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     stmt = delete(QuizOption).where(QuizOption.id == int(option_id))
-    db.execute(stmt)
-    db.commit()
+    await db.execute(stmt)
+    await db.commit()
 
 @router.get("/interview/all")
 async def get_company_interviews(
@@ -1266,95 +1231,117 @@ async def get_company_interviews(
     sort_order: Literal["asc", "desc"] = "desc",
     limit: str = "10",
     offset: str = "0",
-    db: Session = Depends(database.get_db),
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: str = None,
+    include_count: bool = False,
+    db: AsyncSession = Depends(database.get_async_read_db),
     recruiter_id=Depends(authorize_company),
 ):
     stmt = select(Interview)
     count = 0
 
-    order_column = Interview.id
+    sort_column = None
     if sort_by == "interview_status":
-        order_column = Interview.status
+        sort_column = Interview.status
     elif sort_by == "work_experience":
-        order_column = Interview.work_experience
+        sort_column = Interview.work_experience_yrs
     elif sort_by == "resume_match_score":
-        order_column = Interview.resume_match_score
+        sort_column = Interview.resume_match_score
     elif sort_by == "overall_score":
-        order_column = Interview.overall_score
+        sort_column = Interview.overall_score
     elif sort_by == "created_at":
-        order_column = Interview.created_at
+        sort_column = Interview.created_at
+    order_column = Interview.id if sort_column is None else sort_column
 
     if ai_interviewed_job_id:
-        stmt = (
-            stmt.join(AiInterviewedJob)
-            .where(
-                and_(
-                    AiInterviewedJob.company_id == recruiter_id,
-                    Interview.ai_interviewed_job_id == int(ai_interviewed_job_id),
-                    Interview.status == interview_status if interview_status else True,
-                    Interview.location == location if location else True,
-                )
-            )
-            .limit(int(limit))
-            .offset(int(offset))
-            .order_by(desc(order_column) if sort_order == "desc" else asc(order_column))
-        )
+        filters = [
+            AiInterviewedJob.company_id == recruiter_id,
+            Interview.ai_interviewed_job_id == int(ai_interviewed_job_id),
+            Interview.status == interview_status if interview_status else True,
+            Interview.location == location if location else True,
+        ]
+        stmt = stmt.join(AiInterviewedJob).where(and_(*filters))
         count_stmt = select(func.count(Interview.id).label("count")).where(
-            and_(
-                AiInterviewedJob.company_id == recruiter_id,
-                Interview.ai_interviewed_job_id == int(ai_interviewed_job_id),
-                Interview.status == interview_status if interview_status else True,
-                Interview.location == location if location else True,
-            )
+            and_(*filters)
         )
     else:
+        filters = [
+            Company.id == recruiter_id,
+            Interview.status == interview_status if interview_status else True,
+            Interview.location == location if location else True,
+        ]
         stmt = (
             stmt.join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
             .join(Company, Company.id == AiInterviewedJob.company_id)
-            .where(
-                Company.id == recruiter_id,
-                Interview.status == interview_status if interview_status else True,
-                Interview.location == location if location else True,
-            )
-            .limit(int(limit))
-            .offset(int(offset))
-            .order_by(desc(order_column) if sort_order == "desc" else asc(order_column))
+            .where(*filters)
         )
         count_stmt = (
             select(func.count(Interview.id).label("count"))
             .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
             .join(Company, Company.id == AiInterviewedJob.company_id)
-            .where(
-                and_(
-                    Company.id == recruiter_id,
-                    Interview.status == interview_status if interview_status else True,
-                    Interview.location == location if location else True,
+            .where(and_(*filters))
+        )
+
+    if pagination == "cursor" or cursor:
+        descending = sort_order == "desc"
+        sort_key = f"{sort_by}:{sort_order}"
+        page_stmt = stmt
+        if cursor:
+            page_stmt = page_stmt.where(
+                pagination_lib.after(
+                    sort_column,
+                    Interview.id,
+                    descending,
+                    pagination_lib.decode_cursor(
+                        cursor, sort_key, 1 if sort_column is None else 2
+                    ),
                 )
             )
-        )
-    result = db.execute(stmt)
+        page_stmt = page_stmt.order_by(
+            *pagination_lib.order_by(sort_column, Interview.id, descending)
+        ).limit(int(limit) + 1)
+        interviews = (await db.execute(page_stmt)).scalars().all()
+
+        next_cursor = None
+        if len(interviews) > int(limit):
+            interviews = interviews[: int(limit)]
+            last = interviews[-1]
+            keys = [last.id] if sort_column is None else [getattr(last, sort_column.key), last.id]
+            next_cursor = pagination_lib.encode_cursor(sort_key, keys)
+
+        count = None
+        if include_count:
+            count = (await db.execute(pagination_lib.capped_count(stmt))).scalar()
+        return {"interviews": interviews, "count": count, "next_cursor": next_cursor}
+
+    stmt = (
+        stmt.limit(int(limit))
+        .offset(int(offset))
+        .order_by(desc(order_column) if sort_order == "desc" else asc(order_column))
+    )
+    result = await db.execute(stmt)
     interviews = result.scalars().all()
-    count = db.execute(count_stmt).mappings().one_or_none() or count
+    count = (await db.execute(count_stmt)).mappings().one_or_none() or count
 
     return {"interviews": interviews, "count": count["count"]}
 
 @router.get("/interview-question-and-response")
 async def get_interview_question_and_response(
     interview_id: str,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     stmt = select(InterviewQuestionAndResponse).where(
         InterviewQuestionAndResponse.interview_id == int(interview_id),
     )
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     interview_question_and_response = result.scalars().all()
     return interview_question_and_response
 
 @router.get("/interview")
 async def get_interview_recruiter_view(
     id: str,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     stmt = (
@@ -1407,7 +1394,7 @@ async def get_interview_recruiter_view(
         .where(and_(Interview.id == int(id), Company.id == recruiter_id))
     )
 
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     interview = dict(result.mappings().one())
     if os.path.exists(f"uploads/interview_video/{int(id)}/video.m3u8"):
         interview["video_url"] = (
@@ -1427,7 +1414,7 @@ async def get_interview_recruiter_view(
     stmt = select(InterviewQuestionAndResponse).where(
         InterviewQuestionAndResponse.interview_id == int(id),
     )
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     interview_question_and_responses = result.scalars().all()
     interview["interview_question_and_responses"] = interview_question_and_responses
 
@@ -1442,21 +1429,21 @@ async def get_interview_recruiter_view(
         )
         .where(QuizQuestion.ai_interviewed_job_id == interview["ai_interviewed_job_id"])
     )
-    quiz_responses = db.execute(stmt).scalars().all()
+    quiz_responses = (await db.execute(stmt)).scalars().all()
     quiz_responses = [
-        dict(quiz_response._mapping) for quiz_response in db.execute(stmt).all()
+        dict(quiz_response._mapping) for quiz_response in (await db.execute(stmt)).all()
     ]
     for quiz_response in quiz_responses:
         stmt = select(QuizOption.id, QuizOption.label, QuizOption.correct).where(
             QuizOption.quiz_question_id == quiz_response["id"]
         )
-        options = [option._mapping for option in db.execute(stmt).all()]
+        options = [option._mapping for option in (await db.execute(stmt)).all()]
         quiz_response["options"] = options
         stmt = (
             select(QuizResponse.quiz_option_id)
             .where(QuizResponse.quiz_question_id == quiz_response["id"])
         )
-        selected_options = db.execute(stmt).mappings().all()
+        selected_options = (await db.execute(stmt)).mappings().all()
         quiz_response["selected_options"] = selected_options
 
     interview["quiz_responses"] = quiz_responses
@@ -1475,7 +1462,7 @@ async def get_interview_recruiter_view(
         .join(DSAResponse, DSAResponse.dsa_question_id == DSAQuestion.id)
         .where(DSAResponse.interview_id == int(id))
     )
-    dsa_responses = db.execute(stmt).mappings().all()
+    dsa_responses = (await db.execute(stmt)).mappings().all()
 
     interview["dsa_responses"] = dsa_responses
 
@@ -1484,27 +1471,27 @@ async def get_interview_recruiter_view(
 @router.post("/generate-private-link/{interview_id}")
 async def generate_private_link(
     interview_id: int,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
     stmt = select(Interview).where(Interview.id == interview_id)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     interview = result.scalar_one_or_none()
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
     token = str(uuid.uuid4())
     interview.private_link_token = token
-    db.commit()
+    await db.commit()
     return {"private_link": f"/interview/private/{token}"}
 
 @router.get("/quiz-response")
 async def get_quiz_response_recruiter_view(
     interview_id: str,
     recruiter_id=Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     stmt = select(QuizResponse).where(QuizResponse.interview_id == int(interview_id))
-    responses = db.execute(stmt).scalars().all()
+    responses = (await db.execute(stmt)).scalars().all()
     return [
         {
             "question_id": response.quiz_question_id,
@@ -1516,24 +1503,24 @@ async def get_quiz_response_recruiter_view(
 
 
 @router.post('/job')
-def create_job(job: schemas.JobCreate, db: Session = Depends(database.get_db)):
+async def create_job(job: schemas.JobCreate, db: AsyncSession = Depends(database.get_async_db)):
     db_job = Job(**job.dict())
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
     return db_job
 
 @router.get('/job')
-def get_job(job_id: int = Query(...), db: Session = Depends(database.get_db)):
+async def get_job(job_id: int = Query(...), db: AsyncSession = Depends(database.get_async_db)):
     stmt = select(Job).where(Job.id == job_id)
-    job = db.scalars(stmt).first()
+    job = (await db.scalars(stmt)).first()
     if not job:
         raise HTTPException(status_code=404, detail='Job not found')
     return job
 
 @router.get('/jobs')
-def list_jobs(
-    db: Session = Depends(database.get_db),
+async def list_jobs(
+    db: AsyncSession = Depends(database.get_async_db),
     company_id: int = None,
     search: str = None,
     limit: int = 50,
@@ -1548,7 +1535,7 @@ def list_jobs(
     if filters:
         stmt = stmt.where(*filters)
     stmt = stmt.limit(limit).offset(offset)
-    jobs = db.execute(stmt).scalars().all()
+    jobs = (await db.execute(stmt)).scalars().all()
     return [
         {
             "id": job.id,
@@ -1576,47 +1563,49 @@ def list_jobs(
     ]
 
 @router.put('/job')
-def update_job(job_id: int = Query(...), job: schemas.JobUpdate = None, db: Session = Depends(database.get_db)):
+async def update_job(job_id: int = Query(...), job: schemas.JobUpdate = None, db: AsyncSession = Depends(database.get_async_db)):
     stmt = select(Job).where(Job.id == job_id)
-    db_job = db.scalars(stmt).first()
+    db_job = (await db.scalars(stmt)).first()
     if not db_job:
         raise HTTPException(status_code=404, detail='Job not found')
     for k, v in job.dict(exclude_unset=True).items():
         setattr(db_job, k, v)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    response_cache.job_changed(job_id)
+    await db.refresh(db_job)
     return db_job
 
 @router.delete('/job')
-def delete_job(job_id: int = Query(...), db: Session = Depends(database.get_db)):
+async def delete_job(job_id: int = Query(...), db: AsyncSession = Depends(database.get_async_db)):
     stmt = select(Job).where(Job.id == job_id)
-    db_job = db.scalars(stmt).first()
+    db_job = (await db.scalars(stmt)).first()
     if not db_job:
         raise HTTPException(status_code=404, detail='Job not found')
-    db.delete(db_job)
-    db.commit()
+    await db.delete(db_job)
+    await db.commit()
+    response_cache.job_changed(job_id)
     return {"ok": True}
 
 @router.delete("/interview")
 async def delete_interview(
     id: int,
     recruiter_id: int = Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    rowcount = services.delete_interview(id, recruiter_id, db)
+    rowcount = await services.delete_interview(id, recruiter_id, db)
     if rowcount == 0:
         raise HTTPException(status_code=404, detail="Interview not found or you don't have permission to delete it")
     return {"detail": "Interview deleted successfully"}
 
 @router.get("/job/applications")
-def get_applications_for_job(
+async def get_applications_for_job(
     job_id: int,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     company_id: int = Depends(authorize_company)
 ):
     # Ensure the job belongs to the company
     job_stmt = select(Job).where(Job.id == job_id, Job.company_id == company_id)
-    job_obj = db.scalars(job_stmt).first()
+    job_obj = (await db.scalars(job_stmt)).first()
     if not job_obj:
         raise HTTPException(status_code=404, detail="Job not found or not authorized")
 
@@ -1626,7 +1615,7 @@ def get_applications_for_job(
         .where(JobApplication.job_id == job_id)
         .options(joinedload(JobApplication.job_seeker))
     )
-    applications = db.scalars(stmt).all()
+    applications = (await db.scalars(stmt)).all()
     return [
         {
             "id": app.id,
@@ -1646,9 +1635,9 @@ def get_applications_for_job(
     ]
 
 @router.get("/job/application/candidate")
-def get_candidate_details_for_application(
+async def get_candidate_details_for_application(
     application_id: int,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     company_id: int = Depends(authorize_company)
 ):
     # Fetch the application and join the jobseeker
@@ -1657,7 +1646,7 @@ def get_candidate_details_for_application(
         .where(JobApplication.id == application_id)
         .options(joinedload(JobApplication.job_seeker))
     )
-    app_obj = db.scalars(stmt).first()
+    app_obj = (await db.scalars(stmt)).first()
     if not app_obj:
         raise HTTPException(status_code=404, detail="Application not found")
     # Optionally: check that the job belongs to the company
@@ -1687,10 +1676,10 @@ def get_candidate_details_for_application(
 @router.get("/profile")
 async def get_company_profile(
     company_id: int = Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     stmt = select(Company).where(Company.id == company_id)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     company = result.scalars().first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -1761,7 +1750,7 @@ async def update_company_profile(
     verified: Optional[bool] = Form(None),
     # created_at and updated_at should not be updated by user
     company_id=Depends(authorize_company),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     update_data = {
         "name": name,
@@ -1820,8 +1809,11 @@ async def update_company_profile(
         .where(Company.id == company_id)
         .returning(Company)
     )
-    result = db.execute(stmt)
-    db.commit()
+    result = await db.execute(stmt)
+    await db.commit()
+    response_cache.company_changed(company_id)
+    # Candidate job pages show the company name and logo.
+    response_cache.ai_interviewed_job_changed()
     company = result.scalars().first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -1863,10 +1855,10 @@ async def update_company_profile(
 async def invite_candidates(
     ai_interviewed_job_id: int,
     invite_data: CandidateInviteRequest,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     recruiter_id=Depends(authorize_company),
 ):
-    job = db.execute(select(AiInterviewedJob).where(AiInterviewedJob.id == ai_interviewed_job_id, AiInterviewedJob.company_id == recruiter_id)).scalar_one_or_none()
+    job = (await db.execute(select(AiInterviewedJob).where(AiInterviewedJob.id == ai_interviewed_job_id, AiInterviewedJob.company_id == recruiter_id))).scalar_one_or_none()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found or unauthorized")
 
@@ -1876,12 +1868,12 @@ async def invite_candidates(
         firstname = candidate.get("firstname", "Candidate")
         lastname = candidate.get("lastname", "")
         # Check if interview already exists for this job and email
-        interview = db.execute(
+        interview = (await db.execute(
             select(Interview).where(
                 Interview.email == email,
                 Interview.ai_interviewed_job_id == ai_interviewed_job_id
             )
-        ).scalar_one_or_none()
+        )).scalar_one_or_none()
         if not interview:
             token = str(uuid.uuid4())
             interview = Interview(
@@ -1892,13 +1884,15 @@ async def invite_candidates(
                 private_link_token=token
             )
             db.add(interview)
-            db.commit()
-            db.refresh(interview)
+            await db.flush()
+            await db.execute(company_stats.interview_created(interview.id))
+            await db.commit()
+            await db.refresh(interview)
         else:
             # If already exists, update the token
             interview.private_link_token = str(uuid.uuid4())
-            db.commit()
-            db.refresh(interview)
+            await db.commit()
+            await db.refresh(interview)
         # Always use the value from the DB
         private_link = f"{config.settings.FRONTEND_URL}/interview/private/{interview.private_link_token}"
         html_content = f"""
@@ -1916,16 +1910,7 @@ async def invite_candidates(
             <p>💼 Contact us: contact@edudiagno.com</p>
         """
         try:
-            send_smtp_email = brevo.brevo_python.SendSmtpEmail(
-                sender={
-                    "name": config.settings.MAIL_SENDER_NAME,
-                    "email": config.settings.MAIL_SENDER_EMAIL,
-                },
-                to=[{"email": email}],
-                html_content=html_content,
-                subject=f"Interview Invitation for {job.title}",
-            )
-            brevo.api_instance.send_transac_email(send_smtp_email)
+            brevo.send_email(email, f"Interview Invitation for {job.title}", html_content)
             sent_links.append({"email": email, "link": private_link, "status": "sent"})
         except Exception as e:
             sent_links.append({"email": email, "link": private_link, "status": f"failed: {str(e)}"})
@@ -1,13 +1,15 @@
 from sqlalchemy import delete, insert, select, update
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import schemas
+from app.interview import question_audio
 from app.models import InterviewQuestion, Interview
 from app.models import AiInterviewedJob
+from app.services import company_stats, response_cache
 
 
-def create_interview_question(
-    question_data: schemas.CreateInterviewQuestion, db: Session
+async def create_interview_question(
+    question_data: schemas.CreateInterviewQuestion, db: AsyncSession
 ):
     stmt = (
         insert(InterviewQuestion)
@@ -20,12 +22,14 @@ def create_interview_question(
             InterviewQuestion.question_type,
         )
     )
-    result = db.execute(stmt)
-    db.commit()
-    return result.mappings().one()
+    question = (await db.execute(stmt)).mappings().one()
+    await db.commit()
+    response_cache.interview_questions_changed(question_data.ai_interviewed_job_id)
+    question_audio.queue_custom(question.id, question.question, question.ai_interviewed_job_id)
+    return question
 
 
-def get_interview_question_by_job_id(ai_interviewed_job_id: int, db: Session):
+async def get_interview_question_by_job_id(ai_interviewed_job_id: int, db: AsyncSession):
     stmt = (
         select(
             InterviewQuestion.id,
@@ -33,35 +37,60 @@ def get_interview_question_by_job_id(ai_interviewed_job_id: int, db: Session):
             InterviewQuestion.question_type,
             InterviewQuestion.order_number,
             InterviewQuestion.ai_interviewed_job_id,
+            InterviewQuestion.audio_url,
         )
         .where(InterviewQuestion.ai_interviewed_job_id == ai_interviewed_job_id)
         .order_by(InterviewQuestion.order_number)
     )
 
-    return db.execute(stmt).mappings().all()
+    return (await db.execute(stmt)).mappings().all()
 
 
-def update_interview_question(
-    question_data: schemas.UpdateInterviewQuestion, db: Session
+async def update_interview_question(
+    question_data: schemas.UpdateInterviewQuestion, db: AsyncSession
 ):
+    values = question_data.model_dump(exclude_unset=True)
+    if "question" in values:
+        # The old audio is of the old text
+        values["audio_url"] = None
     stmt = (
         update(InterviewQuestion)
         .where(InterviewQuestion.id == question_data.id)
-        .values(question_data.model_dump(exclude_unset=True))
+        .values(values)
+        .returning(InterviewQuestion.ai_interviewed_job_id)
     )
-    db.execute(stmt)
-    db.commit()
+    job_ids = (await db.execute(stmt)).scalars().all()
+    await db.commit()
+    for job_id in job_ids:
+        response_cache.interview_questions_changed(job_id)
+        if "question" in values:
+            question_audio.queue_custom(question_data.id, values["question"], job_id)
     return
 
 
-def delete_interview_question(id: int, db: Session):
-    stmt = delete(InterviewQuestion).where(InterviewQuestion.id == id)
-    db.execute(stmt)
-    db.commit()
+async def delete_interview_question(id: int, db: AsyncSession):
+    stmt = (
+        delete(InterviewQuestion)
+        .where(InterviewQuestion.id == id)
+        .returning(InterviewQuestion.ai_interviewed_job_id)
+    )
+    job_ids = (await db.execute(stmt)).scalars().all()
+    await db.commit()
+    for job_id in job_ids:
+        response_cache.interview_questions_changed(job_id)
     return
 
 
-def delete_interview(id: int, company_id: int, db: Session):
+async def delete_interview(id: int, company_id: int, db: AsyncSession):
+    owned = (
+        await db.execute(
+            select(Interview.id)
+            .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
+            .where(Interview.id == id, AiInterviewedJob.company_id == company_id)
+        )
+    ).scalar()
+    if owned:
+        await db.execute(company_stats.interview_deleted(id))
     stmt = (
         delete(Interview)
         .where(
@@ -72,6 +101,6 @@ def delete_interview(id: int, company_id: int, db: Session):
             ).scalar_subquery()
         )
     )
-    result = db.execute(stmt)
-    db.commit()
+    result = await db.execute(stmt)
+    await db.commit()
     return result.rowcount
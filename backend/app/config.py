@@ -6,6 +6,20 @@ load_dotenv()
 
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL")
+    # Optional read replica for read-only routes; unset means reads use the primary
+    READ_DATABASE_URL: str = os.getenv("READ_DATABASE_URL")
+    ASYNC_READ_DATABASE_URL: str = os.getenv("ASYNC_READ_DATABASE_URL")
+
+    # Connection pool settings, applied per engine (and so per worker process)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: int = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # 0 disables the server-side statement timeout
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
     URL: str = os.getenv("URL")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-keep-it-secret")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
@@ -21,7 +35,18 @@ class Settings:
 
     # OpenAI Settings
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    # Unset means api.openai.com; point at benchmarks/fake_openai.py for load tests
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL")
     FERMION_API_KEY: str = os.getenv("FERMION_API_KEY", "")
+    # Where DSA submissions run: "remote" (codedamn/Fermion, needs
+    # FERMION_API_KEY and a public URL for callbacks) or "local" (see
+    # app/interview/dsa_execution.py)
+    DSA_EXECUTOR: str = os.getenv("DSA_EXECUTOR", "remote")
+    # Test cases run at once by the local executor, per worker
+    DSA_LOCAL_WORKERS: int = int(os.getenv("DSA_LOCAL_WORKERS", str(os.cpu_count() or 2)))
+    # User (name or uid) the local executor runs programs as, so their process
+    # cap is exact; needs the app to run as root. Empty: the app's own user
+    DSA_SANDBOX_USER: str = os.getenv("DSA_SANDBOX_USER", "")
     BREVO_API_KEY: str = os.getenv("BREVO_API_KEY")
     MAIL_SENDER_NAME: str = os.getenv("MAIL_SENDER_NAME")
     MAIL_SENDER_EMAIL: str = os.getenv("MAIL_SENDER_EMAIL")
@@ -34,5 +59,77 @@ class Settings:
 
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:8080")
 
+    # Run app.bootstrap (create_all + default admin) when the app starts
+    BOOTSTRAP_ON_STARTUP: bool = os.getenv("BOOTSTRAP_ON_STARTUP", "false").lower() == "true"
+
+    # In-process caches for hot public reads (see app/services/response_cache.py)
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+
+    # Cache for deterministic OpenAI calls: "memory", "postgres" or "none"
+    LLM_CACHE_BACKEND: str = os.getenv("LLM_CACHE_BACKEND", "memory")
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "604800"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+
+    # Synthesized speech cache (see app/services/speech_cache.py):
+    # "memory", "gcs" (GCS_BUCKET_NAME, shared by all workers) or "none"
+    SPEECH_CACHE_BACKEND: str = os.getenv("SPEECH_CACHE_BACKEND", "memory")
+    # Memory backend only (expire GCS objects with a bucket lifecycle rule);
+    # a spoken question is ~50-150 KB
+    SPEECH_CACHE_TTL_SECONDS: int = int(os.getenv("SPEECH_CACHE_TTL_SECONDS", "604800"))
+    SPEECH_CACHE_MAX_ENTRIES: int = int(os.getenv("SPEECH_CACHE_MAX_ENTRIES", "200"))
+
+    # Recordings shrunk by ffmpeg before /speech-to-text sends them to Whisper
+    # (see app/services/audio_normalize.py)
+    AUDIO_NORMALIZE_ENABLED: bool = os.getenv("AUDIO_NORMALIZE_ENABLED", "true").lower() == "true"
+    # ffmpeg runs at once, per worker
+    AUDIO_NORMALIZE_WORKERS: int = int(os.getenv("AUDIO_NORMALIZE_WORKERS", str(os.cpu_count() or 2)))
+
+    # Question generation (see app/interview/services.py) renews its lease with
+    # every saved question; one not renewed within this long belongs to a worker
+    # that died, and the next request for the questions takes it over
+    QUESTION_GENERATION_LEASE_SECONDS: int = int(os.getenv("QUESTION_GENERATION_LEASE_SECONDS", "60"))
+    # Resume analysis is one LLM call (with the gateway's retries); requests on
+    # other workers wait for it this long before starting their own
+    RESUME_ANALYSIS_LEASE_SECONDS: int = int(os.getenv("RESUME_ANALYSIS_LEASE_SECONDS", "180"))
+
+    # Questions synthesized to GCS_BUCKET_NAME as they are saved
+    # (see app/interview/question_audio.py)
+    QUESTION_AUDIO_ENABLED: bool = os.getenv("QUESTION_AUDIO_ENABLED", "true").lower() == "true"
+    QUESTION_AUDIO_CONCURRENCY: int = int(os.getenv("QUESTION_AUDIO_CONCURRENCY", "4"))
+
+    # OpenAI gateway limits, per worker (see app/services/llm_gateway.py)
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+    # JSON object of per-model {"concurrency", "rpm", "tpm"} overrides
+    LLM_MODEL_LIMITS: str = os.getenv("LLM_MODEL_LIMITS", "")
+    # Deadline for a whole call: queueing, retries and the response
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_RETRY_BASE_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+    LLM_RETRY_MAX_SECONDS: float = float(os.getenv("LLM_RETRY_MAX_SECONDS", "8"))
+
+    # Background interview reports (see app/interview/report_jobs.py)
+    REPORT_WORKER_ENABLED: bool = os.getenv("REPORT_WORKER_ENABLED", "true").lower() == "true"
+    REPORT_JOB_CONCURRENCY: int = int(os.getenv("REPORT_JOB_CONCURRENCY", "4"))
+    REPORT_JOB_MAX_ATTEMPTS: int = int(os.getenv("REPORT_JOB_MAX_ATTEMPTS", "5"))
+    # A running job not renewed within this long is taken over by another worker
+    REPORT_JOB_LEASE_SECONDS: int = int(os.getenv("REPORT_JOB_LEASE_SECONDS", "300"))
+
+    # Answers scored as they are submitted, so the report only has to sum up
+    # (see app/interview/answer_scoring.py)
+    ANSWER_SCORING_ENABLED: bool = os.getenv("ANSWER_SCORING_ENABLED", "true").lower() == "true"
+    # LLM calls in flight per worker
+    ANSWER_SCORING_CONCURRENCY: int = int(os.getenv("ANSWER_SCORING_CONCURRENCY", "4"))
+
+    # Bulk resume re-scoring (see app/company/rescore_jobs.py)
+    RESCORE_WORKER_ENABLED: bool = os.getenv("RESCORE_WORKER_ENABLED", "true").lower() == "true"
+    # Interviews fetched, scored and written back per round trip
+    RESCORE_BATCH_SIZE: int = int(os.getenv("RESCORE_BATCH_SIZE", "50"))
+    # LLM calls in flight per job; the gateway's model limits still apply
+    RESCORE_CONCURRENCY: int = int(os.getenv("RESCORE_CONCURRENCY", "8"))
+    RESCORE_JOB_MAX_ATTEMPTS: int = int(os.getenv("RESCORE_JOB_MAX_ATTEMPTS", "5"))
+    # Renewed after every batch; a job not renewed within this long is taken
+    # over by another worker
+    RESCORE_JOB_LEASE_SECONDS: int = int(os.getenv("RESCORE_JOB_LEASE_SECONDS", "600"))
+
 
 settings = Settings()
@@ -1,13 +1,24 @@
-import brevo_python
-from brevo_python.rest import ApiException
-import os
 from app import config
+from app.configs import registry
 
-configuration = brevo_python.Configuration()
-configuration.api_key["api-key"] = config.settings.BREVO_API_KEY
-configuration.api_key["partner-key"] = config.settings.BREVO_API_KEY
-configuration.host = "https://api.brevo.com/v3"
 
-api_instance = brevo_python.TransactionalEmailsApi(
-    brevo_python.ApiClient(configuration)
-)
+def _build_api_instance():
+    import brevo_python
+
+    configuration = brevo_python.Configuration()
+    configuration.api_key["api-key"] = config.settings.BREVO_API_KEY
+    configuration.api_key["partner-key"] = config.settings.BREVO_API_KEY
+    configuration.host = "https://api.brevo.com/v3"
+
+    return brevo_python.TransactionalEmailsApi(
+        brevo_python.ApiClient(configuration)
+    )
+
+
+registry.register("brevo", _build_api_instance)
+
+
+def __getattr__(name):
+    if name == "api_instance":
+        return registry.get("brevo")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
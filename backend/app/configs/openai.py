@@ -1,10 +1,30 @@
-import httpx
-import openai
+import logging
 
 from app.config import settings
+from app.configs import registry
 
+logger = logging.getLogger(__name__)
 
-client = openai.AsyncOpenAI(
-    api_key=settings.OPENAI_API_KEY, http_client=httpx.AsyncClient()
-)
-print("OpenAI client initialized successfully")
+
+def _build_client():
+    import httpx
+    import openai
+
+    # Retries and timeouts are handled by app.services.llm_gateway.
+    client = openai.AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        http_client=httpx.AsyncClient(),
+        max_retries=0,
+    )
+    logger.info("OpenAI client initialized successfully")
+    return client
+
+
+registry.register("openai", _build_client)
+
+
+def __getattr__(name):
+    if name == "client":
+        return registry.get("openai")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
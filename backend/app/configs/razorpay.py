@@ -1,7 +1,19 @@
-import razorpay
-
 from app import config
+from app.configs import registry
+
+
+def _build_client():
+    import razorpay
+
+    return razorpay.Client(
+        auth=(config.settings.RAZORPAY_KEY_ID, config.settings.RAZORPAY_KEY_SECRET)
+    )
+
+
+registry.register("razorpay", _build_client)
+
 
-razorpay_client = razorpay.Client(
-    auth=(config.settings.RAZORPAY_KEY_ID, config.settings.RAZORPAY_KEY_SECRET)
-)
+def __getattr__(name):
+    if name == "razorpay_client":
+        return registry.get("razorpay")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,40 @@
+"""Lazily built third-party clients.
+
+Each client module registers a factory here; the client is built on first
+use and then shared by the whole process, so importing the app never opens
+network connections or reads credentials.
+"""
+
+import threading
+
+_factories = {}
+_clients = {}
+_lock = threading.Lock()
+
+
+def register(name, factory):
+    _factories[name] = factory
+
+
+def get(name):
+    try:
+        return _clients[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _clients:
+            _clients[name] = _factories[name]()
+        return _clients[name]
+
+
+def is_initialized(name):
+    return name in _clients
+
+
+def reset(name=None):
+    """Drop built clients (all of them, or just `name`) so the next use rebuilds."""
+    with _lock:
+        if name is None:
+            _clients.clear()
+        else:
+            _clients.pop(name, None)
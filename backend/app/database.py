@@ -1,20 +1,253 @@
+import logging
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import re
+import time
+from sqlalchemy import TextClause, create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app import config
 
-DATABASE_URL = config.settings.DATABASE_URL
+logger = logging.getLogger(__name__)
 
-engine = create_engine(DATABASE_URL)
+settings = config.settings
+
+DATABASE_URL = settings.DATABASE_URL
+
+# The async engine talks to the same database through asyncpg. It can be
+# pointed elsewhere with ASYNC_DATABASE_URL (e.g. when the sync URL carries
+# psycopg2-only query parameters).
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or make_url(
+    DATABASE_URL
+).set(drivername="postgresql+asyncpg")
+
+READ_DATABASE_URL = settings.READ_DATABASE_URL
+ASYNC_READ_DATABASE_URL = settings.ASYNC_READ_DATABASE_URL or (
+    READ_DATABASE_URL
+    and make_url(READ_DATABASE_URL).set(drivername="postgresql+asyncpg")
+)
+
+
+class _MeteredPoolMixin:
+    """Records how long callers wait to check a connection out of the pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        self.checkouts += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return connection
+
+    def stats(self):
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": (
+                round(self.total_wait_seconds / self.checkouts * 1000, 3)
+                if self.checkouts
+                else 0.0
+            ),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+        }
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncAdaptedQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options():
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _server_settings(read_only=False):
+    server_settings = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    if read_only:
+        # The replica's connections can't write whatever the statement is.
+        server_settings["default_transaction_read_only"] = "on"
+    return server_settings
+
+
+def _sync_connect_args(read_only=False):
+    server_settings = _server_settings(read_only)
+    if not server_settings:
+        return {}
+    return {"options": " ".join(f"-c {k}={v}" for k, v in server_settings.items())}
+
+
+def _async_connect_args(read_only=False):
+    server_settings = _server_settings(read_only)
+    if not server_settings:
+        return {}
+    return {"server_settings": server_settings}
+
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=MeteredQueuePool,
+    connect_args=_sync_connect_args(),
+    **_pool_options(),
+)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=MeteredAsyncAdaptedQueuePool,
+    connect_args=_async_connect_args(),
+    **_pool_options(),
+)
+# expire_on_commit is off because async sessions cannot lazy-load expired
+# attributes; routes read ORM objects after committing them.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+if READ_DATABASE_URL:
+    read_engine = create_engine(
+        READ_DATABASE_URL,
+        poolclass=MeteredQueuePool,
+        connect_args=_sync_connect_args(read_only=True),
+        **_pool_options(),
+    )
+    async_read_engine = create_async_engine(
+        ASYNC_READ_DATABASE_URL,
+        poolclass=MeteredAsyncAdaptedQueuePool,
+        connect_args=_async_connect_args(read_only=True),
+        **_pool_options(),
+    )
+else:
+    read_engine = engine
+    async_read_engine = async_engine
+
+
+class ReadOnlySessionError(exc.InvalidRequestError):
+    pass
+
+
+class ReadOnlySession(Session):
+    """Session handed out by the read dependencies; refuses to write."""
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _reject_flush(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        raise ReadOnlySessionError("Cannot flush changes on a read-only session")
+
+
+# Raw SQL a read session may run. The read falls back to the primary when
+# the replica is down, so this can't be left to the replica alone.
+_READ_SQL = re.compile(r"\s*(select|with|show|explain|values|table)\b", re.IGNORECASE)
+
+
+@event.listens_for(ReadOnlySession, "do_orm_execute")
+def _reject_dml(orm_execute_state):
+    statement = orm_execute_state.statement
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+        or (isinstance(statement, TextClause) and not _READ_SQL.match(statement.text))
+    ):
+        raise ReadOnlySessionError("Cannot run DML on a read-only session")
+
+
+ReadSessionLocal = sessionmaker(
+    bind=read_engine, class_=ReadOnlySession, autocommit=False, autoflush=False
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    sync_session_class=ReadOnlySession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 
+def pool_stats():
+    """Pool usage of this worker process, keyed by engine."""
+    stats = {
+        "pid": os.getpid(),
+        "sync": engine.pool.stats(),
+        "async": async_engine.pool.stats(),
+    }
+    if READ_DATABASE_URL:
+        stats["read_sync"] = read_engine.pool.stats()
+        stats["read_async"] = async_read_engine.pool.stats()
+    return stats
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    """Session for read-only routes: the replica if configured and reachable,
+    otherwise the primary. Writes are rejected either way."""
+    db = ReadSessionLocal()
+    try:
+        if read_engine is not engine:
+            try:
+                db.connection()
+            except exc.OperationalError as e:
+                logger.warning(f"Read replica unavailable, using primary: {e}")
+                db.close()
+                db = ReadSessionLocal(bind=engine)
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    db = AsyncReadSessionLocal()
+    try:
+        if async_read_engine is not async_engine:
+            try:
+                await db.connection()
+            except (exc.DBAPIError, OSError) as e:
+                logger.warning(f"Read replica unavailable, using primary: {e}")
+                await db.close()
+                db = AsyncReadSessionLocal(bind=async_engine)
+        yield db
+    finally:
+        await db.close()
@@ -0,0 +1,382 @@
+"""Interview answers scored one at a time, while the interview goes on.
+
+Each answer submitted through /interview-question/submit-text-response or
+/interview-question-response is scored in the background as soon as it is
+saved: a small LLM call that sees just the question, the answer and the job,
+and stores a score, a per-category breakdown, a line of evidence and
+keywords in the row's `evaluation`.
+
+By the time the report is generated, the analyze stage only has to
+`evaluate_interview()` (scoring whatever is still missing, or waiting for
+what is in flight), `aggregate()` the stored scores, and ask the LLM for the
+written feedback from the per-question notes, a prompt a fraction of the
+size of the whole transcript.
+
+Per worker: an answer scored on another worker is simply scored again here
+if the report gets there first; the update only fills evaluations that are
+still empty.
+"""
+
+import asyncio
+import json
+import logging
+from collections import Counter, defaultdict
+
+from sqlalchemy import select, update
+
+from app import database
+from app.config import settings
+from app.models import (
+    AiInterviewedJob,
+    Interview,
+    InterviewQuestion,
+    InterviewQuestionAndResponse,
+    InterviewQuestionResponse,
+)
+from app.services import llm_cache, llm_gateway, prompt_budget
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ["technicalSkills", "communication", "problemSolving", "culturalFit"]
+MAX_KEYWORDS = 15
+
+_slots = asyncio.Semaphore(settings.ANSWER_SCORING_CONCURRENCY)
+# Scoring queued or in flight, by answer, so each is scored once and the tasks
+# stay referenced until they finish.
+_pending = {}
+
+
+def _score_value(value):
+    if value is None:
+        return None
+    return max(0, min(100, int(round(float(value)))))
+
+
+async def score_answer(question: str, question_type: str, answer: str, description: str, requirements: str) -> dict:
+    """The LLM's evaluation of one answer."""
+    sections = prompt_budget.fit(
+        "score_answer",
+        "gpt-3.5-turbo",
+        answer=answer,
+        description=description,
+        requirements=requirements,
+    )
+
+    prompt = f"""You are evaluating one answer from a job interview. Be strict and fair — do not assign points unless the answer clearly earns them.
+
+Question ({question_type}): {question}
+
+Candidate's answer:
+{sections["answer"]}
+
+Job Description:
+{sections["description"]}
+
+Job Requirements:
+{sections["requirements"]}
+
+Return ONLY a JSON object in the following format:
+{{
+    "score": number between 0 and 100 for this answer,
+    "scoreBreakdown": {{
+        "technicalSkills": number between 0 and 100, or null if this answer says nothing about it,
+        "communication": number between 0 and 100, or null,
+        "problemSolving": number between 0 and 100, or null,
+        "culturalFit": number between 0 and 100, or null
+    }},
+    "notes": "One or two sentences for the recruiter: what the answer showed or failed to show, quoting it where useful",
+    "keywords": [
+        {{
+            "term": "string",
+            "count": number,
+            "sentiment": "positive" | "neutral" | "negative"
+        }}
+    ]
+}}
+
+Important:
+- Minimal or irrelevant answers (e.g. "yes", "no", "hello", "I don't know") score near 0
+- Base every score on what the answer actually says, not on what the candidate might know
+- Keywords must be pulled from the answer
+"""
+
+    content = await llm_cache.complete(
+        "score_answer",
+        model="gpt-3.5-turbo",
+        messages=[
+            {
+                "role": "system",
+                "content": "You are an expert interviewer and evaluator. You must return a valid JSON object.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.1,
+        response_format={"type": "json_object"},
+    )
+
+    try:
+        evaluation = json.loads(content)
+        breakdown = evaluation.get("scoreBreakdown") or {}
+        return {
+            "score": _score_value(evaluation["score"]),
+            "scoreBreakdown": {category: _score_value(breakdown.get(category)) for category in CATEGORIES},
+            "notes": str(evaluation.get("notes") or ""),
+            "keywords": [
+                keyword
+                for keyword in evaluation.get("keywords") or []
+                if isinstance(keyword, dict) and keyword.get("term")
+            ],
+        }
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Malformed answer evaluation {content[:200]!r}") from e
+
+
+def _generated_answers():
+    return (
+        select(
+            InterviewQuestionAndResponse.interview_id,
+            InterviewQuestionAndResponse.order_number,
+            InterviewQuestionAndResponse.question,
+            InterviewQuestionAndResponse.question_type,
+            InterviewQuestionAndResponse.answer,
+            InterviewQuestionAndResponse.evaluation,
+            AiInterviewedJob.description,
+            AiInterviewedJob.requirements,
+        )
+        .join(Interview, Interview.id == InterviewQuestionAndResponse.interview_id)
+        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
+        .where(InterviewQuestionAndResponse.answer.is_not(None))
+        .order_by(InterviewQuestionAndResponse.order_number)
+    )
+
+
+def _custom_answers():
+    return (
+        select(
+            InterviewQuestionResponse.id,
+            InterviewQuestionResponse.interview_id,
+            InterviewQuestion.question,
+            InterviewQuestion.question_type,
+            InterviewQuestionResponse.answer,
+            InterviewQuestionResponse.evaluation,
+            AiInterviewedJob.description,
+            AiInterviewedJob.requirements,
+        )
+        .join(InterviewQuestion, InterviewQuestion.id == InterviewQuestionResponse.interview_question_id)
+        .join(Interview, Interview.id == InterviewQuestionResponse.interview_id)
+        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
+        .where(InterviewQuestionResponse.answer.is_not(None))
+        .order_by(InterviewQuestion.order_number, InterviewQuestionResponse.id)
+    )
+
+
+async def _score(row, stmt):
+    async with _slots:
+        evaluation = await score_answer(
+            row.question, row.question_type, row.answer, row.description, row.requirements
+        )
+    async with database.AsyncSessionLocal() as db:
+        await db.execute(stmt.values(evaluation=evaluation))
+        await db.commit()
+    return evaluation
+
+
+def _logged(task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Could not score an answer: {task.exception()!r}")
+
+
+def _spawn(key, work):
+    task = _pending.get(key)
+    if task is None:
+        task = asyncio.create_task(work())
+        _pending[key] = task
+        task.add_done_callback(lambda _: _pending.pop(key, None))
+        task.add_done_callback(_logged)
+    return task
+
+
+def _score_generated(row):
+    stmt = update(InterviewQuestionAndResponse).where(
+        InterviewQuestionAndResponse.interview_id == row.interview_id,
+        InterviewQuestionAndResponse.order_number == row.order_number,
+        InterviewQuestionAndResponse.evaluation.is_(None),
+    )
+    return _spawn(("generated", row.interview_id, row.order_number), lambda: _score(row, stmt))
+
+
+def _score_custom(row):
+    stmt = update(InterviewQuestionResponse).where(
+        InterviewQuestionResponse.id == row.id, InterviewQuestionResponse.evaluation.is_(None)
+    )
+    return _spawn(("custom", row.id), lambda: _score(row, stmt))
+
+
+async def _queue(stmt, score):
+    async with database.AsyncSessionLocal() as db:
+        row = (await db.execute(stmt)).first()
+    if row is not None and row.evaluation is None and row.answer.strip():
+        score(row)
+
+
+def queue_generated(interview_id: int, order_number: int):
+    """Score the answer to a generated question in the background."""
+    if not settings.ANSWER_SCORING_ENABLED:
+        return
+    stmt = _generated_answers().where(
+        InterviewQuestionAndResponse.interview_id == interview_id,
+        InterviewQuestionAndResponse.order_number == order_number,
+    )
+    _spawn(("queue", "generated", interview_id, order_number), lambda: _queue(stmt, _score_generated))
+
+
+def queue_custom(response_id: int):
+    """Score the answer to a custom question in the background."""
+    if not settings.ANSWER_SCORING_ENABLED:
+        return
+    stmt = _custom_answers().where(InterviewQuestionResponse.id == response_id)
+    _spawn(("queue", "custom", response_id), lambda: _queue(stmt, _score_custom))
+
+
+async def evaluate_interview(db, interview_id: int) -> list:
+    """Every answer of the interview with its evaluation, in question order,
+    scoring the ones that are still missing.
+
+    An answer that cannot be scored (the call failed, or the reply was
+    malformed) is logged and left out; it is scored again next time. Empty
+    when none could be, so the report falls back to the whole transcript."""
+    generated = (
+        await db.execute(_generated_answers().where(InterviewQuestionAndResponse.interview_id == interview_id))
+    ).all()
+    custom = (
+        await db.execute(_custom_answers().where(InterviewQuestionResponse.interview_id == interview_id))
+    ).all()
+
+    answers, missing = [], []
+    for rows, score in [(generated, _score_generated), (custom, _score_custom)]:
+        for row in rows:
+            if not row.answer.strip():
+                continue
+            answer = {
+                "question": row.question,
+                "question_type": row.question_type,
+                "answer": row.answer,
+                "evaluation": row.evaluation,
+            }
+            answers.append(answer)
+            if row.evaluation is None:
+                missing.append((answer, score(row)))
+
+    evaluations = await asyncio.gather(*(task for _, task in missing), return_exceptions=True)
+    for (answer, _), evaluation in zip(missing, evaluations):
+        if isinstance(evaluation, BaseException):
+            logger.warning(f"Leaving an answer of interview {interview_id} out of its report: {evaluation!r}")
+        else:
+            answer["evaluation"] = evaluation
+    return [answer for answer in answers if answer["evaluation"] is not None]
+
+
+def aggregate(answers: list) -> dict:
+    """Interview scores from the per-answer ones: the mean score, the mean of
+    each category over the answers that showed it (0 when none did), and the
+    keywords merged."""
+    evaluations = [answer["evaluation"] for answer in answers]
+    breakdown = {}
+    for category in CATEGORIES:
+        scores = [
+            e["scoreBreakdown"][category]
+            for e in evaluations
+            if e["scoreBreakdown"].get(category) is not None
+        ]
+        breakdown[category] = round(sum(scores) / len(scores)) if scores else 0
+
+    counts = Counter()
+    sentiments = defaultdict(Counter)
+    for evaluation in evaluations:
+        for keyword in evaluation["keywords"]:
+            term = str(keyword["term"]).strip().lower()
+            count = keyword.get("count") if isinstance(keyword.get("count"), int) else 1
+            counts[term] += count
+            sentiments[term][keyword.get("sentiment") or "neutral"] += count
+
+    return {
+        "score": round(sum(e["score"] for e in evaluations) / len(evaluations)),
+        "scoreBreakdown": breakdown,
+        "keywords": [
+            {"term": term, "count": count, "sentiment": sentiments[term].most_common(1)[0][0]}
+            for term, count in counts.most_common(MAX_KEYWORDS)
+        ],
+    }
+
+
+async def summarize(answers: list, title: str, description: str, requirements: str) -> dict:
+    """The interview's evaluation, in the shape report_jobs stores, from the
+    per-answer evaluations."""
+    scores = aggregate(answers)
+    per_question = "\n\n".join(
+        f"Q{i} ({answer['question_type']}): {answer['question']}\n"
+        f"Score: {answer['evaluation']['score']}. {answer['evaluation']['notes']}"
+        for i, answer in enumerate(answers, 1)
+    )
+    sections = prompt_budget.fit(
+        "summarize_interview",
+        "gpt-3.5-turbo",
+        per_question=per_question,
+        description=description,
+        requirements=requirements,
+    )
+
+    prompt = f"""You are writing up a job interview for the position of {title}. Every answer has already been scored; the interview scores are:
+
+Overall: {scores["score"]}
+Technical skills: {scores["scoreBreakdown"]["technicalSkills"]}
+Communication: {scores["scoreBreakdown"]["communication"]}
+Problem solving: {scores["scoreBreakdown"]["problemSolving"]}
+Cultural fit: {scores["scoreBreakdown"]["culturalFit"]}
+
+Per question:
+{sections["per_question"]}
+
+Job Description:
+{sections["description"]}
+
+Job Requirements:
+{sections["requirements"]}
+
+Return ONLY a JSON object in the following format:
+{{
+    "feedback_for_candidate": "Detailed, specific feedback on their performance, mentioning what they did well or poorly",
+    "feedback_for_recruiter": "Detailed evaluation of the candidate's responses. Explain whether the candidate is suitable, why or why not, and which areas were lacking or strong.",
+    "suggestions": [
+        "Each item must be a concrete, actionable suggestion for the candidate"
+    ]
+}}
+
+Important:
+- Be consistent with the scores above; do not re-score
+- Support the feedback with examples from the per-question notes
+- Suggestions must be tailored to what the candidate actually said or failed to say
+"""
+
+    response = await llm_gateway.chat(
+        "summarize_interview",
+        deadline=60,
+        model="gpt-3.5-turbo",
+        messages=[
+            {
+                "role": "system",
+                "content": "You are an expert interviewer and evaluator. Provide detailed, constructive feedback.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.1,
+        response_format={"type": "json_object"},
+    )
+
+    summary = json.loads(response.choices[0].message.content)
+    return {
+        "feedback_for_candidate": summary["feedback_for_candidate"],
+        "feedback_for_recruiter": summary["feedback_for_recruiter"],
+        "suggestions": summary.get("suggestions") or [],
+        **scores,
+    }
@@ -0,0 +1,440 @@
+"""Running DSA submissions against their test cases.
+
+POST /interview/dsa-response hands the code and test cases to the executor
+picked by DSA_EXECUTOR:
+
+- "remote" (default): codedamn/Fermion's batch API. Each test case becomes a
+  task that reports back to POST /interview/dsa-response/callback.
+- "local": the code is compiled once and each test case is run in a
+  subprocess under rlimits (app/lib/sandbox.py), DSA_LOCAL_WORKERS at a time
+  in a process pool. No queueing on someone else's servers, and no network
+  needed, which makes the DSA flow testable offline. Caps CPU, memory, file
+  size and processes like the remote run config, but does not isolate the
+  program from the host; only run it where candidates' code may read what
+  the app's user can.
+
+Either way every test case is first saved as a pending
+dsa_test_case_responses row under its task id, and every result goes through
+`record_result()` in the callback's payload format, which stores it and
+pushes it to the candidate over the interview websocket.
+"""
+
+import asyncio
+import base64
+import functools
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app import database
+from app.config import settings
+from app.interview.services import interview_connection_manager
+from app.lib import sandbox
+from app.models import DSAResponse, DSATestCase, DSATestCaseResponse, Interview
+
+logger = logging.getLogger(__name__)
+
+# Per test case, for both executors.
+CPU_TIME_LIMIT_MS = 2000
+WALL_TIME_LIMIT_MS = 5000
+MEMORY_LIMIT_KB = 131072
+FILE_SIZE_LIMIT_KB = 1024
+STACK_SIZE_LIMIT_KB = 65536
+MAX_PROCESSES = 60
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+async def _save_pending(db, dsa_response_id, test_cases, task_ids):
+    stmt = insert(DSATestCaseResponse).values(
+        [
+            {
+                "status": "pending",
+                "dsa_response_id": dsa_response_id,
+                "task_id": task_id,
+                "dsa_test_case_id": test_case["id"],
+            }
+            for test_case, task_id in zip(test_cases, task_ids)
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["dsa_response_id", "dsa_test_case_id"],
+        set_={"status": "pending", "task_id": stmt.excluded.task_id},
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+class RemoteExecutor:
+    url = "https://backend.codedamn.com/api/public/request-dsa-code-execution-batch"
+
+    async def submit(self, db, dsa_response_id, language, code, test_cases):
+        entries = []
+        for test_case in test_cases:
+            entries.append(
+                {
+                    "language": language,
+                    "runConfig": {
+                        "customMatcherToUseForExpectedOutput": "IgnoreWhitespaceAtStartAndEndForEveryLine",
+                        "expectedOutputAsBase64UrlEncoded": _b64(test_case["expected_output"]),
+                        "stdinStringAsBase64UrlEncoded": _b64(test_case["input"]),
+                        "callbackUrlOnExecutionCompletion": settings.URL
+                        + "/interview/dsa-response/callback",
+                        "shouldEnablePerProcessAndThreadCpuTimeLimit": False,
+                        "shouldEnablePerProcessAndThreadMemoryLimit": False,
+                        "shouldAllowInternetAccess": False,
+                        # "compilerFlagString": "",
+                        "maxFileSizeInKilobytesFilesCreatedOrModified": FILE_SIZE_LIMIT_KB,
+                        "stackSizeLimitInKilobytes": STACK_SIZE_LIMIT_KB,
+                        "cpuTimeLimitInMilliseconds": CPU_TIME_LIMIT_MS,
+                        "wallTimeLimitInMilliseconds": WALL_TIME_LIMIT_MS,
+                        "memoryLimitInKilobyte": MEMORY_LIMIT_KB,
+                        "maxProcessesAndOrThreads": MAX_PROCESSES,
+                    },
+                    "sourceCodeAsBase64UrlEncoded": _b64(code),
+                }
+            )
+
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                self.url,
+                headers={"FERMION-API-KEY": settings.FERMION_API_KEY},
+                json={"data": [{"data": {"entries": entries}}]},
+            ) as response:
+                result = await response.json()
+        task_ids = result[0]["output"]["data"]["taskIds"]
+        await _save_pending(db, dsa_response_id, test_cases, task_ids)
+
+
+# How each language the code editor offers is built and run locally. The JVM
+# and V8 reserve far more address space than they use, so their memory is
+# capped by their own flags rather than RLIMIT_AS.
+LANGUAGES = {
+    "C": {
+        "source": "main.c",
+        "compile": ["gcc", "-O2", "-std=c17", "-o", "main", "main.c", "-lm"],
+        "run": ["./main"],
+    },
+    "Cpp": {
+        "source": "main.cpp",
+        "compile": ["g++", "-O2", "-std=c++17", "-o", "main", "main.cpp"],
+        "run": ["./main"],
+    },
+    "Python": {"source": "main.py", "run": ["python3", "-I", "main.py"]},
+    "Java": {
+        "source": "Main.java",
+        "compile": ["javac", "-J-Xmx512m", "Main.java"],
+        "run": ["java", f"-Xmx{MEMORY_LIMIT_KB // 1024}m", "-Xss64m", "-cp", ".", "Main"],
+        "address_space": False,
+    },
+    "Nodejs": {
+        "source": "main.js",
+        "run": ["node", f"--max-old-space-size={MEMORY_LIMIT_KB // 1024}", "main.js"],
+        "address_space": False,
+    },
+}
+
+RUN_LIMITS = {
+    "cpu_ms": CPU_TIME_LIMIT_MS,
+    "wall_ms": WALL_TIME_LIMIT_MS,
+    "memory_kb": MEMORY_LIMIT_KB,
+    "file_size_kb": FILE_SIZE_LIMIT_KB,
+    "processes": MAX_PROCESSES,
+    "stack_kb": STACK_SIZE_LIMIT_KB,
+}
+# Compilers are trusted, but not with unlimited time.
+COMPILE_LIMITS = {
+    "cpu_ms": 20000,
+    "wall_ms": 30000,
+    "memory_kb": None,
+    "file_size_kb": 65536,
+    "processes": MAX_PROCESSES,
+    "stack_kb": STACK_SIZE_LIMIT_KB,
+}
+
+
+def outputs_match(output: str, expected: str) -> bool:
+    """IgnoreWhitespaceAtStartAndEndForEveryLine, as the remote matcher."""
+    return [line.strip() for line in output.strip().splitlines()] == [
+        line.strip() for line in expected.strip().splitlines()
+    ]
+
+
+def _status(run, expected_output):
+    if run["timed_out"] or run["signal"] == "SIGXCPU":
+        return "time-limit-exceeded"
+    if run["exit_code"] != 0:
+        return "run-time-error"
+    if not outputs_match(run["stdout"], expected_output):
+        return "wrong-answer"
+    return "successful"
+
+
+def _payload(task_id, test_case, status, run=None, compiler_output=""):
+    """A result in the shape of the remote executor's callbacks."""
+    return {
+        "taskUniqueId": task_id,
+        "runResult": {
+            "runStatus": status,
+            "compilerOutputAfterCompilationBase64UrlEncoded": _b64(compiler_output),
+            "programRunData": (
+                {
+                    "stdoutBase64UrlEncoded": _b64(run["stdout"]),
+                    "stderrBase64UrlEncoded": _b64(run["stderr"]),
+                }
+                if run is not None
+                else None
+            ),
+        },
+        "runConfig": {"stdinStringAsBase64UrlEncoded": _b64(test_case["input"])},
+    }
+
+
+class LocalExecutor:
+    def __init__(self, workers: int, user=None):
+        self.workers = workers
+        # Who programs run as (see app/lib/sandbox.py); None for the app's user.
+        self.user = sandbox.resolve_user(user) if user else None
+        self._pool = None
+        # Keeps submissions referenced until they finish.
+        self._runs = set()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            # Spawned, not forked: the app's processes have threads.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=sandbox.init_worker,
+                initargs=(self.user,),
+            )
+        return self._pool
+
+    async def submit(self, db, dsa_response_id, language, code, test_cases):
+        task_ids = [uuid.uuid4().hex for _ in test_cases]
+        await _save_pending(db, dsa_response_id, test_cases, task_ids)
+        run = asyncio.create_task(self._execute(language, code, test_cases, task_ids))
+        self._runs.add(run)
+        run.add_done_callback(self._runs.discard)
+
+    def _in_pool(self, command, cwd, stdin="", **limits):
+        # sandbox.run itself, so the pool's processes never import the app.
+        return asyncio.get_running_loop().run_in_executor(
+            self.pool, functools.partial(sandbox.run, command, cwd, stdin, **limits)
+        )
+
+    async def _execute(self, language, code, test_cases, task_ids):
+        workdir = tempfile.mkdtemp(prefix="dsa-")
+        try:
+            async for payload in self._results(workdir, language, code, test_cases, task_ids):
+                try:
+                    async with database.AsyncSessionLocal() as db:
+                        await record_result(db, payload)
+                except Exception:
+                    logger.exception(f"Could not record DSA task {payload['taskUniqueId']}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    async def _results(self, workdir, language, code, test_cases, task_ids):
+        """Callback payloads, one per test case, in completion order."""
+        spec = LANGUAGES.get(language)
+        compiler_output = ""
+        if spec is None:
+            compiler_output = f"{language} cannot be run here."
+        else:
+            with open(os.path.join(workdir, spec["source"]), "w") as f:
+                f.write(code)
+            if self.user is not None:
+                os.chown(workdir, *self.user)
+            if "compile" in spec:
+                build = await self._in_pool(spec["compile"], workdir, tag="compile", **COMPILE_LIMITS)
+                if build.get("error") or build["exit_code"] != 0:
+                    compiler_output = build.get("error") or (build["stderr"] + build["stdout"])
+        if compiler_output:
+            for test_case, task_id in zip(test_cases, task_ids):
+                yield _payload(task_id, test_case, "compilation-error", compiler_output=compiler_output)
+            return
+
+        limits = dict(RUN_LIMITS)
+        if not spec.get("address_space", True):
+            limits["memory_kb"] = None
+
+        async def run_one(i, test_case, task_id):
+            run = await self._in_pool(spec["run"], workdir, test_case["input"], tag=f"run{i}", **limits)
+            if run.get("error"):
+                return _payload(task_id, test_case, "compilation-error", compiler_output=run["error"])
+            return _payload(task_id, test_case, _status(run, test_case["expected_output"]), run)
+
+        runs = [
+            run_one(i, test_case, task_id)
+            for i, (test_case, task_id) in enumerate(zip(test_cases, task_ids))
+        ]
+        for run in asyncio.as_completed(runs):
+            yield await run
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _build_executor():
+    name = settings.DSA_EXECUTOR
+    if name == "remote":
+        return RemoteExecutor()
+    if name == "local":
+        return LocalExecutor(settings.DSA_LOCAL_WORKERS, settings.DSA_SANDBOX_USER)
+    raise ValueError(f"Unknown DSA_EXECUTOR {name!r}")
+
+
+executor = _build_executor()
+
+
+def shutdown():
+    if isinstance(executor, LocalExecutor):
+        executor.shutdown()
+
+
+async def record_result(db, data):
+    """Store one test case's result and tell the candidate. `data` is in the
+    remote executor's callback format."""
+    taskUID = data["taskUniqueId"]
+    runStatus = data["runResult"]["runStatus"]
+    compilation_output = data["runResult"][
+        "compilerOutputAfterCompilationBase64UrlEncoded"
+    ]
+    execution_err = (
+        data["runResult"]["programRunData"]["stderrBase64UrlEncoded"]
+        if data["runResult"]["programRunData"]
+        else ""
+    )
+    output = (
+        data["runResult"]["programRunData"]["stdoutBase64UrlEncoded"]
+        if data["runResult"]["programRunData"]
+        else ""
+    )
+    input = data["runConfig"]["stdinStringAsBase64UrlEncoded"]
+
+    stmt = (
+        update(DSATestCaseResponse)
+        .values({"status": runStatus})
+        .where(DSATestCaseResponse.task_id == taskUID)
+        .returning(DSATestCaseResponse.dsa_response_id)
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+    dsa_response_id = result.mappings().one()["dsa_response_id"]
+
+    if runStatus != "successful":
+        stmt = (
+            select(
+                Interview.id.label("interview_id"),
+                DSATestCaseResponse.dsa_test_case_id,
+                DSATestCaseResponse.status,
+                DSATestCase.expected_output,
+                DSATestCase.input,
+            )
+            .select_from(DSATestCaseResponse)
+            .join(DSAResponse, DSAResponse.id == DSATestCaseResponse.dsa_response_id)
+            .join(
+                Interview,
+                Interview.id == DSAResponse.interview_id,
+            )
+            .join(DSATestCase, DSATestCase.id == DSATestCaseResponse.dsa_test_case_id)
+            .where(DSATestCaseResponse.task_id == taskUID)
+        )
+        data = (await db.execute(stmt)).mappings().one()
+        output: str
+
+        stmt = (
+            update(DSAResponse)
+            .values(passed=False)
+            .where(DSAResponse.id == dsa_response_id)
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+        await interview_connection_manager.send_data(
+            data["interview_id"],
+            {
+                "taskUID": taskUID,
+                "input": base64.urlsafe_b64decode(
+                    input + ((4 - (len(input) % 4)) * "=")
+                ).decode(),
+                "event": "execution_result",
+                "status": "failed",
+                "failed_test_case": {
+                    "test_case_id": data["dsa_test_case_id"],
+                    "status": data["status"],
+                    "execution_err": (
+                        base64.urlsafe_b64decode(
+                            execution_err + ((40 - (len(execution_err) % 4)) * "=")
+                        ).decode()
+                        if execution_err
+                        else ""
+                    ),
+                    "compilation_output": (
+                        base64.urlsafe_b64decode(
+                            compilation_output
+                            + ((40 - (len(compilation_output) % 4)) * "=")
+                        ).decode()
+                        if compilation_output
+                        else ""
+                    ),
+                    "input": data["input"],
+                    "expected_output": data["expected_output"],
+                    "output": base64.urlsafe_b64decode(
+                        output + ((4 - (len(output) % 4)) * "=")
+                    ).decode(),
+                },
+            },
+        )
+        return
+
+    stmt = (
+        select(
+            func.count(DSATestCaseResponse.task_id).label("passed_count"),
+            DSAResponse.interview_id,
+        )
+        .join(DSAResponse, DSAResponse.id == DSATestCaseResponse.dsa_response_id)
+        .group_by(DSAResponse.interview_id)
+        .where(
+            and_(
+                DSATestCaseResponse.dsa_response_id == dsa_response_id,
+                DSATestCaseResponse.status == "successful",
+            )
+        )
+    )
+    data = (await db.execute(stmt)).all()[0]._mapping
+    passed_count = data["passed_count"]
+    stmt = (
+        select(func.count(DSATestCase.id).label("total_count"))
+        .join(DSAResponse, DSAResponse.dsa_question_id == DSATestCase.dsa_question_id)
+        .where(DSAResponse.id == dsa_response_id)
+    )
+    total_count = (await db.execute(stmt)).all()[0]._mapping["total_count"]
+
+    if total_count == passed_count:
+        stmt = update(DSAResponse).values(passed=True).where(DSAResponse.id == dsa_response_id)
+        await db.execute(stmt)
+        await db.commit()
+
+        await interview_connection_manager.send_data(
+            data["interview_id"],
+            {
+                "event": "execution_result",
+                "status": "successful",
+                "passed_count": passed_count,
+            },
+        )
@@ -0,0 +1,157 @@
+"""Interview questions read out ahead of time.
+
+Each question is synthesized in the background as soon as it is saved (as
+question generation completes it, or when a company adds a custom question)
+and uploaded to GCS_BUCKET_NAME under question-audio/. Its public URL is
+stored in the row's audio_url, which the candidate app plays instead of
+calling /text-to-speech when the question comes up.
+
+Objects are named by the speech cache key (text, voice, model,
+instructions), so the same question in the same voice is uploaded once, and
+they never change: editing a question's text clears its audio_url and queues
+the new text.
+
+Questions still without audio_url (synthesis failed, or the app was
+restarted) are picked up by `queue_missing()`, which the question endpoints
+call.
+"""
+
+import asyncio
+import io
+import logging
+
+from sqlalchemy import select, update
+
+from app import database
+from app.config import settings
+from app.configs import registry
+from app.models import Interview, InterviewQuestion, InterviewQuestionAndResponse
+from app.services import response_cache, speech_cache
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "question-audio"
+# Content-addressed, so safe to cache for good.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_slots = asyncio.Semaphore(settings.QUESTION_AUDIO_CONCURRENCY)
+# Queued and running work by key, so each question is queued once and the
+# tasks stay referenced until they finish.
+_pending = {}
+
+
+def enabled() -> bool:
+    return settings.QUESTION_AUDIO_ENABLED and bool(settings.GCS_BUCKET_NAME)
+
+
+def _blob(text):
+    key = speech_cache.cache_key(text, **speech_cache.INTERVIEWER)
+    return registry.get("gcs").bucket(settings.GCS_BUCKET_NAME).blob(f"{PREFIX}/{key}.mp3")
+
+
+async def publish(text: str) -> str:
+    """Public URL of `text` read out in the interviewer's voice, synthesizing
+    and uploading it if needed."""
+    blob = _blob(text)
+    if not await asyncio.to_thread(blob.exists):
+        audio = await speech_cache.synthesize(text, **speech_cache.INTERVIEWER)
+        blob.cache_control = CACHE_CONTROL
+        await asyncio.to_thread(
+            blob.upload_from_file, io.BytesIO(audio), content_type=speech_cache.MEDIA_TYPE
+        )
+    return blob.public_url
+
+
+def _spawn(key, work):
+    if key in _pending:
+        return
+    task = asyncio.create_task(work())
+    _pending[key] = task
+    task.add_done_callback(lambda _: _pending.pop(key, None))
+
+
+async def _prepare(text, stmt, on_saved=None):
+    async with _slots:
+        try:
+            url = await publish(text)
+        except Exception:
+            logger.exception(f"Could not synthesize question audio for {text[:60]!r}")
+            return
+    async with database.AsyncSessionLocal() as db:
+        # Matching the text too: an edit while this ran cleared audio_url and
+        # queued the new text, and this URL must not overwrite that.
+        saved = (await db.execute(stmt.values(audio_url=url))).rowcount
+        await db.commit()
+    if saved and on_saved is not None:
+        on_saved()
+
+
+def queue_generated(interview_id: int, order_number: int, question: str):
+    """Queue audio for a question saved to interview_question_and_responses."""
+    if not enabled() or not question:
+        return
+    stmt = update(InterviewQuestionAndResponse).where(
+        InterviewQuestionAndResponse.interview_id == interview_id,
+        InterviewQuestionAndResponse.order_number == order_number,
+        InterviewQuestionAndResponse.question == question,
+    )
+    _spawn(("generated", interview_id, order_number), lambda: _prepare(question, stmt))
+
+
+def queue_custom(question_id: int, question: str, ai_interviewed_job_id: int):
+    """Queue audio for a company's custom interview question."""
+    if not enabled() or not question:
+        return
+    stmt = update(InterviewQuestion).where(
+        InterviewQuestion.id == question_id, InterviewQuestion.question == question
+    )
+    _spawn(
+        ("custom", question_id, question),
+        lambda: _prepare(
+            question,
+            stmt,
+            lambda: response_cache.interview_questions_changed(ai_interviewed_job_id),
+        ),
+    )
+
+
+async def _queue_missing(interview_id):
+    async with database.AsyncSessionLocal() as db:
+        job_id = (
+            await db.execute(
+                select(Interview.ai_interviewed_job_id).where(Interview.id == interview_id)
+            )
+        ).scalar_one_or_none()
+        generated = (
+            await db.execute(
+                select(InterviewQuestionAndResponse.order_number, InterviewQuestionAndResponse.question)
+                .where(
+                    InterviewQuestionAndResponse.interview_id == interview_id,
+                    InterviewQuestionAndResponse.audio_url.is_(None),
+                )
+                .order_by(InterviewQuestionAndResponse.order_number)
+            )
+        ).all()
+        custom = (
+            await db.execute(
+                select(InterviewQuestion.id, InterviewQuestion.question).where(
+                    InterviewQuestion.ai_interviewed_job_id == job_id,
+                    InterviewQuestion.audio_url.is_(None),
+                )
+            )
+        ).all()
+    for row in generated:
+        queue_generated(interview_id, row.order_number, row.question)
+    for row in custom:
+        queue_custom(row.id, row.question, job_id)
+
+
+def queue_missing(interview_id: int):
+    """Queue audio for the interview's questions, and its job's custom
+    questions, that have none yet."""
+    if enabled():
+        _spawn(("missing", interview_id), lambda: _queue_missing(interview_id))
+
+
+def stats():
+    return {"enabled": enabled(), "pending": len(_pending)}
@@ -0,0 +1,552 @@
+"""Interview reports as durable background jobs.
+
+PUT /interview/generate-feedback only queues a report_jobs row. A worker
+task in every app process claims due jobs (app/lib/job_queue.py: FOR UPDATE
+SKIP LOCKED plus a lease, so a job whose worker died is picked up again once
+the lease runs out) and runs it stage by stage:
+
+- analyze: the LLM evaluation of the interview, stored on the job. With
+  ANSWER_SCORING_ENABLED that is the stored per-answer scores (see
+  answer_scoring.py) summed up; the transcript is only evaluated whole when
+  no answers were saved, or none could be scored;
+- render: the PDF, rendered and uploaded to GCS off the event loop;
+- complete: scores written to the interview, in one transaction with the
+  job's status so a retry never counts an interview twice.
+
+Each stage's output is saved before the next one starts, so a retry or a
+restart resumes at the failed stage instead of paying for the LLM call again.
+A failing stage is retried with exponential backoff up to
+REPORT_JOB_MAX_ATTEMPTS times. When the job finishes, the result is pushed
+over the interview websocket; GET /interview/generate-feedback/{job_id}
+reports progress either way.
+"""
+
+import asyncio
+import datetime
+import io
+import json
+import logging
+import unicodedata
+
+from fpdf import FPDF
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.interview import answer_scoring
+from app.interview.services import interview_connection_manager
+from app.lib.job_queue import ACTIVE_STATUSES, LeaseQueue
+from app.models import (
+    AiInterviewedJob,
+    Interview,
+    InterviewQuestion,
+    InterviewQuestionAndResponse,
+    InterviewQuestionResponse,
+    ReportJob,
+)
+from app.services import company_stats, gcs, llm_gateway, prompt_budget
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["analyze", "render", "complete"]
+
+# How often an idle worker looks for jobs queued by other processes.
+POLL_SECONDS = 2
+
+
+async def _report_data(db, interview_id):
+    stmt = (
+        select(
+            AiInterviewedJob.title,
+            AiInterviewedJob.description,
+            AiInterviewedJob.requirements,
+            Interview.resume_text,
+            Interview.firstname,
+            Interview.lastname,
+            Interview.created_at,
+            Interview.email,
+            Interview.phone,
+            Interview.city,
+            Interview.education,
+            Interview.work_experience_yrs,
+            Interview.skills,
+            Interview.resume_match_score,
+            Interview.resume_match_feedback,
+        )
+        .join(Interview)
+        .where(Interview.id == interview_id)
+    )
+    return (await db.execute(stmt)).mappings().one()
+
+
+async def _analyze(db, interview_id, transcript, job_requirements):
+    """The LLM's evaluation of the interview, as a dict."""
+    data = await _report_data(db, interview_id)
+
+    if settings.ANSWER_SCORING_ENABLED:
+        answers = await answer_scoring.evaluate_interview(db, interview_id)
+        if answers:
+            return await answer_scoring.summarize(
+                answers, data.title, data.description, job_requirements or data.requirements
+            )
+
+    stmt = select(
+        InterviewQuestionAndResponse.question,
+        InterviewQuestionAndResponse.question_type,
+        InterviewQuestionAndResponse.answer,
+    ).where(InterviewQuestionAndResponse.interview_id == interview_id)
+    questions_and_responses = (await db.execute(stmt)).mappings().all()
+
+    stmt = (
+        select(
+            InterviewQuestion.question,
+            InterviewQuestion.question_type,
+            InterviewQuestionResponse.answer,
+        )
+        .join(
+            InterviewQuestion,
+            InterviewQuestion.id == InterviewQuestionResponse.interview_question_id,
+        )
+        .where(InterviewQuestionResponse.interview_id == interview_id)
+    )
+    custom_question_responses = (await db.execute(stmt)).mappings().all()
+
+    conversation = transcript or ""
+    if not conversation:
+        for question_and_response in questions_and_responses:
+            conversation += f"""
+                Recruiter: {question_and_response.question} (question type: {question_and_response.question_type})
+
+                Candidate: {question_and_response.answer}
+            """
+
+        for response in custom_question_responses:
+            conversation += f"""
+                Recruiter: {response.question} (question type: {response.question_type})
+
+                Candidate: {response.answer}
+            """
+
+    sections = prompt_budget.fit(
+        "generate_feedback",
+        "gpt-3.5-turbo",
+        conversation=conversation,
+        description=data.description,
+        requirements=job_requirements or data.requirements,
+    )
+
+    prompt = f"""
+        You are evaluating an interview transcript. The candidate is applying for a specific job. Carefully analyze their responses and assess their performance. Be strict and fair — do not assign points unless there's clear evidence.
+
+Follow these rules:
+- If the candidate gave minimal or irrelevant responses (e.g., just "yes", "no", or "hello"), reflect that harshly in all scores and feedback.
+- Do NOT assign high scores unless the candidate has clearly demonstrated knowledge, relevance, and depth.
+- Base scoring strictly on the content: no assumptions should be made if the candidate didn't mention or demonstrate a skill.
+- Use the job description and requirements to frame your evaluation.
+- If a category (e.g., technicalSkills) wasn't demonstrated at all, the score for that category must be near 0.
+- Feedback for the recruiter must provide a fair but critical assessment of the candidate's readiness for the role, with supporting examples.
+- Suggestions should help the candidate understand how to improve in future interviews.
+
+Return ONLY a JSON object in the following format:
+{{
+    "feedback_for_candidate": "Detailed, specific feedback on their performance, mentioning what they did well or poorly",
+    "feedback_for_recruiter": "Detailed evaluation of the candidate's responses. Explain whether the candidate is suitable, why or why not, and which areas were lacking or strong.",
+    "score": number between 0 and 100,
+    "scoreBreakdown": {{
+        "technicalSkills": number between 0 and 100,
+        "communication": number between 0 and 100,
+        "problemSolving": number between 0 and 100,
+        "culturalFit": number between 0 and 100
+    }},
+    "suggestions": [
+        "Each item must be a concrete, actionable suggestion for the candidate",
+        "Be specific: e.g., 'Provide examples when answering', 'Work on articulating thoughts clearly'"
+    ],
+    "keywords": [
+        {{
+            "term": "string",
+            "count": number,
+            "sentiment": "positive" | "neutral" | "negative"
+        }}
+    ]
+}}
+
+Conversation:
+{sections["conversation"]}
+
+Job Description:
+{sections["description"]}
+
+Job Requirements:
+{sections["requirements"]}
+
+Important:
+- Return ONLY the JSON object, no other text
+- All fields must be present
+- All scores must be accurate, evidence-based numbers between 0 and 100 — do not round up arbitrarily
+- If the candidate gave weak or no answers, most scores should be low, even 0–20
+- Suggestions must be actionable and tailored to what the candidate actually said or failed to say
+- Keywords must be relevant, pulled from the conversation, and include a count and sentiment
+        """
+
+    response = await llm_gateway.chat(
+        "generate_feedback",
+        deadline=120,
+        model="gpt-3.5-turbo",
+        messages=[
+            {
+                "role": "system",
+                "content": "You are an expert interviewer and evaluator. Provide detailed, constructive feedback.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.1,
+        response_format={"type": "json_object"},
+    )
+
+    interview_analysis = response.choices[0].message.content
+    interview_data = json.loads(interview_analysis)
+    return interview_data
+
+
+def render_report(data, interview_data) -> bytes:
+    """The candidate report PDF."""
+    pdf = FPDF(unit="pt")
+    pdf.add_page()
+    # Replace non-latin-1 characters with closest ASCII equivalents or remove them
+
+    def safe_text(text):
+        if not isinstance(text, str):
+            text = str(text)
+        return (
+            unicodedata.normalize("NFKD", text)
+            .encode("latin-1", "ignore")
+            .decode("latin-1")
+        )
+
+    pdf.set_font("Arial", size=18)
+    full_width = pdf.w - pdf.l_margin - pdf.r_margin
+    half_width = (pdf.w - pdf.l_margin - pdf.r_margin) * 0.5
+    pdf.set_font("Arial", size=18)
+    pdf.set_text_color(0, 0, 200)
+    pdf.cell(
+        full_width,
+        21.6,
+        safe_text("Candidate Interview Report"),
+        border=0,
+        ln=1,
+        align="C",
+    )
+    pdf.ln(18)
+    pdf.set_font("Arial", size=16)
+    pdf.cell(
+        full_width,
+        19.2,
+        safe_text(f"{data['firstname']} {data['lastname']}"),
+        border=0,
+        ln=1,
+        align="C",
+    )
+    pdf.ln(16)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", size=14)
+    pdf.cell(
+        full_width,
+        16.8,
+        safe_text(f"Position: {data['title']}"),
+        border=0,
+        ln=1,
+        align="C",
+    )
+    pdf.ln(14)
+    pdf.cell(
+        full_width,
+        16.8,
+        safe_text(f"Date: {data['created_at']}"),
+        border=0,
+        ln=1,
+        align="C",
+    )
+    pdf.ln(14)
+    pdf.set_font("Arial", size=16)
+    pdf.set_text_color(0, 0, 200)
+    pdf.cell(full_width, 19.2, safe_text("Candidate Information"), border=0, ln=1)
+    pdf.ln(8)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", size=14)
+    pdf.cell(half_width, 16.8, safe_text("Email"), border=1)
+    pdf.cell(half_width, 16.8, safe_text(data["email"]), border=1, ln=1)
+    pdf.cell(half_width, 16.8, safe_text("Phone"), border=1)
+    pdf.cell(half_width, 16.8, safe_text(data["phone"]), border=1, ln=1)
+    pdf.cell(half_width, 16.8, safe_text("City"), border=1)
+    pdf.cell(half_width, 16.8, safe_text(data["city"]), border=1, ln=1)
+    pdf.cell(half_width, 16.8, safe_text("Education"), border=1)
+    pdf.multi_cell(half_width, 16.8, safe_text(data["education"]), border=1)
+    pdf.cell(half_width, 16.8, safe_text("Experience"), border=1)
+    pdf.cell(
+        half_width, 16.8, safe_text(f"{data['work_experience_yrs']} years"), border=1, ln=1
+    )
+    pdf.cell(half_width, 16.8, safe_text("Skills"), border=1)
+    pdf.multi_cell(half_width, 16.8, safe_text(data["skills"]), border=1)
+    pdf.ln(14)
+    # pdf.set_font("Arial", size=16)
+    # pdf.set_text_color(0, 0, 200)
+    # pdf.cell(full_width, 19.2, "MCQ Test Results", border=0, ln=1)
+    # pdf.ln(8)
+    # pdf.set_text_color(0, 0, 0)
+    # pdf.set_font("Arial", size=14)
+    # pdf.cell(half_width, 16.8, "Total Score", border=1)
+    # pdf.cell(half_width, 16.8, "13", border=1, ln=1)
+    # pdf.cell(half_width, 16.8, "Technical Questions", border=1)
+    # pdf.cell(half_width, 16.8, "13", border=1, ln=1)
+    # pdf.cell(half_width, 16.8, "Aptitude Questions", border=1)
+    # pdf.cell(half_width, 16.8, "13", border=1, ln=1)
+    # pdf.ln(14)
+    pdf.set_font("Arial", size=16)
+    pdf.set_text_color(0, 0, 200)
+    pdf.cell(full_width, 19.2, safe_text("Assessment Results"), border=0, ln=1)
+    pdf.ln(8)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", size=14)
+    pdf.cell(half_width, 16.8, safe_text("Overall Score"), border=1)
+    pdf.cell(
+        half_width, 16.8, safe_text(str(interview_data["score"]) + "%"), border=1, ln=1
+    )
+    pdf.cell(half_width, 16.8, safe_text("Resume match Score"), border=1)
+    pdf.cell(
+        half_width,
+        16.8,
+        safe_text(str(data["resume_match_score"]) + "%"),
+        border=1,
+        ln=1,
+    )
+    pdf.cell(half_width, 16.8, safe_text("Technical Score"), border=1)
+    pdf.cell(
+        half_width,
+        16.8,
+        safe_text(str(interview_data["scoreBreakdown"]["technicalSkills"]) + "%"),
+        border=1,
+        ln=1,
+    )
+    pdf.cell(half_width, 16.8, safe_text("Communication Score"), border=1)
+    pdf.cell(
+        half_width,
+        16.8,
+        safe_text(str(interview_data["scoreBreakdown"]["communication"]) + "%"),
+        border=1,
+        ln=1,
+    )
+    pdf.cell(half_width, 16.8, safe_text("Problem solving Score"), border=1)
+    pdf.cell(
+        half_width,
+        16.8,
+        safe_text(str(interview_data["scoreBreakdown"]["problemSolving"]) + "%"),
+        border=1,
+        ln=1,
+    )
+    pdf.cell(half_width, 16.8, safe_text("Cultural Fit Score"), border=1)
+    pdf.cell(
+        half_width,
+        16.8,
+        safe_text(str(interview_data["scoreBreakdown"]["culturalFit"]) + "%"),
+        border=1,
+        ln=1,
+    )
+    pdf.ln(14)
+    # pdf.set_font("Arial", size=16)
+    # pdf.set_text_color(0, 0, 200)
+    # pdf.cell(full_width, 19.2, "MCQ Test Results", border=0, ln=1)
+    # pdf.ln(8)
+    # pdf.set_text_color(0, 0, 0)
+    # pdf.set_font("Arial", size=14)
+    # pdf.cell(half_width, 16.8, "Total Score", border=1)
+    # pdf.cell(half_width, 16.8, "13", border=1, ln=1)
+    # pdf.cell(half_width, 16.8, "Technical Questions", border=1)
+    # pdf.cell(half_width, 16.8, "13", border=1, ln=1)
+    # pdf.cell(half_width, 16.8, "Aptitude Questions", border=1)
+    # pdf.cell(half_width, 16.8, "13", border=1, ln=1)
+    # pdf.ln(14)
+    pdf.set_font("Arial", size=16)
+    pdf.set_text_color(0, 0, 200)
+    pdf.cell(full_width, 19.2, safe_text("Feedback"), border=0, ln=1)
+    pdf.ln(8)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", size=14)
+    pdf.multi_cell(
+        full_width, 16.8, safe_text(interview_data["feedback_for_candidate"]), border=0
+    )
+    pdf.ln(14)
+    pdf.set_font("Arial", size=16)
+    pdf.set_text_color(0, 0, 200)
+    pdf.cell(full_width, 19.2, safe_text("Resume match Feedback"), border=0, ln=1)
+    pdf.ln(8)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Arial", size=14)
+    pdf.multi_cell(
+        full_width, 16.8, safe_text(str(data["resume_match_feedback"])), border=0
+    )
+
+    # Save PDF to a BytesIO buffer (correct way)
+    pdf_bytes = pdf.output(dest="S").encode("latin-1")
+    return pdf_bytes
+
+
+async def _render(db, job):
+    data = await _report_data(db, job.interview_id)
+    pdf_bytes = await asyncio.to_thread(render_report, data, job.analysis)
+
+    gcs_bucket = settings.GCS_BUCKET_NAME
+    gcs_blob_name = f"reports/{job.interview_id}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return await asyncio.to_thread(
+        gcs.upload_file_to_gcs,
+        gcs_bucket,
+        gcs_blob_name,
+        io.BytesIO(pdf_bytes),
+        content_type="application/pdf",
+    )
+
+
+def result_of(interview_data):
+    """What the endpoint used to return, and what the job reports when done."""
+    return {
+        "feedback": interview_data["feedback_for_candidate"],
+        "score": interview_data["score"],
+        "scoreBreakdown": interview_data["scoreBreakdown"],
+        "suggestions": interview_data["suggestions"],
+        "keywords": interview_data["keywords"],
+    }
+
+
+async def _complete(db, job):
+    interview_data = job.analysis
+    await db.execute(
+        company_stats.interview_completed(job.interview_id, int(interview_data["score"]))
+    )
+    await db.execute(
+        update(Interview)
+        .where(Interview.id == job.interview_id)
+        .values(
+            status="completed",
+            overall_score=int(interview_data["score"]),
+            feedback=interview_data["feedback_for_recruiter"],
+            technical_skills_score=interview_data["scoreBreakdown"]["technicalSkills"],
+            communication_skills_score=interview_data["scoreBreakdown"][
+                "communication"
+            ],
+            problem_solving_skills_score=interview_data["scoreBreakdown"][
+                "problemSolving"
+            ],
+            cultural_fit_score=interview_data["scoreBreakdown"]["culturalFit"],
+            report_file_url=job.report_file_url,
+        )
+    )
+    await db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job.id)
+        .values(
+            status="succeeded",
+            stage="done",
+            attempts=0,
+            error=None,
+            result=result_of(interview_data),
+            locked_until=None,
+        )
+    )
+    # Committed by the caller, together with the interview update above.
+
+
+def job_status(job) -> dict:
+    done = STAGES.index(job.stage) if job.stage in STAGES else len(STAGES)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": round(done * 100 / len(STAGES)),
+        "attempts": job.attempts,
+        "error": job.error,
+        "result": job.result,
+    }
+
+
+async def enqueue(db, interview_id: int, transcript: str, job_requirements: str):
+    """The interview's unfinished report job, or a new one."""
+    job = (
+        await db.execute(
+            select(ReportJob)
+            .where(
+                ReportJob.interview_id == interview_id,
+                ReportJob.status.in_(ACTIVE_STATUSES),
+            )
+            .order_by(ReportJob.id.desc())
+            .limit(1)
+        )
+    ).scalars().first()
+    if job is None:
+        job = ReportJob(
+            interview_id=interview_id,
+            payload={"transcript": transcript, "job_requirements": job_requirements},
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        queue.wakeup()
+    return job
+
+
+async def _run(db, job):
+    while job.stage in STAGES:
+        await queue.save(db, job.id, locked_until=queue.lease())
+        if job.stage == "analyze":
+            analysis = await _analyze(
+                db,
+                job.interview_id,
+                job.payload.get("transcript", ""),
+                job.payload.get("job_requirements", ""),
+            )
+            await queue.save(db, job.id, analysis=analysis, stage="render", attempts=0)
+        elif job.stage == "render":
+            report_file_url = await _render(db, job)
+            await queue.save(db, job.id, report_file_url=report_file_url, stage="complete", attempts=0)
+        else:
+            await _complete(db, job)
+            await db.commit()
+        await db.refresh(job)
+
+
+async def _notify(job):
+    if job.status == "succeeded":
+        event = "report_ready"
+    elif job.status == "failed":
+        event = "report_failed"
+    else:
+        return
+    try:
+        await interview_connection_manager.send_data(
+            job.interview_id, {"event": event, **job_status(job)}
+        )
+    except Exception:
+        # The candidate's socket may be gone; polling still works.
+        logger.exception(f"Could not push report job {job.id}")
+
+
+queue = LeaseQueue(
+    ReportJob,
+    label="Report",
+    run=_run,
+    lease_seconds=settings.REPORT_JOB_LEASE_SECONDS,
+    max_attempts=settings.REPORT_JOB_MAX_ATTEMPTS,
+    retry_base_seconds=5,
+    concurrency=settings.REPORT_JOB_CONCURRENCY,
+    poll_seconds=POLL_SECONDS,
+    describe=lambda job: f" at {job.stage}",
+    finished=_notify,
+)
+
+
+def start_worker():
+    queue.start_worker()
+
+
+async def stop_worker():
+    """Stop claiming jobs. Jobs in flight are abandoned and picked up again
+    once their lease expires."""
+    await queue.stop_worker()
@@ -0,0 +1,657 @@
+import asyncio
+import datetime
+import json
+import logging
+from typing import Dict
+
+from fastapi import WebSocket
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app import database
+from app.config import settings
+from app.interview import question_audio
+from app.lib.json_stream import JSONArrayStream
+from app.models import AiInterviewedJob, Interview, InterviewQuestion, InterviewQuestionAndResponse
+from app.services import llm_cache, llm_gateway, prompt_budget
+
+logger = logging.getLogger(__name__)
+
+
+class InterviewConnectionManager:
+    def __init__(self):
+        self.active_connections: Dict[int, WebSocket] = {}
+
+    async def connect(self, interview_id: int, websocket: WebSocket):
+        await websocket.accept()
+        self.active_connections[interview_id] = websocket
+
+    def disconnect(self, interview_id: int):
+        self.active_connections.pop(interview_id, None)
+
+    async def send_data(self, interview_id: int, data):
+        websocket = self.active_connections.get(interview_id)
+        if websocket:
+            await websocket.send_json(data)
+
+
+interview_connection_manager = InterviewConnectionManager()
+
+# What the candidate-facing interview endpoints return.
+INTERVIEW_COLUMNS = [
+    Interview.id,
+    Interview.status,
+    Interview.firstname,
+    Interview.lastname,
+    Interview.email,
+    Interview.phone,
+    Interview.work_experience_yrs,
+    Interview.education,
+    Interview.skills,
+    Interview.city,
+    Interview.linkedin_url,
+    Interview.portfolio_url,
+    Interview.resume_url,
+    Interview.resume_text,
+    Interview.resume_match_score,
+    Interview.resume_match_feedback,
+    Interview.overall_score,
+    Interview.feedback,
+    Interview.ai_interviewed_job_id,
+]
+
+QUESTION_TYPES = [
+    "technical",
+    "technical",
+    "technical",
+    "technical",
+    "technical",
+    "technical",
+    "behavioral",
+    "problem_solving"
+]
+
+# Asked when there is neither a resume nor a job description to go on.
+FALLBACK_QUESTIONS = [
+    {
+        "question": "Could you please tell me about your experience as a Senior Software Engineer?",
+        "type": "general",
+    }
+]
+
+
+def _question_generation_messages(interview, job, custom_questions):
+    example_questions = ""
+    for question in custom_questions:
+        example_questions += f"""
+        Question: {question.question} (question type: {question.question_type})
+"""
+    sections = prompt_budget.fit(
+        "generate_questions",
+        "gpt-4",
+        description=job.description,
+        resume=interview.resume_text,
+        example_questions=example_questions,
+    )
+
+    system_prompt = f"""You are an expert technical interviewer for the position of {job.title}.
+Your task is to generate interview questions based on the job description, candidate's resume, and the custom questions provided.
+
+The questions should be:
+1. Clear and concise
+2. Highly technical and focused on job-specific skills
+3. Progressive in difficulty
+4. Natural and conversational
+5. Similar in style and focus to the custom questions provided
+6. Ask more on the tech stack of the job
+7. Less on experience and more on required skills- Ask tricky questions and descriptive questions on tech stack.
+
+Question types: {', '.join(QUESTION_TYPES)}
+Maximum questions to generate: {len(QUESTION_TYPES)}
+
+Job Description:
+{sections["description"]}
+
+Candidate's Resume:
+{sections["resume"]}
+
+Custom Questions to Enhance and Include:
+{sections["example_questions"]}
+
+Instructions for Question Generation:
+1. First, analyze the custom questions provided and understand their style, focus, and complexity
+2. Generate enhanced versions of these custom questions, making them more specific to the candidate's experience
+3. Then generate additional questions that follow the same style and focus as the custom questions
+4. Ensure all questions maintain a natural conversation flow
+5. For the first question, start with a brief greeting and then ask your first question. Format it as: "Hello! [Greeting message]. [Question]"
+6. Focus on technical depth and problem-solving abilities
+7. Include specific technical scenarios and challenges relevant to the role
+8. Ask about implementation details and technical decision-making
+9. Include questions about system design, architecture, and technical trade-offs
+10. Ensure questions test both theoretical knowledge and practical experience
+
+The questions should be based on the previous conversation and maintain a natural flow.
+
+If no resume text or job description is provided, generate questions according to the given question types.
+
+Return the questions as a JSON array of objects with "question" and "type" fields. Make sure to return array in correct JSON format. Do not return any other text or explanation."""
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {
+            "role": "user",
+            "content": "Generate the interview questions, making sure to include enhanced versions of the custom questions provided. And return a correct JSON array of objects with 'question' and 'type' fields. And also give only specified number and type of questions.",
+        },
+    ]
+
+
+class QuestionGeneration:
+    """One interview's question generation, running as its own task.
+
+    Questions are saved to interview_question_and_responses as soon as the
+    streamed JSON array completes each one, and any number of listeners can
+    follow along with `follow()`. The task keeps going if a listener
+    disconnects, so an interview never ends up with half its questions.
+
+    The interview row records the generation's status under a lease renewed
+    with every saved question, so requests on other workers can tell a
+    partial set from a finished one (see `find_question_generation()`).
+    """
+
+    def __init__(self, interview_id: int):
+        self.interview_id = interview_id
+        self.questions = []
+        self.error = None
+        self.done = False
+        self._changed = asyncio.Condition()
+        self.task = None
+
+    async def _publish(self, question=None, error=None, done=False):
+        async with self._changed:
+            if question is not None:
+                self.questions.append(question)
+            if error is not None:
+                self.error = error
+            self.done = self.done or done
+            self._changed.notify_all()
+
+    async def follow(self):
+        """Yield each saved question (including ones saved before the call),
+        then return; raises if generation failed."""
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: len(self.questions) > sent or self.done
+                )
+                pending = self.questions[sent:]
+                finished = self.done
+            for question in pending:
+                yield question
+            sent += len(pending)
+            if finished and sent == len(self.questions):
+                if self.error is not None:
+                    raise self.error
+                return
+
+    async def _save(self, db, order_number, question):
+        stmt = (
+            insert(InterviewQuestionAndResponse)
+            .values(
+                question=question["question"],
+                question_type=question.get("type") or "general",
+                order_number=order_number,
+                interview_id=self.interview_id,
+            )
+            .on_conflict_do_nothing()
+            .returning(InterviewQuestionAndResponse)
+        )
+        row = (await db.execute(stmt)).scalars().first()
+        if row is None:
+            # Saved by the generation this one took over from; keep that one.
+            row = (
+                await db.execute(
+                    select(InterviewQuestionAndResponse).where(
+                        InterviewQuestionAndResponse.interview_id == self.interview_id,
+                        InterviewQuestionAndResponse.order_number == order_number,
+                    )
+                )
+            ).scalars().one()
+        await _set_interview_state(
+            db, self.interview_id, question_generation_locked_until=_generation_lease()
+        )
+        return row
+
+    async def run(self, messages):
+        try:
+            parser = JSONArrayStream()
+            order_number = 0
+            async with llm_gateway.chat_stream(
+                "generate_questions",
+                deadline=180,
+                model="gpt-4",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=1000,
+            ) as stream, database.AsyncSessionLocal() as db:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    for question in parser.feed(chunk.choices[0].delta.content or ""):
+                        if not isinstance(question.get("question"), str) or not question["question"]:
+                            logger.warning(f"Skipping malformed generated question: {question!r}")
+                            continue
+                        row = await self._save(db, order_number, question)
+                        order_number += 1
+                        # Read out while the rest are still generated
+                        question_audio.queue_generated(
+                            self.interview_id, row.order_number, row.question
+                        )
+                        await self._publish(question=row)
+            if not order_number:
+                raise ValueError("Failed to generate questions")
+            await _finish_generation(self.interview_id, "done")
+            await self._publish(done=True)
+        except BaseException as e:
+            if isinstance(e, Exception):
+                await _finish_generation(self.interview_id, "failed")
+            await self._publish(error=e, done=True)
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            _generations.pop(self.interview_id, None)
+
+
+class PolledQuestionGeneration:
+    """A generation running on another worker, followed by polling the
+    interview's saved questions and generation status. Takes the generation
+    over if its lease runs out (the other worker died)."""
+
+    POLL_SECONDS = 0.5
+
+    def __init__(self, interview_id: int):
+        self.interview_id = interview_id
+
+    async def follow(self):
+        sent = 0
+        while True:
+            async with database.AsyncSessionLocal() as db:
+                # Status first: once it reads done, the rows read after it
+                # are the full set.
+                state = (
+                    await db.execute(
+                        select(
+                            Interview.question_generation_status.label("status"),
+                            (Interview.question_generation_locked_until < func.now()).label("expired"),
+                        ).where(Interview.id == self.interview_id)
+                    )
+                ).one()
+                rows = (
+                    await db.execute(
+                        select(InterviewQuestionAndResponse)
+                        .where(InterviewQuestionAndResponse.interview_id == self.interview_id)
+                        .order_by(InterviewQuestionAndResponse.order_number)
+                        .offset(sent)
+                    )
+                ).scalars().all()
+            for row in rows:
+                yield row
+            sent += len(rows)
+
+            if state.status == "done":
+                return
+            if state.status != "running":
+                raise ValueError("Failed to generate questions")
+            if state.expired:
+                async with database.AsyncSessionLocal() as db:
+                    generation = await start_question_generation(self.interview_id, db)
+                if isinstance(generation, QuestionGeneration):
+                    # It replays the questions already saved; skip those.
+                    skip = sent
+                    async for question in generation.follow():
+                        if skip:
+                            skip -= 1
+                            continue
+                        yield question
+                    return
+            await asyncio.sleep(self.POLL_SECONDS)
+
+
+_generations = {}
+
+
+def _generation_lease():
+    return func.now() + datetime.timedelta(seconds=settings.QUESTION_GENERATION_LEASE_SECONDS)
+
+
+async def _set_interview_state(db, interview_id: int, *conditions, **values):
+    """Update the interview's generation or analysis columns without touching
+    its updated_at, which recruiters sort by. Returns whether a row matched."""
+    result = await db.execute(
+        update(Interview)
+        .where(Interview.id == interview_id, *conditions)
+        .values(updated_at=Interview.updated_at, **values)
+        .returning(Interview.id)
+    )
+    await db.commit()
+    return result.first() is not None
+
+
+async def _finish_generation(interview_id: int, status: str):
+    try:
+        async with database.AsyncSessionLocal() as db:
+            await _set_interview_state(
+                db,
+                interview_id,
+                # A generation that took over from this one may have finished.
+                Interview.question_generation_status == "running",
+                question_generation_status=status,
+                question_generation_locked_until=None,
+            )
+    except Exception:
+        logger.exception(f"Could not mark question generation {status} for interview {interview_id}")
+
+
+async def find_question_generation(interview_id: int, db):
+    """What the question endpoints should wait for before the interview's
+    saved questions are the full set, on any worker.
+
+    None when they already are; otherwise the generation to `follow()`:
+    this worker's, one running on another worker (polled), or a new one if
+    none is running. FALLBACK_QUESTIONS when there is nothing to generate
+    from.
+    """
+    generation = _generations.get(interview_id)
+    if generation is not None:
+        return generation
+
+    state = (
+        await db.execute(
+            select(
+                Interview.question_generation_status.label("status"),
+                (Interview.question_generation_locked_until >= func.now()).label("leased"),
+                select(InterviewQuestionAndResponse.order_number)
+                .where(InterviewQuestionAndResponse.interview_id == interview_id)
+                .exists()
+                .label("saved"),
+            ).where(Interview.id == interview_id)
+        )
+    ).one()
+    if state.status == "done" or (state.status is None and state.saved):
+        # No status: generated before it was recorded.
+        return None
+    if state.status == "running" and state.leased:
+        return PolledQuestionGeneration(interview_id)
+    return await start_question_generation(interview_id, db)
+
+
+async def start_question_generation(interview_id: int, db):
+    """Start a generation for this interview on this worker, unless one is
+    running already (here or elsewhere), which is returned instead.
+
+    Returns FALLBACK_QUESTIONS (unsaved, as before) when there is nothing to
+    base questions on. Use `find_question_generation()` unless the interview
+    is known to need one.
+    """
+    generation = _generations.get(interview_id)
+    if generation is not None:
+        return generation
+
+    interview = (
+        await db.execute(select(Interview).where(Interview.id == interview_id))
+    ).scalars().one()
+    job = (
+        await db.execute(
+            select(AiInterviewedJob).where(
+                AiInterviewedJob.id == interview.ai_interviewed_job_id
+            )
+        )
+    ).scalars().one()
+    custom_questions = (
+        await db.execute(
+            select(InterviewQuestion.question, InterviewQuestion.question_type).where(
+                InterviewQuestion.ai_interviewed_job_id == interview.ai_interviewed_job_id
+            )
+        )
+    ).mappings().all()
+
+    if not interview.resume_text and not job.description:
+        return FALLBACK_QUESTIONS
+
+    # Re-check: the awaits above may have let another request start one.
+    generation = _generations.get(interview_id)
+    if generation is not None:
+        return generation
+
+    # Claim the generation: not started, failed, or leased by a worker that died.
+    claimed = await _set_interview_state(
+        db,
+        interview_id,
+        or_(
+            Interview.question_generation_status.is_(None),
+            Interview.question_generation_status == "failed",
+            and_(
+                Interview.question_generation_status == "running",
+                Interview.question_generation_locked_until < func.now(),
+            ),
+        ),
+        question_generation_status="running",
+        question_generation_locked_until=_generation_lease(),
+    )
+    if not claimed:
+        return _generations.get(interview_id) or PolledQuestionGeneration(interview_id)
+
+    generation = QuestionGeneration(interview_id)
+    _generations[interview_id] = generation
+    generation.task = asyncio.create_task(
+        generation.run(_question_generation_messages(interview, job, custom_questions))
+    )
+    return generation
+
+
+async def score_resume(resume_text: str, description: str, requirements: str) -> dict:
+    """The LLM's resume_match_score and resume_match_feedback for a resume."""
+    sections = prompt_budget.fit(
+        "analyze_resume",
+        "gpt-3.5-turbo",
+        resume=resume_text,
+        description=description,
+        requirements=requirements,
+    )
+
+    prompt = f"""Analyze how well this resume matches the job description and requirements.
+Return ONLY a JSON object with these exact fields:
+{{
+    "resume_match_score": number between 0 and 100,
+    "resume_match_feedback": "A detailed breakdown and justification for the score, as described below."
+}}
+
+Resume Text:
+{sections["resume"]}
+
+Job Description:
+{sections["description"]}
+
+Job Requirements:
+{sections["requirements"]}
+
+Strict Scoring and Feedback Instructions:
+- Be extremely strict: Only award points for clear, direct, and recent evidence of required skills, experience, and achievements relevant to the job.
+- Penalize heavily for missing, irrelevant, outdated, or generic content, and for vague or unverifiable claims.
+- If the resume is generic, fake, or not tailored to the job, the score should be very low (below 30).
+- Do NOT give points for skills or experience not explicitly mentioned or clearly demonstrated in the resume.
+- Do NOT give high scores for resumes that lack measurable achievements, relevant keywords, or recent experience.
+- If the resume is empty, generic, or irrelevant, the score should be near 0.
+
+Feedback Format (all in the resume_match_feedback string):
+- Start with a breakdown in this format (sum must be 100):
+  Breakdown: Skills: X/40, Experience: Y/30, Education: Z/10, Achievements: W/10, Other: V/10
+- For each part, provide a justification sentence (e.g., "Skills: Only 2 of 8 required skills found; missing X, Y, Z.").
+- End with a summary sentence justifying the total score (e.g., "Overall, the resume lacks most required skills and relevant experience, resulting in a low match score.").
+- Example feedback string:
+  Breakdown: Skills: 10/40, Experience: 5/30, Education: 5/10, Achievements: 0/10, Other: 2/10. Skills: Only 1 of 7 required skills found. Experience: No relevant experience listed. Education: Degree matches requirement. Achievements: No measurable achievements. Other: Resume is generic. Overall, the resume is a poor match for the job.
+- Do NOT return arrays or objects in feedback; only a single string as above.
+
+Important:
+- Return ONLY the JSON object, no other text
+- All fields must be present
+- resume_match_score must be a number between 0 and 100, with accurate granularity (e.g. 63, 78, 42) — not rounded or bucketed
+- All values must be strings or numbers as specified
+- Be strict and critical in both scoring and feedback breakdown
+"""
+
+    match_analysis = await llm_cache.complete(
+        "analyze_resume",
+        model="gpt-3.5-turbo",
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a helpful assistant that analyzes resume-job matches. You must return a valid JSON object.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.1,
+        response_format={"type": "json_object"},
+    )
+
+    match_data = json.loads(match_analysis)
+    return {
+        "resume_match_score": int(match_data["resume_match_score"]),
+        "resume_match_feedback": match_data["resume_match_feedback"],
+    }
+
+
+async def _analyze_resume(interview_id: int, db):
+    """Score the resume against the job and store the result on the interview."""
+    stmt = (
+        select(AiInterviewedJob.description, AiInterviewedJob.requirements, Interview.resume_text)
+        .join(Interview)
+        .where(Interview.id == interview_id)
+    )
+    data = (await db.execute(stmt)).one()
+    match_data = await score_resume(data.resume_text, data.description, data.requirements)
+
+    stmt = (
+        update(Interview)
+        .values(**match_data, resume_analysis_locked_until=None)
+        .where(Interview.id == interview_id)
+        .returning(*INTERVIEW_COLUMNS)
+    )
+
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.mappings().one()
+
+
+RESUME_ANALYSIS_POLL_SECONDS = 0.5
+
+_analyses = {}
+
+
+def _start_resume_analysis(interview_id: int) -> asyncio.Task:
+    async def run():
+        try:
+            async with database.AsyncSessionLocal() as db:
+                try:
+                    return await _analyze_resume(interview_id, db)
+                except Exception:
+                    # Let the next request try again straight away.
+                    await db.rollback()
+                    await _set_interview_state(db, interview_id, resume_analysis_locked_until=None)
+                    raise
+        finally:
+            _analyses.pop(interview_id, None)
+
+    task = asyncio.create_task(run())
+    _analyses[interview_id] = task
+    return task
+
+
+async def resume_analysis(interview_id: int, db):
+    """The interview row with its resume scored: as stored, or once the
+    analysis running on this or another worker finishes, or from a new one.
+
+    A worker claims the analysis with a lease on the interview row, so only
+    one LLM call runs per interview; one whose lease ran out (its worker
+    died) or that failed is started again.
+    """
+    while True:
+        task = _analyses.get(interview_id)
+        if task is not None:
+            return await asyncio.shield(task)
+
+        interview = (
+            await db.execute(select(*INTERVIEW_COLUMNS).where(Interview.id == interview_id))
+        ).mappings().one()
+        if interview.resume_match_score is not None:
+            return interview
+
+        claimed = await _set_interview_state(
+            db,
+            interview_id,
+            Interview.resume_match_score.is_(None),
+            or_(
+                Interview.resume_analysis_locked_until.is_(None),
+                Interview.resume_analysis_locked_until < func.now(),
+            ),
+            resume_analysis_locked_until=func.now()
+            + datetime.timedelta(seconds=settings.RESUME_ANALYSIS_LEASE_SECONDS),
+        )
+        if claimed:
+            return await asyncio.shield(_start_resume_analysis(interview_id))
+        await asyncio.sleep(RESUME_ANALYSIS_POLL_SECONDS)
+
+
+# Keeps background pipelines referenced until they finish.
+_preparations = set()
+
+
+async def _prepare_interview(interview_id: int):
+    async with database.AsyncSessionLocal() as db:
+        interview = (
+            await db.execute(
+                select(Interview.resume_text, Interview.resume_match_score).where(
+                    Interview.id == interview_id
+                )
+            )
+        ).one()
+    if not interview.resume_text:
+        return
+
+    async def analyze():
+        if interview.resume_match_score is None:
+            async with database.AsyncSessionLocal() as db:
+                await resume_analysis(interview_id, db)
+
+    async def generate_questions():
+        async with database.AsyncSessionLocal() as db:
+            generation = await find_question_generation(interview_id, db)
+        if isinstance(generation, QuestionGeneration):
+            async for _ in generation.follow():
+                pass
+
+    results = await asyncio.gather(
+        analyze(),
+        generate_questions(),
+        return_exceptions=True,
+    )
+    for stage, result in zip(["resume analysis", "question generation"], results):
+        if isinstance(result, Exception):
+            logger.error(
+                f"Preparing interview {interview_id}: {stage} failed",
+                exc_info=result,
+            )
+
+
+def prepare_interview(interview_id: int):
+    """Run whatever is missing of resume analysis and question generation
+    concurrently in the background, so /analyze-resume and
+    /generate-interview-questions find the results ready (or join the
+    in-flight work) instead of starting new calls.
+
+    Call after the interview's resume text is committed; a no-op without one.
+    """
+    task = asyncio.create_task(_prepare_interview(interview_id))
+    _preparations.add(task)
+    task.add_done_callback(_preparations.discard)
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, Request, Query, UploadFile, File, HTTPException
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import select, insert, update, delete, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
 from app import database
@@ -8,13 +10,16 @@ from app.models import (
     HigherEducation, HSCEducation, SSCEducation, EmploymentDetail, Internship, Project, Certification, ClubAndCommittee, CompetitiveExam, AcademicAchievement, JobSeeker, Job, JobApplication, Company
 )
 from app.job_seeker import schemas
+from app.job_seeker import search as job_search
 from app.lib.security import hash_password, verify_password
 from app.lib.errors import CustomException
+from app.lib import pagination as pagination_lib
 from app.config import settings
 from app.job_seeker.dependencies import authorize_jobseeker
 from app.job_seeker.services import upload_resume_to_gcs
 from app.dependencies.authorization import authorize_company
 from app.lib import jwt as app_jwt
+from app.services import response_cache
 
 router = APIRouter()
 
@@ -294,7 +299,7 @@ def upload_profile_picture(
 
 @router.get('/jobs')
 def list_jobs_for_jobseeker(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     search: str = Query(None),
@@ -305,19 +310,15 @@ def list_jobs_for_jobseeker(
     min_salary: int = Query(None),
     max_salary: int = Query(None),
     company_id: int = Query(None),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: str = Query(None),
+    include_count: bool = Query(False),
 ):
     stmt = select(Job)
     filters = []
 
     if search:
-        filters.append(
-            or_(
-                Job.job_title.ilike(f"%{search}%"),
-                Job.job_role.ilike(f"%{search}%"),
-                Job.job_location.ilike(f"%{search}%"),
-                Job.work_mode.ilike(f"%{search}%")
-            )
-        )
+        filters.append(job_search.matches(search))
     if location:
         filters.append(Job.job_location.ilike(f"%{location}%"))
     if work_mode:
@@ -335,21 +336,65 @@ def list_jobs_for_jobseeker(
 
     if filters:
         stmt = stmt.where(*filters)
+
+    if pagination == "cursor" or cursor:
+        if search:
+            # Relevance order, as in offset mode; the cursor carries the
+            # last job's match scores.
+            page_stmt = stmt.add_columns(*job_search.scores(search))
+            if cursor:
+                page_stmt = page_stmt.where(
+                    job_search.after(
+                        search, pagination_lib.decode_cursor(cursor, "relevance", 3)
+                    )
+                )
+            page_stmt = page_stmt.order_by(*job_search.rank(search))
+        else:
+            page_stmt = stmt
+            if cursor:
+                page_stmt = page_stmt.where(
+                    pagination_lib.after(
+                        None, Job.id, False, pagination_lib.decode_cursor(cursor, "id", 1)
+                    )
+                )
+            page_stmt = page_stmt.order_by(*pagination_lib.order_by(None, Job.id, False))
+        rows = db.execute(page_stmt.limit(limit + 1)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            job, *last_scores = rows[-1]
+            next_cursor = pagination_lib.encode_cursor(
+                "relevance" if search else "id", [*last_scores, job.id]
+            )
+        jobs = [row[0] for row in rows]
+
+        count = None
+        if include_count:
+            count = db.execute(pagination_lib.capped_count(stmt)).scalar()
+        return {"jobs": jobs, "limit": limit, "next_cursor": next_cursor, "count": count}
+
+    if search:
+        stmt = stmt.order_by(*job_search.rank(search))
     stmt = stmt.offset(skip).limit(limit)
     jobs = db.scalars(stmt).all()
     return {"jobs": jobs, "skip": skip, "limit": limit}
 
 @router.get('/job')
-def get_job_for_jobseeker(job_id: int = Query(...), job_seeker_id: int = Query(None), db: Session = Depends(database.get_db)):
-    stmt = select(Job).where(Job.id == job_id)
-    job = db.scalars(stmt).first()
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+async def get_job_for_jobseeker(job_id: int = Query(...), job_seeker_id: int = Query(None), db: AsyncSession = Depends(database.get_async_db)):
+    async def load():
+        async with database.AsyncSessionLocal() as load_db:
+            job = (await load_db.scalars(select(Job).where(Job.id == job_id))).first()
+            if not job:
+                raise HTTPException(status_code=404, detail="Job not found")
+            return jsonable_encoder(job)
+
+    cache = response_cache.jobseeker_job
+    job = await cache.get_or_load(cache.key(id=job_id), load)
     applied = False
     if job_seeker_id is not None:
-        from app.models import JobApplication
-        exists_stmt = select(JobApplication).where(JobApplication.job_id == job_id, JobApplication.job_seeker_id == job_seeker_id)
-        exists = db.scalars(exists_stmt).first()
+        exists_stmt = select(JobApplication.id).where(JobApplication.job_id == job_id, JobApplication.job_seeker_id == job_seeker_id)
+        exists = (await db.scalars(exists_stmt)).first()
         if exists:
             applied = True
     return {"job": job, "applied": applied}
@@ -376,7 +421,7 @@ def apply_to_job(job_id: int = Query(...), job_seeker_id: int = Query(...), db:
 
 @router.get('/companies')
 def list_companies_for_jobseeker(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     search: str = Query(None)
 ):
     stmt = select(Company)
@@ -406,10 +451,19 @@ def list_companies_for_jobseeker(
     ]
 
 @router.get('/company/{company_id}')
-def get_company_for_jobseeker(company_id: int, db: Session = Depends(database.get_db)):
-    c = db.get(Company, company_id)
-    if not c:
-        raise HTTPException(status_code=404, detail="Company not found")
+async def get_company_for_jobseeker(company_id: int):
+    async def load():
+        async with database.AsyncSessionLocal() as db:
+            c = await db.get(Company, company_id)
+            if not c:
+                raise HTTPException(status_code=404, detail="Company not found")
+            return _public_company_profile(c)
+
+    cache = response_cache.company_profile
+    return await cache.get_or_load(cache.key(id=company_id), load)
+
+
+def _public_company_profile(c):
     return {
         "id": c.id,
         "name": c.name,
@@ -0,0 +1,50 @@
+"""Job search backed by the generated `jobs.search_vector` / `jobs.search_text`
+columns.
+
+Whole words are matched through the full-text GIN index; partial words (the
+old ILIKE behaviour) through the trigram index. Results rank full-text hits
+first, then by trigram similarity.
+"""
+
+from sqlalchemy import Double, cast, func, or_, tuple_
+
+from app.lib.errors import CustomException
+from app.models import Job
+
+TS_CONFIG = "english"
+
+
+def _query(term: str):
+    return func.websearch_to_tsquery(TS_CONFIG, term)
+
+
+def matches(term: str):
+    return or_(
+        Job.search_vector.op("@@")(_query(term)),
+        Job.search_text.ilike(f"%{term}%"),
+    )
+
+
+def scores(term: str) -> list:
+    """How well a job matches, most significant first. Double precision, so
+    the values round-trip exactly through a cursor."""
+    return [
+        cast(func.ts_rank_cd(Job.search_vector, _query(term)), Double),
+        cast(func.similarity(Job.search_text, term), Double),
+    ]
+
+
+def rank(term: str) -> list:
+    """ORDER BY clauses, best match first."""
+    return [score.desc() for score in scores(term)] + [Job.id]
+
+
+def after(term: str, values: list):
+    """WHERE clause selecting the jobs that come after `values` (the
+    `scores()` of the last job on the page, then its id) in `rank()`."""
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        raise CustomException("Invalid cursor", code=400)
+    *last_scores, last_id = values
+    return tuple_(*(-score for score in scores(term)), Job.id) > tuple_(
+        *(-value for value in last_scores), last_id
+    )
@@ -0,0 +1,124 @@
+"""In-process TTL + LRU cache for read endpoints, with single-flight loads.
+
+Values are shared between requests, so cache JSON-ready data (already passed
+through `jsonable_encoder`), never ORM objects, and treat it as read-only.
+
+Each worker has its own copy: invalidation is immediate in the worker that
+handles the write and the TTL bounds staleness in the others.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = True
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._flights = {}  # key -> (generation, task)
+        self._generation = 0
+        # Guards entries and generation; invalidation also runs from sync
+        # routes on the threadpool.
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(*args, **params):
+        """Normalised key: positional parts, then keyword params sorted by name
+        with None-valued params dropped."""
+        return (*args, *sorted((k, v) for k, v in params.items() if v is not None))
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def _store(self, key, value, generation):
+        with self._lock:
+            if generation != self._generation:
+                # Invalidated while loading; the value may predate the write.
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key, value):
+        self._store(key, value, self._generation)
+
+    async def get_or_load(self, key, load):
+        """Cached value for `key`, or the result of `await load()`. Concurrent
+        misses on the same key share one load."""
+        if not self.enabled:
+            return await load()
+
+        value = self._lookup(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        generation = self._generation
+        flight = self._flights.get(key)
+        if flight is not None and flight[0] == generation:
+            self.coalesced += 1
+            return await asyncio.shield(flight[1])
+
+        self.misses += 1
+
+        async def run():
+            try:
+                value = await load()
+                self._store(key, value, generation)
+                return value
+            finally:
+                if self._flights.get(key, (None, None))[1] is task:
+                    del self._flights[key]
+
+        task = asyncio.ensure_future(run())
+        self._flights[key] = (generation, task)
+        # Shielded so a disconnecting client does not cancel the load that
+        # other requests are waiting on.
+        return await asyncio.shield(task)
+
+    def invalidate(self, key=_MISSING):
+        """Drop one key, or everything when called without a key. Loads already
+        in flight finish for their waiters but are not cached."""
+        with self._lock:
+            self._generation += 1
+            if key is _MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,169 @@
+"""Durable background jobs in a database table, worked by every app process.
+
+The table's model needs `id`, `status`, `attempts`, `error`, `run_after` and
+`locked_until` columns. A worker task in each process claims due jobs with
+FOR UPDATE SKIP LOCKED and a lease; a job whose worker died is taken over
+once its lease runs out, so long-running jobs renew it as they go
+(`lease()`). A job that raises is retried with exponential backoff up to
+`max_attempts` times, then marked failed.
+
+Used by app/interview/report_jobs.py and app/company/rescore_jobs.py, which
+own what a job does, how it is queued and how its status is reported.
+"""
+
+import asyncio
+import datetime
+import logging
+
+from sqlalchemy import func, or_, select, update
+
+from app import database
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ["queued", "running"]
+
+
+class LeaseQueue:
+    def __init__(
+        self,
+        model,
+        *,
+        label: str,
+        run,
+        lease_seconds: int,
+        max_attempts: int,
+        retry_base_seconds: int,
+        concurrency: int = 1,
+        poll_seconds: int = 2,
+        claimable=None,
+        describe=None,
+        finished=None,
+    ):
+        """`run(db, job)` does the work and marks the job succeeded; raising
+        fails the attempt. Optional hooks: `claimable(now)` returns extra
+        conditions a job must meet to be claimed, `describe(job)` adds where
+        it failed to the log line, and `finished(job)` is awaited after every
+        attempt."""
+        self.model = model
+        self.label = label
+        self.run = run
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.claimable = claimable
+        self.describe = describe
+        self.finished = finished
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        # Keeps jobs in flight referenced until they finish.
+        self._running = set()
+
+    def lease(self):
+        return func.now() + datetime.timedelta(seconds=self.lease_seconds)
+
+    async def save(self, db, job_id, **values):
+        await db.execute(update(self.model).where(self.model.id == job_id).values(**values))
+        await db.commit()
+
+    def wakeup(self):
+        """Have this process's worker look for jobs now; call after queueing."""
+        self._wakeup.set()
+
+    async def _claim(self):
+        """Lease the next due job, or None. Running jobs whose lease ran out
+        belong to a worker that died and are taken over."""
+        model = self.model
+        now = func.now()
+        due = (
+            select(model.id)
+            .where(
+                model.status.in_(ACTIVE_STATUSES),
+                model.run_after <= now,
+                or_(model.locked_until.is_(None), model.locked_until < now),
+                *(self.claimable(now) if self.claimable else []),
+            )
+            .order_by(model.run_after, model.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with database.AsyncSessionLocal() as db:
+            job = (
+                await db.execute(
+                    update(model)
+                    .where(model.id == due)
+                    .values(status="running", locked_until=self.lease())
+                    .returning(model)
+                )
+            ).scalars().first()
+            await db.commit()
+            return job
+
+    async def _failed(self, db, job, error):
+        attempts = job.attempts + 1
+        where = self.describe(job) if self.describe else ""
+        logger.warning(
+            f"{self.label} job {job.id} failed{where} (attempt {attempts}): {error!r}"
+        )
+        if attempts >= self.max_attempts:
+            await self.save(db, job.id, status="failed", attempts=attempts, error=str(error), locked_until=None)
+        else:
+            await self.save(
+                db,
+                job.id,
+                status="queued",
+                attempts=attempts,
+                error=str(error),
+                locked_until=None,
+                run_after=func.now()
+                + datetime.timedelta(seconds=self.retry_base_seconds * 2 ** (attempts - 1)),
+            )
+        await db.refresh(job)
+
+    async def _run(self, job):
+        async with database.AsyncSessionLocal() as db:
+            job = await db.get(self.model, job.id)
+            try:
+                await self.run(db, job)
+            except Exception as e:
+                await db.rollback()
+                await db.refresh(job)
+                await self._failed(db, job, e)
+            if self.finished is not None:
+                await self.finished(job)
+
+    async def _work(self):
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            await slots.acquire()
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception(f"Could not claim a {self.label.lower()} job")
+                job = None
+            if job is None:
+                slots.release()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._run(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    def start_worker(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._work())
+
+    async def stop_worker(self):
+        """Stop claiming jobs. Jobs in flight are abandoned and picked up
+        again once their lease expires."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
@@ -0,0 +1,65 @@
+"""Incremental parsing of a streamed JSON array of objects."""
+
+import json
+
+
+class JSONArrayStream:
+    """Feed text chunks of a JSON array as they arrive; `feed` returns the
+    top-level objects completed by that chunk.
+
+    Text before the opening bracket (a stray "```json" fence, say) is
+    ignored, as is anything between elements that is not an object.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object_start = None
+
+    def feed(self, chunk: str) -> list:
+        self._buffer += chunk
+        objects = []
+        buffer = self._buffer
+        i = self._pos
+        while i < len(buffer) and not self.closed:
+            ch = buffer[i]
+            if not self._started:
+                if ch == "[":
+                    self._started = True
+                    self._depth = 1
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 1 and ch == "{":
+                    self._object_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and ch == "}" and self._object_start is not None:
+                    objects.append(json.loads(buffer[self._object_start : i + 1]))
+                    self._object_start = None
+            i += 1
+
+        # Keep only the unfinished object, if any.
+        keep_from = self._object_start if self._object_start is not None else i
+        self._buffer = buffer[keep_from:]
+        if self._object_start is not None:
+            self._object_start = 0
+        self._pos = i - keep_from
+        return objects
+
+    @property
+    def closed(self) -> bool:
+        """True once the array's closing bracket has been seen."""
+        return self._started and self._depth == 0
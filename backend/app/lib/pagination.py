@@ -0,0 +1,90 @@
+"""Keyset (cursor) pagination helpers.
+
+A page is ordered by an optional sort column and then by the primary key, so
+every row has a unique position. The cursor is the opaque, URL-safe encoding
+of the last row's position plus the sort it was produced under; the next page
+starts strictly after it. NULL sort values always come last.
+"""
+
+import base64
+import datetime
+import json
+
+from sqlalchemy import and_, func, or_, select
+
+from app.lib.errors import CustomException
+
+# Totals above this are reported as "at least COUNT_CAP" instead of counted.
+COUNT_CAP = 1000
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(sort_key: str, values: list) -> str:
+    payload = {"s": sort_key, "k": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str, size: int) -> list:
+    """The position in `cursor`: `size` values, the sort value (if the page
+    has a sort column) and the id, as `after()` takes them."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload["k"], list) or len(payload["k"]) != size:
+            raise ValueError("wrong number of values")
+        values = [_decode_value(v) for v in payload["k"]]
+        if not isinstance(values[-1], int) or isinstance(values[-1], bool):
+            raise ValueError("id is not an integer")
+    except (ValueError, KeyError, TypeError):
+        raise CustomException("Invalid cursor", code=400)
+    if payload.get("s") != sort_key:
+        raise CustomException("Cursor does not match the requested sort", code=400)
+    return values
+
+
+def order_by(sort_column, id_column, descending: bool) -> list:
+    if sort_column is None:
+        return [id_column.desc() if descending else id_column.asc()]
+    if descending:
+        return [sort_column.desc().nulls_last(), id_column.desc()]
+    return [sort_column.asc().nulls_last(), id_column.asc()]
+
+
+def after(sort_column, id_column, descending: bool, values: list):
+    """WHERE clause selecting the rows that come after `values` in `order_by`."""
+
+    def beyond(column, value):
+        return column < value if descending else column > value
+
+    if sort_column is None:
+        (last_id,) = values
+        return beyond(id_column, last_id)
+
+    last_value, last_id = values
+    if last_value is None:
+        return and_(sort_column.is_(None), beyond(id_column, last_id))
+    return or_(
+        beyond(sort_column, last_value),
+        and_(sort_column == last_value, beyond(id_column, last_id)),
+        sort_column.is_(None),
+    )
+
+
+def capped_count(stmt):
+    """COUNT over `stmt` that stops at COUNT_CAP rows, so it stays cheap on
+    large tenants. The result is exact when it is below the cap."""
+    return select(func.count()).select_from(
+        stmt.order_by(None).limit(COUNT_CAP).subquery()
+    )
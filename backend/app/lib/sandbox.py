@@ -0,0 +1,167 @@
+"""Runs a program in a subprocess under resource limits.
+
+Meant for the worker processes of a process pool (see
+app/interview/dsa_execution.py) set up with `init_worker`: the limits are
+set with preexec_fn, which is not safe in a process with threads, as the
+app's own processes are. Keep this module free of app imports so the pool's
+processes start quickly.
+
+Limits, not isolation: CPU time, address space, file size, process count and
+stack are capped and the program gets an empty environment in its own
+directory, but it can still read whatever its user can and reach the
+network.
+
+RLIMIT_NPROC counts every process and thread of the user. With a dedicated
+user (`init_worker(user)`, which needs root) the cap is exactly `processes`.
+Otherwise programs run as the app's user and the cap is `processes` on top
+of what that user ran when the pool process started. That snapshot is taken
+once, so all programs running at once share the same ceiling; threads the
+app starts later eat into it. Either way the cap is shared by the programs
+running at the same time, and programs running as root ignore it.
+"""
+
+import math
+import os
+import pwd
+import resource
+import signal
+import subprocess
+
+# Set once per pool process by init_worker().
+_user = None
+_baseline = None
+
+
+def resolve_user(user):
+    """(uid, gid) of a user name or uid."""
+    if str(user).isdigit():
+        uid = int(user)
+        try:
+            return uid, pwd.getpwuid(uid).pw_gid
+        except KeyError:
+            return uid, uid
+    entry = pwd.getpwnam(user)
+    return entry.pw_uid, entry.pw_gid
+
+
+def init_worker(user=None):
+    """Pool initializer: programs run as `user` ((uid, gid), see
+    `resolve_user`), or as the app's user on top of what it runs now."""
+    global _user, _baseline
+    _user = user
+    if user is None:
+        _baseline = _user_tasks()
+
+
+def _set_limit(kind, value):
+    _, hard = resource.getrlimit(kind)
+    if hard != resource.RLIM_INFINITY:
+        value = min(value, hard)
+    resource.setrlimit(kind, (value, value if kind != resource.RLIMIT_CPU else hard))
+
+
+def _user_tasks():
+    """Processes and threads the current user runs, as RLIMIT_NPROC counts
+    them; None without /proc."""
+    uid = os.getuid()
+    try:
+        pids = [pid for pid in os.listdir("/proc") if pid.isdigit()]
+    except OSError:
+        return None
+    count = 0
+    for pid in pids:
+        try:
+            if os.stat(f"/proc/{pid}").st_uid == uid:
+                count += len(os.listdir(f"/proc/{pid}/task"))
+        except OSError:
+            # Gone meanwhile.
+            continue
+    return count
+
+
+def _apply_limits(cpu_ms, memory_kb, file_size_kb, processes, stack_kb):
+    if _user is not None:
+        max_tasks = processes
+    elif _baseline is not None:
+        max_tasks = _baseline + processes
+    else:
+        max_tasks = None
+
+    def apply():
+        # SIGXCPU at the soft limit; ending the program is enough.
+        _set_limit(resource.RLIMIT_CPU, max(1, math.ceil(cpu_ms / 1000)))
+        if memory_kb:
+            _set_limit(resource.RLIMIT_AS, memory_kb * 1024)
+        _set_limit(resource.RLIMIT_FSIZE, file_size_kb * 1024)
+        if max_tasks is not None:
+            _set_limit(resource.RLIMIT_NPROC, max_tasks)
+        _set_limit(resource.RLIMIT_STACK, stack_kb * 1024)
+        _set_limit(resource.RLIMIT_CORE, 0)
+        if _user is not None:
+            uid, gid = _user
+            os.setgroups([])
+            os.setgid(gid)
+            os.setuid(uid)
+
+    return apply
+
+
+def _read(path, limit):
+    try:
+        with open(path, "rb") as f:
+            return f.read(limit).decode(errors="replace")
+    except FileNotFoundError:
+        return ""
+
+
+def run(command, cwd, stdin="", *, cpu_ms, wall_ms, memory_kb, file_size_kb, processes, stack_kb, tag="run"):
+    """Run `command` in `cwd` and return {"exit_code", "signal",
+    "timed_out", "stdout", "stderr"}; "error" instead when it could not be
+    started.
+
+    Output goes to files in `cwd`, so the file size limit caps it too.
+    """
+    stdout_path = os.path.join(cwd, f".{tag}.stdout")
+    stderr_path = os.path.join(cwd, f".{tag}.stderr")
+    try:
+        with open(stdout_path, "wb") as stdout, open(stderr_path, "wb") as stderr:
+            process = subprocess.Popen(
+                command,
+                cwd=cwd,
+                stdin=subprocess.PIPE,
+                stdout=stdout,
+                stderr=stderr,
+                env={"PATH": os.environ.get("PATH", "/usr/bin:/bin"), "HOME": cwd, "LANG": "C.UTF-8"},
+                start_new_session=True,
+                preexec_fn=_apply_limits(cpu_ms, memory_kb, file_size_kb, processes, stack_kb),
+            )
+    except OSError as e:
+        return {"error": f"{command[0]}: {e.strerror or e}"}
+
+    timed_out = False
+    try:
+        process.communicate(stdin.encode(), timeout=wall_ms / 1000)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+    finally:
+        # Whatever it started goes too.
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        process.wait()
+
+    killed_by = None
+    if process.returncode < 0:
+        try:
+            killed_by = signal.Signals(-process.returncode).name
+        except ValueError:
+            killed_by = f"signal {-process.returncode}"
+    limit = file_size_kb * 1024
+    return {
+        "exit_code": process.returncode,
+        "signal": killed_by,
+        "timed_out": timed_out,
+        "stdout": _read(stdout_path, limit),
+        "stderr": _read(stderr_path, limit),
+    }
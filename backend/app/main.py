@@ -8,16 +8,14 @@ from fastapi.staticfiles import StaticFiles
 from sqlalchemy.exc import SQLAlchemyError
 
 from app import job_seeker, company, interview
+from app.company import rescore_jobs
+from app.interview import dsa_execution, report_jobs
 from app.public import router as public_router
 from app.lib.errors import CustomException
 
 from app.config import settings
 
-from .database import engine, Base
-
 from app.routes import admin as admin_router
-from app.models import AdminUser
-from app.lib.security import hash_password
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,8 +24,6 @@ logging.basicConfig(
 logger = logging.getLogger("uvicorn.error")
 logger.setLevel(logging.INFO)  # or DEBUG in dev
 
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="EduDiagnoAI API",
     description="API for EduDiagnoAI, an AI-powered interview platform",
@@ -73,23 +69,40 @@ def read_root():
 
 
 @app.on_event("startup")
-def create_default_admin():
-    from sqlalchemy.orm import Session
-    from .database import SessionLocal
-    db: Session = SessionLocal()
-    try:
-        admin = db.query(AdminUser).filter(AdminUser.email == "admin@edudiagno.com").first()
-        if not admin:
-            admin = AdminUser(
-                email="admin@edudiagno.com",
-                password_hash=hash_password("EdUdIaGnO364"),
-                is_active=True,
-                role="superadmin"
-            )
-            db.add(admin)
-            db.commit()
-    finally:
-        db.close()
+def bootstrap_database():
+    # Schema creation and the default admin are handled by `python -m app.bootstrap`
+    # on deploy; local setups can opt back into running it on every boot.
+    if settings.BOOTSTRAP_ON_STARTUP:
+        from app import bootstrap
+
+        bootstrap.run()
+
+
+@app.on_event("startup")
+async def start_report_worker():
+    if settings.REPORT_WORKER_ENABLED:
+        report_jobs.start_worker()
+
+
+@app.on_event("shutdown")
+async def stop_report_worker():
+    await report_jobs.stop_worker()
+
+
+@app.on_event("startup")
+async def start_rescore_worker():
+    if settings.RESCORE_WORKER_ENABLED:
+        rescore_jobs.start_worker()
+
+
+@app.on_event("shutdown")
+async def stop_rescore_worker():
+    await rescore_jobs.stop_worker()
+
+
+@app.on_event("shutdown")
+def stop_dsa_executor():
+    dsa_execution.shutdown()
 
 
 if __name__ == "__main__":
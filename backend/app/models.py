@@ -1,16 +1,29 @@
 from sqlalchemy import (
+    DDL,
     Boolean,
     Column,
+    Computed,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     String,
+    Text,
     func,
     UniqueConstraint,
+    event,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
 
+# Needed by the trigram index on jobs.search_text
+event.listen(
+    Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
+
 
 class Company(Base):
     __tablename__ = "companies"
@@ -318,10 +331,10 @@ class Job(Base):
     job_location = Column(String)
     job_locality = Column(String)
     work_mode = Column(String)  # e.g., remote, hybrid, on-site
-    min_work_experience = Column(Integer)
-    max_work_experience = Column(Integer)
-    min_salary_per_month = Column(Integer)
-    max_salary_per_month = Column(Integer)
+    min_work_experience = Column(Integer, index=True)
+    max_work_experience = Column(Integer, index=True)
+    min_salary_per_month = Column(Integer, index=True)
+    max_salary_per_month = Column(Integer, index=True)
     additional_benefits = Column(String)
     skills = Column(String)
     qualification = Column(String)  # e.g., GRADUATE/DIPLOMA, POSTGRADUATE, DOCTORATE
@@ -337,10 +350,43 @@ class Job(Base):
     is_closed = Column(Boolean, default=False)     # Admin: close job
     is_deleted = Column(Boolean, default=False)    # Admin: soft delete
     admin_notes = Column(String)                   # Admin: notes about job
+    # Search columns, maintained by Postgres (see app/job_seeker/search.py)
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(job_title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(job_role, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(job_location, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(work_mode, '')), 'C')",
+                persisted=True,
+            ),
+        )
+    )
+    search_text = deferred(
+        Column(
+            String,
+            Computed(
+                "coalesce(job_title, '') || ' ' || coalesce(job_role, '') || ' ' || "
+                "coalesce(job_location, '') || ' ' || coalesce(work_mode, '')",
+                persisted=True,
+            ),
+        )
+    )
 
     company = relationship("Company", back_populates="jobs")
     job_applications = relationship("JobApplication", back_populates="job")
 
+    __table_args__ = (
+        Index("ix_jobs_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_jobs_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
+
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
@@ -504,6 +550,8 @@ class InterviewQuestion(Base):
     question = Column(String)
     question_type = Column(String)  # technical, behavioral, problem_solving, custom
     order_number = Column(Integer)
+    # The question read out, in GCS; see app/interview/question_audio.py
+    audio_url = Column(String)
     ai_interviewed_job_id = Column(
         Integer,
         ForeignKey("ai_interviewed_jobs.id", ondelete="CASCADE")
@@ -535,6 +583,8 @@ class InterviewQuestionResponse(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     answer = Column(String)
+    # Scored as soon as it is answered; see app/interview/answer_scoring.py
+    evaluation = Column(JSON)
     interview_question_id = Column(
         Integer,
         ForeignKey("interview_questions.id", ondelete="CASCADE"),
@@ -612,7 +662,7 @@ class QuizOption(Base):
     label = Column(String)
     correct = Column(Boolean, default=False)
     quiz_question_id = Column(
-        Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE")
+        Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE"), index=True
     )
 
     quiz_question = relationship("QuizQuestion", back_populates="quiz_options")
@@ -683,7 +733,7 @@ class Interview(Base):
     email = Column(String, nullable=False)
     email_otp = Column(String)
     email_otp_expiry = Column(DateTime)
-    email_verified = Column(String, default=False)
+    email_verified = Column(String, default="false")
     phone = Column(String)
     phone_otp = Column(String)
     phone_otp_expiry = Column(DateTime)
@@ -707,6 +757,12 @@ class Interview(Base):
     quiz_score = Column(Integer)
     dsa_score = Column(Integer)
     report_file_url = Column(String)
+    # running, done or failed (see app/interview/services.py); NULL before
+    # generation starts, and for interviews generated before it was tracked
+    question_generation_status = Column(String)
+    question_generation_locked_until = Column(DateTime)
+    # Set while a worker scores the resume (see app/interview/services.py)
+    resume_analysis_locked_until = Column(DateTime)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     ai_interviewed_job_id = Column(
@@ -739,6 +795,12 @@ class Interview(Base):
 
     __table_args__ = (
         UniqueConstraint("email", "ai_interviewed_job_id", name="uq_email_job"),
+        Index(
+            "ix_interviews_job_status_created",
+            "ai_interviewed_job_id",
+            "status",
+            "created_at",
+        ),
     )
 
 
@@ -749,12 +811,17 @@ class InterviewQuestionAndResponse(Base):
     question_type = Column(String)  # technical, behavioral, problem_solving, custom
     order_number = Column(Integer, primary_key=True)
     answer = Column(String)
+    # The question read out, in GCS; see app/interview/question_audio.py
+    audio_url = Column(String)
+    # Scored as soon as it is answered; see app/interview/answer_scoring.py
+    evaluation = Column(JSON)
     created_at = Column(DateTime, default=func.now())
     interview_id = Column(
         Integer,
         ForeignKey("interviews.id", ondelete="CASCADE"),
         primary_key=True,
         nullable=False,
+        index=True,
     )
 
     # Relationships
@@ -806,7 +873,7 @@ class DSATestCaseResponse(Base):
     dsa_response_id = Column(
         Integer, ForeignKey("dsa_responses.id", ondelete="CASCADE"), primary_key=True
     )
-    task_id = Column(String)
+    task_id = Column(String, index=True)
     dsa_test_case_id = Column(
         Integer, ForeignKey("dsa_test_cases.id", ondelete="CASCADE"), primary_key=True
     )
@@ -922,4 +989,115 @@ class DSAPoolTestCase(Base):
     dsa_pool_question_id = Column(Integer, ForeignKey("dsa_pool_questions.id", ondelete="CASCADE"), nullable=False)
 
     # Relationships
-    dsa_pool_question = relationship("DSAPoolQuestion", back_populates="test_cases")
\ No newline at end of file
+    dsa_pool_question = relationship("DSAPoolQuestion", back_populates="test_cases")
+
+
+class CompanyDailyStats(Base):
+    """Per-company, per-day interview counters behind /company/analytics.
+
+    Maintained incrementally by app/services/company_stats.py; days are the
+    interview's creation date.
+    """
+
+    __tablename__ = "company_daily_stats"
+
+    company_id = Column(
+        Integer, ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    interviews_created = Column(Integer, nullable=False, default=0, server_default="0")
+    interviews_completed = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_score_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_score_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class LLMCacheEntry(Base):
+    """Stored chat-completion results, keyed by a hash of model, messages and
+    parameters. Used by app/services/llm_cache.py when LLM_CACHE_BACKEND is
+    "postgres"."""
+
+    __tablename__ = "llm_cache_entries"
+
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    total_tokens = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class MatchDocument(Base):
+    """Term counts of a resume ("resume", interview id) or a job's description
+    and requirements ("job", ai_interviewed_job id), for
+    app/services/resume_match.py. Rebuilt when text_hash stops matching."""
+
+    __tablename__ = "match_documents"
+
+    kind = Column(String, primary_key=True)
+    ref_id = Column(Integer, primary_key=True)
+    text_hash = Column(String(64), nullable=False)
+    terms = Column(JSON, nullable=False)
+    length = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class ReportJob(Base):
+    """A queued or finished interview report; see app/interview/report_jobs.py.
+
+    `stage` is the next stage to run (analyze, render, complete), or "done".
+    Each stage's output (`analysis`, `report_file_url`) is saved as it
+    completes so a retry resumes where it failed.
+    """
+
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True)
+    interview_id = Column(
+        Integer, ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    status = Column(String, nullable=False, default="queued", server_default="queued")  # queued, running, succeeded, failed
+    stage = Column(String, nullable=False, default="analyze", server_default="analyze")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    payload = Column(JSON, nullable=False)
+    analysis = Column(JSON)
+    report_file_url = Column(String)
+    result = Column(JSON)
+    error = Column(Text)
+    run_after = Column(DateTime, nullable=False, server_default=func.now())
+    locked_until = Column(DateTime)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (Index("ix_report_jobs_status_run_after", "status", "run_after"),)
+
+
+class RescoreJob(Base):
+    """A bulk re-score of every resume of an AI-interviewed job; see
+    app/company/rescore_jobs.py.
+
+    `last_interview_id` is the checkpoint: interviews up to it are done, so a
+    retried job carries on after it.
+    """
+
+    __tablename__ = "rescore_jobs"
+
+    id = Column(Integer, primary_key=True)
+    ai_interviewed_job_id = Column(
+        Integer,
+        ForeignKey("ai_interviewed_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    status = Column(String, nullable=False, default="queued", server_default="queued")  # queued, running, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    total = Column(Integer)
+    processed = Column(Integer, nullable=False, default=0, server_default="0")
+    failed = Column(Integer, nullable=False, default=0, server_default="0")
+    last_interview_id = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text)
+    run_after = Column(DateTime, nullable=False, server_default=func.now())
+    locked_until = Column(DateTime)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (Index("ix_rescore_jobs_status_run_after", "status", "run_after"),)
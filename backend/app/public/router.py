@@ -1,16 +1,23 @@
 import base64
 from io import BytesIO
 import json
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+import logging
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pypdf import PdfReader
-from sqlalchemy import and_, select
-from sqlalchemy.orm import Session, joinedload
-
-from app import database, services
-from app.configs import openai
-from app.models import City, Country, State, DSAPoolQuestion
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from app import database
+from app.company import services as company_services
+from app.lib import jwt
+from app.lib.errors import CustomException
+from app.models import DSAPoolQuestion
 from app.public import schemas
+from app.services import audio_normalize, geo_index, llm_cache, llm_gateway, response_cache, speech_cache, streaming_stt
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -32,11 +39,13 @@ async def speech_to_text(
         return {"transcript": "no answer"}
 
     contents = await audio_file.read()
-    audio_file_obj = BytesIO(contents)
-    audio_file_obj.name = "audio.webm"
+    audio_file_obj = await audio_normalize.normalize(contents)
+    if audio_file_obj is None:
+        audio_file_obj = BytesIO(contents)
+        audio_file_obj.name = "audio.webm"
 
-    result = await openai.client.audio.transcriptions.create(
-        model="whisper-1", file=audio_file_obj, language="en"
+    result = await llm_gateway.transcribe(
+        "speech_to_text", model="whisper-1", file=audio_file_obj, language="en"
     )
 
     if not result or not result.text:
@@ -47,44 +56,78 @@ async def speech_to_text(
     return {"transcript": result.text}
 
 
-@router.get("/country")
-async def get_country(keyword: str = "", db: Session = Depends(database.get_db)):
-    stmt = (
-        select(Country.id, Country.name, Country.currency)
-        .where(Country.name.ilike(f"%{keyword}%"))
-        .order_by(Country.name)
-    )
+@router.websocket("/speech-to-text/stream")
+async def speech_to_text_stream(websocket: WebSocket, i_token: str = ""):
+    """Transcribe an answer while it is being recorded.
+
+    Send the recorder's chunks as binary messages, then {"event": "stop"}.
+    Each transcribed segment comes back as {"event": "segment", "index",
+    "text"}; the answer as {"event": "transcript", "transcript"} right after
+    the stop. Errors are {"event": "error", "detail"}; fall back to
+    POST /speech-to-text then.
+    """
+    try:
+        authorized = "interview_id" in jwt.decode(i_token)
+    except Exception:
+        authorized = False
+    if not authorized:
+        await websocket.close(code=1008, reason="Cannot Authenticate")
+        return
+    await websocket.accept()
+
+    async def on_segment(index, text):
+        await websocket.send_json({"event": "segment", "index": index, "text": text})
+
+    transcription = streaming_stt.StreamingTranscription(on_segment)
+    try:
+        await transcription.start()
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                await transcription.feed(message["bytes"])
+            elif message.get("text") and json.loads(message["text"]).get("event") == "stop":
+                break
+
+        transcript = await transcription.finish()
+        if not transcript and (transcription.process.returncode or not transcription.segments):
+            # ffmpeg failed, or too little was decoded to send; the client
+            # falls back to POST /speech-to-text with the whole recording.
+            raise CustomException("Unable to comprehend, please re-record answer", code=500)
+        await websocket.send_json(
+            {"event": "transcript", "transcript": transcript or "no answer"}
+        )
+        await websocket.close()
+    except WebSocketDisconnect:
+        transcription.abort()
+    except Exception as e:
+        transcription.abort()
+        if not isinstance(e, CustomException):
+            logger.exception("Streaming transcription failed")
+        detail = str(e) if isinstance(e, CustomException) else "Transcription failed"
+        try:
+            await websocket.send_json({"event": "error", "detail": detail})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+
 
-    # Only apply limit when searching with a keyword
-    if keyword:
-        stmt = stmt.offset(0).limit(10)
+def _optional_id(value: str):
+    return int(value) if value else None
 
-    countries = db.execute(stmt).mappings().all()
-    return countries
+
+@router.get("/country")
+async def get_country(keyword: str = ""):
+    return (await geo_index.get()).search_countries(keyword)
 
 
 @router.get("/state")
 async def get_state(
     country_id: str = None,
     keyword: str = "",
-    db: Session = Depends(database.get_db),
 ):
-    filters = [State.name.ilike(f"%{keyword}%")]
-    if country_id:
-        filters.append(
-            State.country_id == country_id,
-        )
-
-    stmt = (
-        select(State.id, State.name, Country.currency)
-        .join(Country)
-        .where(and_(*filters))
-        .order_by(State.name)
-        .offset(0)
-        .limit(10)
-    )
-    states = db.execute(stmt).mappings().all()
-    return states
+    return (await geo_index.get()).search_states(keyword, _optional_id(country_id))
 
 
 @router.get("/city")
@@ -92,47 +135,48 @@ async def get_city(
     country_id: str = None,
     state_id: str = None,
     keyword: str = "",
-    db: Session = Depends(database.get_db),
 ):
-    filters = [City.name.ilike(f"%{keyword}%")]
-    if country_id:
-        filters.append(City.country_id == country_id)
-    if state_id:
-        filters.append(City.state_id == state_id)
-
-    stmt = (
-        select(City.id, City.name, Country.currency)
-        .join(Country)
-        .where(and_(*filters))
-        .order_by(City.name)
-        .offset(0)
-        .limit(10)
+    return (await geo_index.get()).search_cities(
+        keyword, _optional_id(country_id), _optional_id(state_id)
     )
-    cities = db.execute(stmt).mappings().all()
-    return cities
 
 
 @router.post("/text-to-speech")
 async def text_to_speech(text_to_speech_data: schemas.TextToSpeech):
-    async with openai.client.audio.speech.with_streaming_response.create(
-        model="gpt-4o-mini-tts",
-        voice="ash",
-        input=text_to_speech_data.text,
-        instructions="Speak as an interviewer",
-    ) as response:
+    audio = await speech_cache.synthesize(
+        text_to_speech_data.text, **speech_cache.INTERVIEWER
+    )
 
-        speech_file = BytesIO()
+    audio_base64 = base64.b64encode(audio).decode("utf-8")
 
-        async for chunk in response.iter_bytes():
-            speech_file.write(chunk)
+    return {"audio_base64": audio_base64}
 
-        speech_file.seek(0)
 
-        audio_base64 = ""
-        if speech_file:
-            audio_base64 = base64.b64encode(speech_file.read()).decode("utf-8")
+@router.get("/text-to-speech/stream")
+async def text_to_speech_stream(text: str = Query(..., min_length=1, max_length=4096)):
+    """The interviewer saying `text`, as MP3 streamed while it is synthesized.
 
-        return {"audio_base64": audio_base64}
+    A GET so it can be an <audio> src: the browser starts playing after the
+    first chunk instead of after the whole clip, and can cache it.
+    """
+    chunks = speech_cache.stream(text, **speech_cache.INTERVIEWER)
+    # Wait for the first chunk, so a failure to synthesize is still a proper
+    # error response rather than a truncated stream.
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+
+    async def body():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=speech_cache.MEDIA_TYPE,
+        headers={"Cache-Control": "public, max-age=86400"},
+    )
 
 
 @router.post("/parse-resume")
@@ -179,7 +223,8 @@ async def parse_resume(file: UploadFile = File(...)):
     - Do not remove fields or return null values — always return the full structure with valid string content
     """
 
-    response = await openai.client.chat.completions.create(
+    content = await llm_cache.complete(
+        "parse_resume",
         model="gpt-3.5-turbo",
         messages=[
             {
@@ -192,19 +237,31 @@ async def parse_resume(file: UploadFile = File(...)):
         response_format={"type": "json_object"},
     )
 
-    resume_data = json.loads(response.choices[0].message.content)
+    resume_data = json.loads(content)
     return resume_data
 
 
 @router.get("/interview-question")
-async def get_interview_questions_by_job(
-    job_id: int, db: Session = Depends(database.get_db)
-):
-    return services.interview_question.get_interview_question_by_job_id(job_id, db)
+async def get_interview_questions_by_job(job_id: int):
+    async def load():
+        async with database.AsyncSessionLocal() as db:
+            return jsonable_encoder(
+                await company_services.get_interview_question_by_job_id(job_id, db)
+            )
+
+    cache = response_cache.interview_questions
+    return await cache.get_or_load(cache.key(id=job_id), load)
 
 
 @router.get("/dsapool-questions")
-def get_dsapool_questions(db: Session = Depends(database.get_db)):
+async def get_dsapool_questions():
     # Return all DSA pool questions with their test cases
-    questions = db.query(DSAPoolQuestion).options(joinedload(DSAPoolQuestion.test_cases)).all()
-    return questions
+    async def load():
+        async with database.AsyncSessionLocal() as db:
+            stmt = select(DSAPoolQuestion).options(
+                selectinload(DSAPoolQuestion.test_cases)
+            )
+            return jsonable_encoder((await db.execute(stmt)).scalars().all())
+
+    cache = response_cache.dsapool_questions
+    return await cache.get_or_load(cache.key(), load)
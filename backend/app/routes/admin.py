@@ -4,11 +4,13 @@ from sqlalchemy import and_, insert, select, update, delete
 from app import models, database, schemas
 from app.job_seeker.schemas import JobSeekerOut, JobSeekerUpdate
 from app.company.schemas import CompanyOut, CompanyBase, JobOut, JobBase, AiInterviewedJobOut, AiInterviewedJobBase
+from app.interview import question_audio
 from app.interview.schemas import InterviewOut, InterviewBase, QuizQuestionOut, QuizQuestionBase, DSAQuestionOut, DSAQuestionBase, InterviewQuestionOut, InterviewQuestionBase
 from app.schemas import JobApplicationOut, JobApplicationBase
 from app.models import AdminUser, DSAPoolQuestion, DSAPoolTestCase
 from app.lib import jwt as app_jwt
 from app.lib.security import verify_password
+from app.services import audio_normalize, company_stats, geo_index, llm_cache, llm_gateway, prompt_budget, response_cache, speech_cache
 from pydantic import BaseModel
 from typing import Optional, List
 from sqlalchemy import and_, insert, select, update, delete
@@ -95,7 +97,7 @@ def serialize_job_application_for_admin(app):
 
 # --- JobSeeker Endpoints ---
 @router.get("/jobseekers", response_model=list[JobSeekerOut])
-def list_jobseekers(db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_jobseekers(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     jobseekers = db.query(models.JobSeeker).all()
     return [serialize_jobseeker_for_admin(js) for js in jobseekers]
 
@@ -145,18 +147,18 @@ def verify_jobseeker(id: int, verify: bool, db: Session = Depends(database.get_d
     return {"id": id, "is_verified": verify}
 
 @router.get("/jobseekers/{id}/applications", response_model=list[JobApplicationOut])
-def get_jobseeker_applications(id: int, db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def get_jobseeker_applications(id: int, db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     apps = db.query(models.JobApplication).filter(models.JobApplication.job_seeker_id == id).all()
     return [serialize_job_application_for_admin(app) for app in apps]
 
 @router.get("/jobseekers/{id}/interviews", response_model=list[InterviewOut])
-def get_jobseeker_interviews(id: int, db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def get_jobseeker_interviews(id: int, db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     interviews = db.query(models.Interview).filter(models.Interview.email == db.query(models.JobSeeker.email).filter(models.JobSeeker.id == id).scalar()).all()
     return [serialize_interview_for_admin(interview) for interview in interviews]
 
 # --- Company Endpoints ---
 @router.get("/companies", response_model=list[CompanyOut])
-def list_companies(db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_companies(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     return db.query(models.Company).all()
 
 @router.get("/companies/{id}", response_model=CompanyOut)
@@ -174,6 +176,8 @@ def update_company(id: int, data: CompanyBase, db: Session = Depends(database.ge
     for k, v in data.dict(exclude_unset=True).items():
         setattr(c, k, v)
     db.commit()
+    response_cache.company_changed(id)
+    response_cache.ai_interviewed_job_changed()
     db.refresh(c)
     return c
 
@@ -184,6 +188,8 @@ def delete_company(id: int, db: Session = Depends(database.get_db), admin=Depend
         raise HTTPException(404, "Company not found")
     db.delete(c)
     db.commit()
+    response_cache.company_changed(id)
+    response_cache.ai_interviewed_job_changed()
     return {"ok": True}
 
 @router.post("/companies/{id}/suspend")
@@ -193,6 +199,7 @@ def suspend_company(id: int, suspend: bool, db: Session = Depends(database.get_d
         raise HTTPException(404, "Company not found")
     c.is_suspended = suspend
     db.commit()
+    response_cache.company_changed(id)
     return {"id": id, "is_suspended": suspend}
 
 @router.post("/companies/{id}/verify")
@@ -202,6 +209,7 @@ def verify_company(id: int, verify: bool, db: Session = Depends(database.get_db)
         raise HTTPException(404, "Company not found")
     c.verified = verify
     db.commit()
+    response_cache.company_changed(id)
     return {"id": id, "verified": verify}
 
 # --- Job Endpoints ---
@@ -235,7 +243,7 @@ def serialize_job_for_admin(job):
     }
 
 @router.get("/jobs", response_model=list[JobOut])
-def list_jobs(db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_jobs(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     jobs = db.query(models.Job).all()
     return [serialize_job_for_admin(job) for job in jobs]
 
@@ -254,6 +262,7 @@ def update_job(id: int, data: JobBase, db: Session = Depends(database.get_db), a
     for k, v in data.dict(exclude_unset=True).items():
         setattr(j, k, v)
     db.commit()
+    response_cache.job_changed(id)
     db.refresh(j)
     return j
 
@@ -264,6 +273,7 @@ def delete_job(id: int, db: Session = Depends(database.get_db), admin=Depends(au
         raise HTTPException(404, "Job not found")
     db.delete(j)
     db.commit()
+    response_cache.job_changed(id)
     return {"ok": True}
 
 @router.post("/jobs/{id}/approve")
@@ -273,6 +283,7 @@ def approve_job(id: int, approve: bool, db: Session = Depends(database.get_db),
         raise HTTPException(404, "Job not found")
     j.is_approved = approve
     db.commit()
+    response_cache.job_changed(id)
     return {"id": id, "is_approved": approve}
 
 @router.post("/jobs/{id}/close")
@@ -282,6 +293,7 @@ def close_job(id: int, close: bool, db: Session = Depends(database.get_db), admi
         raise HTTPException(404, "Job not found")
     j.is_closed = close
     db.commit()
+    response_cache.job_changed(id)
     return {"id": id, "is_closed": close}
 
 @router.post("/jobs/{id}/feature")
@@ -291,11 +303,12 @@ def feature_job(id: int, feature: bool, db: Session = Depends(database.get_db),
         raise HTTPException(404, "Job not found")
     j.is_featured = feature
     db.commit()
+    response_cache.job_changed(id)
     return {"id": id, "is_featured": feature}
 
 # --- AiInterviewedJob Endpoints ---
 @router.get("/ai-interviewed-jobs", response_model=list[AiInterviewedJobOut])
-def list_ai_interviewed_jobs(db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_ai_interviewed_jobs(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     return db.query(models.AiInterviewedJob).all()
 
 @router.get("/ai-interviewed-jobs/{id}", response_model=AiInterviewedJobOut)
@@ -313,6 +326,7 @@ def update_ai_interviewed_job(id: int, data: AiInterviewedJobBase, db: Session =
     for k, v in data.dict(exclude_unset=True).items():
         setattr(job, k, v)
     db.commit()
+    response_cache.ai_interviewed_job_changed(id)
     db.refresh(job)
     return job
 
@@ -321,8 +335,11 @@ def delete_ai_interviewed_job(id: int, db: Session = Depends(database.get_db), a
     job = db.query(models.AiInterviewedJob).get(id)
     if not job:
         raise HTTPException(404, "AiInterviewedJob not found")
+    db.execute(company_stats.job_deleted(id))
     db.delete(job)
     db.commit()
+    response_cache.ai_interviewed_job_changed(id)
+    response_cache.interview_questions_changed(id)
     return {"ok": True}
 
 @router.post("/ai-interviewed-jobs/{id}/approve")
@@ -381,7 +398,7 @@ def serialize_interview_for_admin(interview):
     }
 
 @router.get("/interviews", response_model=list[InterviewOut])
-def list_interviews(db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_interviews(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     interviews = db.query(models.Interview).all()
     return [serialize_interview_for_admin(interview) for interview in interviews]
 
@@ -397,7 +414,11 @@ def update_interview(id: int, data: InterviewBase, db: Session = Depends(databas
     interview = db.query(models.Interview).get(id)
     if not interview:
         raise HTTPException(404, "Interview not found")
-    for k, v in data.dict(exclude_unset=True).items():
+    values = data.dict(exclude_unset=True)
+    stats_change = company_stats.interview_changed(id, values)
+    if stats_change is not None:
+        db.execute(stats_change)
+    for k, v in values.items():
         setattr(interview, k, v)
     db.commit()
     db.refresh(interview)
@@ -408,6 +429,7 @@ def delete_interview(id: int, db: Session = Depends(database.get_db), admin=Depe
     interview = db.query(models.Interview).get(id)
     if not interview:
         raise HTTPException(404, "Interview not found")
+    db.execute(company_stats.interview_deleted(id))
     db.delete(interview)
     db.commit()
     return {"ok": True}
@@ -423,7 +445,7 @@ def flag_interview(id: int, flag: bool, db: Session = Depends(database.get_db),
 
 # --- QuizQuestion Endpoints ---
 @router.get("/quiz-questions", response_model=list[QuizQuestionOut])
-def list_quiz_questions(db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_quiz_questions(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     return db.query(models.QuizQuestion).all()
 
 @router.get("/quiz-questions/{id}", response_model=QuizQuestionOut)
@@ -441,6 +463,7 @@ def update_quiz_question(id: int, data: QuizQuestionBase, db: Session = Depends(
     for k, v in data.dict(exclude_unset=True).items():
         setattr(q, k, v)
     db.commit()
+    response_cache.ai_interviewed_job_changed()
     db.refresh(q)
     return q
 
@@ -451,6 +474,7 @@ def delete_quiz_question(id: int, db: Session = Depends(database.get_db), admin=
         raise HTTPException(404, "QuizQuestion not found")
     db.delete(q)
     db.commit()
+    response_cache.ai_interviewed_job_changed()
     return {"ok": True}
 
 @router.post("/quiz-questions/{id}/approve")
@@ -488,7 +512,7 @@ def create_dsa_question(data: DSAQuestionCreate, db: Session = Depends(database.
     # Optionally handle test_cases here if needed
     return q
 @router.get("/dsa-questions", response_model=list[DSAQuestionOut])
-def list_dsa_questions(db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_dsa_questions(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     return db.query(models.DSAQuestion).all()
 
 @router.get("/dsa-questions/{id}", response_model=DSAQuestionOut)
@@ -506,6 +530,7 @@ def update_dsa_question(id: int, data: DSAQuestionBase, db: Session = Depends(da
     for k, v in data.dict(exclude_unset=True).items():
         setattr(q, k, v)
     db.commit()
+    response_cache.ai_interviewed_job_changed()
     db.refresh(q)
     return q
 
@@ -516,6 +541,7 @@ def delete_dsa_question(id: int, db: Session = Depends(database.get_db), admin=D
         raise HTTPException(404, "DSAQuestion not found")
     db.delete(q)
     db.commit()
+    response_cache.ai_interviewed_job_changed()
     return {"ok": True}
 
 @router.post("/dsa-questions/{id}/approve")
@@ -543,7 +569,7 @@ def create_interview_question(data: InterviewQuestionBase, db: Session = Depends
     return q
 
 @router.get("/interview-questions", response_model=list[InterviewQuestionOut])
-def list_interview_questions(db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_interview_questions(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     return db.query(models.InterviewQuestion).all()
 
 @router.get("/interview-questions/{id}", response_model=InterviewQuestionOut)
@@ -558,9 +584,14 @@ def update_interview_question(id: int, data: InterviewQuestionBase, db: Session
     q = db.query(models.InterviewQuestion).get(id)
     if not q:
         raise HTTPException(404, "InterviewQuestion not found")
-    for k, v in data.dict(exclude_unset=True).items():
+    values = data.dict(exclude_unset=True)
+    if "question" in values:
+        # The old audio is of the old text
+        values["audio_url"] = None
+    for k, v in values.items():
         setattr(q, k, v)
     db.commit()
+    response_cache.interview_questions_changed()
     db.refresh(q)
     return q
 
@@ -571,6 +602,7 @@ def delete_interview_question(id: int, db: Session = Depends(database.get_db), a
         raise HTTPException(404, "InterviewQuestion not found")
     db.delete(q)
     db.commit()
+    response_cache.interview_questions_changed()
     return {"ok": True}
 
 @router.post("/interview-questions/{id}/approve")
@@ -584,7 +616,7 @@ def approve_interview_question(id: int, approve: bool, db: Session = Depends(dat
 
 # --- JobApplication Endpoints ---
 @router.get("/job-applications", response_model=list[JobApplicationOut])
-def list_job_applications(db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_job_applications(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     return db.query(models.JobApplication).all()
 
 @router.get("/job-applications/{id}", response_model=JobApplicationOut)
@@ -667,6 +699,7 @@ def create_dsapool_question(data: DSAPoolQuestionCreate, db: Session = Depends(d
             )
         )
     db.commit()
+    response_cache.dsapool_changed()
     # Return the created question with test cases
     stmt = select(DSAPoolQuestion).where(DSAPoolQuestion.id == question_id)
     question = db.execute(stmt).scalar_one_or_none()
@@ -676,7 +709,7 @@ def create_dsapool_question(data: DSAPoolQuestionCreate, db: Session = Depends(d
 def list_dsapool_questions(
     difficulty: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     admin=Depends(authorize_admin),
 ):
     query = db.query(DSAPoolQuestion).options(joinedload(DSAPoolQuestion.test_cases))
@@ -707,6 +740,7 @@ def update_dsapool_question(question_id: int, data: DSAPoolQuestionUpdate, db: S
     )
     result = db.execute(stmt)
     db.commit()
+    response_cache.dsapool_changed()
     # Return the updated question
     stmt = select(DSAPoolQuestion).where(DSAPoolQuestion.id == question_id)
     question = db.execute(stmt).scalar_one_or_none()
@@ -722,6 +756,7 @@ def delete_dsapool_question(question_id: int, db: Session = Depends(database.get
         raise HTTPException(404, "DSA Question not found")
     db.delete(question)
     db.commit()
+    response_cache.dsapool_changed()
     return {"ok": True}
 # --- DSAPoolTestCase Endpoints ---
 @router.post("/dsapool-questions/{question_id}/test-cases")
@@ -738,12 +773,13 @@ def add_dsapool_test_case(question_id: int, data: DSAPoolTestCaseCreate, db: Ses
     result = db.execute(stmt)
     test_case_id = result.scalar()
     db.commit()
+    response_cache.dsapool_changed()
     stmt = select(DSAPoolTestCase).where(DSAPoolTestCase.id == test_case_id)
     test_case = db.execute(stmt).scalar_one_or_none()
     return test_case
 
 @router.get("/dsapool-questions/{question_id}/test-cases")
-def list_dsapool_test_cases(question_id: int, db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_dsapool_test_cases(question_id: int, db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     stmt = select(DSAPoolTestCase).where(DSAPoolTestCase.dsa_pool_question_id == question_id)
     result = db.execute(stmt)
     test_cases = result.scalars().all()
@@ -757,6 +793,7 @@ def delete_dsapool_test_case(question_id: int, test_case_id: int, db: Session =
         raise HTTPException(404, "Test case not found")
     db.delete(test_case)
     db.commit()
+    response_cache.dsapool_changed()
     return {"ok": True}
 
 # --- EdudiagnoTest Endpoints ---
@@ -801,7 +838,7 @@ def create_test(data: EdudiagnoTestCreate, db: Session = Depends(database.get_db
     }
 
 @router.get("/tests")
-def list_tests(db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+def list_tests(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
     tests = db.query(models.EdudiagnoTest).all()
     return [
         {
@@ -870,4 +907,50 @@ def create_quiz_option(data: CreateQuizOption, db: Session = Depends(database.ge
         "label": option.label,
         "correct": option.correct,
         "quiz_question_id": option.quiz_question_id
-    }
\ No newline at end of file
+    }
+# --- Metrics Endpoints ---
+@router.get("/metrics/db-pool")
+def get_db_pool_metrics(admin=Depends(authorize_admin)):
+    return database.pool_stats()
+
+@router.post("/metrics/company-daily-stats/rebuild")
+def rebuild_company_daily_stats(company_id: Optional[int] = None, db: Session = Depends(database.get_db), admin=Depends(authorize_admin)):
+    for stmt in company_stats.rebuild(company_id):
+        db.execute(stmt)
+    db.commit()
+    return {"ok": True}
+
+@router.post("/geo-index/refresh")
+def refresh_geo_index(db: Session = Depends(database.get_read_db), admin=Depends(authorize_admin)):
+    """Reload this worker's country/state/city index after the geo tables change."""
+    return geo_index.refresh(db).stats()
+
+@router.get("/metrics/response-cache")
+def get_response_cache_metrics(admin=Depends(authorize_admin)):
+    return response_cache.stats()
+
+@router.post("/response-cache/clear")
+def clear_response_cache(admin=Depends(authorize_admin)):
+    """Clear this worker's response caches."""
+    response_cache.clear()
+    return {"ok": True}
+
+@router.get("/metrics/llm-cache")
+def get_llm_cache_metrics(admin=Depends(authorize_admin)):
+    return llm_cache.stats()
+
+@router.post("/llm-cache/purge")
+async def purge_llm_cache(expired_only: bool = True, admin=Depends(authorize_admin)):
+    """Drop expired LLM cache entries, or all of them with expired_only=false."""
+    await llm_cache.purge(expired_only)
+    return {"ok": True}
+
+@router.get("/metrics/llm")
+def get_llm_metrics(admin=Depends(authorize_admin)):
+    return {
+        **llm_gateway.stats(),
+        "prompt_budget": prompt_budget.stats(),
+        "speech_cache": speech_cache.stats(),
+        "question_audio": question_audio.stats(),
+        "audio_normalize": audio_normalize.stats(),
+    }
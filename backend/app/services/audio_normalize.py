@@ -0,0 +1,174 @@
+"""Shrinks recorded answers before they are sent to Whisper.
+
+Browser recordings arrive as stereo 48 kHz Opus at whatever bitrate the
+browser picked, usually with seconds of silence before the candidate starts
+and after they stop. Whisper only needs 16 kHz mono, so each upload is:
+
+1. decoded by ffmpeg to 16 kHz mono PCM;
+2. trimmed of leading and trailing silence (frames below streaming_stt's
+   SILENCE_RMS, or below PEAK_RATIO of the loudest frame for recordings
+   from quiet microphones, keeping PAD_SECONDS either side of the speech);
+3. re-encoded by ffmpeg as low-bitrate Opus in Ogg.
+
+At most AUDIO_NORMALIZE_WORKERS recordings are processed at once per worker.
+A request that cannot get a slot within QUEUE_SECONDS, or whose recording
+ffmpeg cannot handle, is transcribed as uploaded: normalizing is an
+optimization, never a reason to fail. Nor does it decide that an answer is
+silent; that is left to Whisper.
+"""
+
+import asyncio
+import io
+import logging
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.services.streaming_stt import (
+    BYTES_PER_SECOND,
+    FRAME_BYTES,
+    PEAK_RATIO,
+    SAMPLE_RATE,
+    SILENCE_RMS,
+)
+
+logger = logging.getLogger(__name__)
+
+PAD_SECONDS = 0.2
+BITRATE = "24k"
+QUEUE_SECONDS = 2
+TIMEOUT_SECONDS = 30
+
+_slots = asyncio.Semaphore(settings.AUDIO_NORMALIZE_WORKERS)
+
+_stats = {
+    "requests": 0,
+    "normalized": 0,
+    "empty": 0,
+    "busy": 0,
+    "failed": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+    "seconds_in": 0.0,
+    "seconds_out": 0.0,
+    "processing_seconds": 0.0,
+}
+
+
+async def _ffmpeg(args, data):
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        *args,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        output, stderr = await asyncio.wait_for(process.communicate(data), TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode:
+        raise RuntimeError(
+            f"ffmpeg exited with {process.returncode}: {stderr.decode(errors='replace')[-300:]}"
+        )
+    return output
+
+
+def trim_silence(pcm: bytes) -> bytes:
+    """`pcm` without its leading and trailing silence; empty only if `pcm`
+    is shorter than a frame. Never all of it is dropped: the loudest frame is
+    always kept, so a quiet answer is still transcribed."""
+    usable = len(pcm) - len(pcm) % FRAME_BYTES
+    frames = np.frombuffer(pcm[:usable], dtype="<i2").astype(np.float32)
+    frames = frames.reshape(-1, FRAME_BYTES // 2)
+    rms = np.sqrt(np.mean(frames**2, axis=1))
+    if not len(rms):
+        return b""
+    loud = np.flatnonzero(rms >= min(SILENCE_RMS, rms.max() * PEAK_RATIO))
+    pad = round(PAD_SECONDS * BYTES_PER_SECOND / FRAME_BYTES)
+    start = max(loud[0] - pad, 0)
+    end = min(loud[-1] + 1 + pad, len(frames))
+    return pcm[start * FRAME_BYTES : end * FRAME_BYTES]
+
+
+async def _normalize(data):
+    pcm = await _ffmpeg(
+        ["-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"], data
+    )
+    speech = trim_silence(pcm)
+    if not speech:
+        return pcm, None
+    audio = await _ffmpeg(
+        [
+            "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-i", "pipe:0",
+            "-c:a", "libopus", "-b:a", BITRATE, "-application", "voip",
+            "-f", "ogg", "pipe:1",
+        ],
+        speech,
+    )
+    return pcm, (speech, audio)
+
+
+async def normalize(data: bytes):
+    """The recording ready for Whisper, as a file object, or None to send
+    `data` as it is (normalizing is off, busy or failed, or the recording
+    decodes to nothing)."""
+    if not settings.AUDIO_NORMALIZE_ENABLED:
+        return None
+    _stats["requests"] += 1
+    try:
+        await asyncio.wait_for(_slots.acquire(), QUEUE_SECONDS)
+    except asyncio.TimeoutError:
+        _stats["busy"] += 1
+        return None
+
+    start = time.perf_counter()
+    try:
+        pcm, result = await _normalize(data)
+    except Exception as e:
+        _stats["failed"] += 1
+        logger.warning(f"Could not normalize a {len(data)} byte recording: {e!r}")
+        return None
+    finally:
+        _slots.release()
+    elapsed = time.perf_counter() - start
+
+    if result is None:
+        _stats["empty"] += 1
+        return None
+
+    seconds_in = len(pcm) / BYTES_PER_SECOND
+    speech, audio = result
+    seconds_out = len(speech) / BYTES_PER_SECOND
+    _stats["normalized"] += 1
+    _stats["bytes_in"] += len(data)
+    _stats["bytes_out"] += len(audio)
+    _stats["seconds_in"] += seconds_in
+    _stats["seconds_out"] += seconds_out
+    _stats["processing_seconds"] += elapsed
+    logger.info(
+        f"Normalized recording: {len(data)} -> {len(audio)} bytes, "
+        f"{seconds_in:.1f} -> {seconds_out:.1f} s, in {elapsed * 1000:.0f} ms"
+    )
+
+    file = io.BytesIO(audio)
+    file.name = "audio.ogg"
+    return file
+
+
+def stats():
+    normalized = _stats["normalized"]
+    return {
+        "enabled": settings.AUDIO_NORMALIZE_ENABLED,
+        "workers": settings.AUDIO_NORMALIZE_WORKERS,
+        **_stats,
+        "bytes_saved": _stats["bytes_in"] - _stats["bytes_out"],
+        "seconds_saved": _stats["seconds_in"] - _stats["seconds_out"],
+        "avg_processing_ms": _stats["processing_seconds"] * 1000 / normalized if normalized else None,
+    }
@@ -1,7 +1,5 @@
 from app import config
-from app.configs.brevo import api_instance
-from brevo_python.rest import ApiException
-import brevo_python
+from app.configs import brevo as brevo_config
 import os
 import logging
 
@@ -9,7 +7,26 @@ from app.lib.errors import CustomException
 
 logger = logging.getLogger(__name__)
 
+
+def send_email(to: str, subject: str, html_content: str):
+    """Send one transactional email from the configured sender."""
+    import brevo_python
+
+    send_smtp_email = brevo_python.SendSmtpEmail(
+        sender={
+            "name": config.settings.MAIL_SENDER_NAME,
+            "email": config.settings.MAIL_SENDER_EMAIL,
+        },
+        to=[{"email": to}],
+        html_content=html_content,
+        subject=subject,
+    )
+    brevo_config.api_instance.send_transac_email(send_smtp_email)
+
+
 def send_otp_email(to: str, otp: str, expiration_time: str):
+    from brevo_python.rest import ApiException
+
     try:
         logger.info(f"Attempting to send OTP email to {to}")
         
@@ -27,18 +44,8 @@ def send_otp_email(to: str, otp: str, expiration_time: str):
             logger.error("MAIL_SENDER_EMAIL or MAIL_SENDER_NAME is not set in environment variables")
             raise CustomException("Email sender configuration error")
 
-        send_smtp_email = brevo_python.SendSmtpEmail(
-            sender={
-                "name": config.settings.MAIL_SENDER_NAME,
-                "email": config.settings.MAIL_SENDER_EMAIL,
-            },
-            to=[{"email": to}],
-            html_content=html_content,
-            subject="OTP for Edudiagno Jobs Portal",
-        )
-
         logger.info("Sending email via Brevo API")
-        api_instance.send_transac_email(send_smtp_email)
+        send_email(to, "OTP for Edudiagno Jobs Portal", html_content)
         logger.info("Email sent successfully")
         
     except ApiException as e:
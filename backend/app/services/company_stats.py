@@ -0,0 +1,301 @@
+"""Statements behind /company/analytics and the company_daily_stats rollup.
+
+Everything here builds statements rather than executing them, so the async
+routers and the sync admin routes can share it. The rollup counts additive
+metrics only; distinct-candidate counts cannot be summed across days and are
+read from `interviews` in the same single dashboard query.
+"""
+
+import datetime
+
+from sqlalchemy import Date, Float, case, cast, delete, func, literal, select, true, union_all
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import AiInterviewedJob, CompanyDailyStats, Interview
+
+COUNTERS = [
+    "interviews_created",
+    "interviews_completed",
+    "completed_score_sum",
+    "completed_score_count",
+]
+
+# Interview columns the rollup depends on (besides created_at, which never
+# changes).
+TRACKED_COLUMNS = ("status", "overall_score", "ai_interviewed_job_id")
+
+
+def _add(source):
+    """Upsert that adds the (company_id, day, *COUNTERS) rows of `source` to the
+    rollup."""
+    stmt = insert(CompanyDailyStats).from_select(
+        ["company_id", "day", *COUNTERS], source
+    )
+    table = CompanyDailyStats.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=["company_id", "day"],
+        set_={name: table.c[name] + stmt.excluded[name] for name in COUNTERS},
+    )
+
+
+def _bump(interview_id: int, **deltas):
+    """Upsert that adds `deltas` (SQL expressions over the interview row) to the
+    counters for the interview's company and creation day."""
+    return _add(
+        select(
+            AiInterviewedJob.company_id,
+            cast(Interview.created_at, Date),
+            *[deltas.get(name, literal(0)) for name in COUNTERS],
+        )
+        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
+        .where(Interview.id == interview_id)
+    )
+
+
+def _completed(score, status=Interview.status):
+    """(completed, score_sum, score_count) contributed by an interview."""
+    is_completed = status == "completed"
+    return (
+        case((is_completed, 1), else_=0),
+        case((is_completed, func.coalesce(score, 0)), else_=0),
+        case((is_completed & score.is_not(None), 1), else_=0),
+    )
+
+
+def interview_created(interview_id: int):
+    """Run after the interview row is inserted (flushed)."""
+    return _bump(interview_id, interviews_created=literal(1))
+
+
+def interview_completed(interview_id: int, overall_score: int):
+    """Run before the UPDATE that marks the interview completed. Re-scoring an
+    already completed interview swaps its old score for the new one."""
+    return interview_changed(
+        interview_id, {"status": "completed", "overall_score": overall_score}
+    )
+
+
+def interview_changed(interview_id: int, values: dict):
+    """Run before an UPDATE that sets `values` on the interview: takes out its
+    old contribution and adds the new one, which may belong to another
+    company if the interview moves to another job. None if `values` leaves
+    the rollup alone."""
+    if not any(name in values for name in TRACKED_COLUMNS):
+        return None
+
+    def new(name):
+        if name not in values:
+            return getattr(Interview, name)
+        return literal(values[name], type_=getattr(Interview, name).type)
+
+    company_id = AiInterviewedJob.company_id
+    if "ai_interviewed_job_id" in values:
+        company_id = (
+            select(AiInterviewedJob.company_id)
+            .where(AiInterviewedJob.id == new("ai_interviewed_job_id"))
+            .scalar_subquery()
+        )
+    day = cast(Interview.created_at, Date)
+
+    def contribution(company_id, sign, score, status):
+        return (
+            select(
+                company_id.label("company_id"),
+                day.label("day"),
+                literal(sign).label("created"),
+                *[
+                    (sign * counter).label(name)
+                    for counter, name in zip(_completed(score, status), COUNTERS[1:])
+                ],
+            )
+            .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
+            .where(Interview.id == interview_id, Interview.created_at.is_not(None))
+        )
+
+    # Both rows land on the same rollup row unless the company changes; the
+    # upsert may only touch it once, hence the sum.
+    changes = union_all(
+        contribution(AiInterviewedJob.company_id, -1, Interview.overall_score, Interview.status),
+        contribution(company_id, 1, new("overall_score"), new("status")),
+    ).subquery()
+    return _add(
+        select(
+            changes.c.company_id,
+            changes.c.day,
+            *[func.sum(column) for column in list(changes.c)[2:]],
+        ).group_by(changes.c.company_id, changes.c.day)
+    )
+
+
+def interview_deleted(interview_id: int):
+    """Run before the interview row is deleted."""
+    completed, score_sum, score_count = _completed(Interview.overall_score)
+    return _bump(
+        interview_id,
+        interviews_created=literal(-1),
+        interviews_completed=-completed,
+        completed_score_sum=-score_sum,
+        completed_score_count=-score_count,
+    )
+
+
+def job_deleted(job_id: int):
+    """Run before the job row is deleted (its interviews go with it): takes
+    all of the job's interviews out of the rollup in one statement."""
+    completed, score_sum, score_count = _completed(Interview.overall_score)
+    day = cast(Interview.created_at, Date)
+    return _add(
+        select(
+            AiInterviewedJob.company_id,
+            day,
+            -func.count(Interview.id),
+            -func.sum(completed),
+            -func.sum(score_sum),
+            -func.sum(score_count),
+        )
+        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
+        .where(Interview.ai_interviewed_job_id == job_id, Interview.created_at.is_not(None))
+        .group_by(AiInterviewedJob.company_id, day)
+    )
+
+
+def rebuild(company_id: int = None) -> list:
+    """Statements that recompute the rollup from `interviews` (all companies,
+    or just one) to repair drift from bulk changes made outside the app."""
+    clear = delete(CompanyDailyStats)
+    completed, score_sum, score_count = _completed(Interview.overall_score)
+    day = cast(Interview.created_at, Date)
+    source = (
+        select(
+            AiInterviewedJob.company_id,
+            day,
+            func.count(Interview.id),
+            func.sum(completed),
+            func.sum(score_sum),
+            func.sum(score_count),
+        )
+        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
+        .where(Interview.created_at.is_not(None))
+        .group_by(AiInterviewedJob.company_id, day)
+    )
+    if company_id is not None:
+        clear = clear.where(CompanyDailyStats.company_id == company_id)
+        source = source.where(AiInterviewedJob.company_id == company_id)
+    return [
+        clear,
+        insert(CompanyDailyStats).from_select(["company_id", "day", *COUNTERS], source),
+    ]
+
+
+def _month_bounds(now: datetime.datetime):
+    this_month = now.date().replace(day=1)
+    next_month = (this_month + datetime.timedelta(days=32)).replace(day=1)
+    prev_month = (this_month - datetime.timedelta(days=1)).replace(day=1)
+    return prev_month, this_month, next_month
+
+
+def dashboard(company_id: int, now: datetime.datetime):
+    """One statement returning every /company/analytics metric as a single row.
+
+    Three one-row aggregates (jobs, rollup, candidates) are cross-joined so the
+    database is visited once.
+    """
+    prev_month, this_month, next_month = _month_bounds(now)
+    today = now.date()
+    week_days = [
+        today - datetime.timedelta(days=offset)
+        for offset in range(today.weekday(), -1, -1)
+    ]
+
+    jobs = (
+        select(
+            func.count(AiInterviewedJob.id).label("total_jobs"),
+            func.count(AiInterviewedJob.id)
+            .filter(AiInterviewedJob.status == "active")
+            .label("total_open_jobs"),
+            func.count(AiInterviewedJob.id)
+            .filter(AiInterviewedJob.status == "closed")
+            .label("total_closed_jobs"),
+            func.count(AiInterviewedJob.id)
+            .filter(
+                AiInterviewedJob.status == "active",
+                AiInterviewedJob.created_at >= this_month,
+                AiInterviewedJob.created_at < next_month,
+            )
+            .label("active_jobs_this_month"),
+            func.count(AiInterviewedJob.id)
+            .filter(
+                AiInterviewedJob.status == "active",
+                AiInterviewedJob.created_at >= prev_month,
+                AiInterviewedJob.created_at < this_month,
+            )
+            .label("active_jobs_prev_month"),
+        )
+        .where(AiInterviewedJob.company_id == company_id)
+        .subquery()
+    )
+
+    stats = CompanyDailyStats
+    in_this_month = (stats.day >= this_month) & (stats.day < next_month)
+    in_prev_month = (stats.day >= prev_month) & (stats.day < this_month)
+
+    def total(column, *conditions):
+        summed = func.sum(column)
+        if conditions:
+            summed = summed.filter(*conditions)
+        return func.coalesce(summed, 0)
+
+    rollup = (
+        select(
+            total(stats.interviews_created).label("total_interviews_conducted"),
+            total(stats.interviews_created, in_this_month).label(
+                "total_interviews_conducted_this_month"
+            ),
+            total(stats.interviews_created, in_prev_month).label(
+                "total_interviews_conducted_prev_month"
+            ),
+            total(stats.interviews_completed).label("total_interviews_completed"),
+            total(stats.interviews_completed, in_this_month).label(
+                "interviews_completed_this_month"
+            ),
+            total(stats.interviews_completed, in_prev_month).label(
+                "interviews_completed_prev_month"
+            ),
+            (
+                cast(total(stats.completed_score_sum, in_this_month), Float)
+                / func.nullif(total(stats.completed_score_count, in_this_month), 0)
+            ).label("average_candidate_score"),
+            *[
+                total(stats.interviews_created, stats.day == day).label(f"day_{i}")
+                for i, day in enumerate(week_days)
+            ],
+        )
+        .where(stats.company_id == company_id)
+        .subquery()
+    )
+
+    candidates = (
+        select(
+            func.count(func.distinct(Interview.email)).label("total_candidates"),
+            func.count(func.distinct(Interview.email))
+            .filter(
+                Interview.created_at >= this_month,
+                Interview.created_at < next_month,
+            )
+            .label("candidates_this_month"),
+            func.count(func.distinct(Interview.email))
+            .filter(
+                Interview.created_at >= prev_month,
+                Interview.created_at < this_month,
+            )
+            .label("candidates_prev_month"),
+        )
+        .join(AiInterviewedJob, AiInterviewedJob.id == Interview.ai_interviewed_job_id)
+        .where(AiInterviewedJob.company_id == company_id)
+        .subquery()
+    )
+
+    stmt = select(jobs, rollup, candidates).select_from(
+        jobs.join(rollup, true()).join(candidates, true())
+    )
+    return stmt, week_days
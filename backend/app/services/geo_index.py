@@ -0,0 +1,179 @@
+"""In-process prefix index for the country/state/city autocomplete.
+
+The geo tables are static reference data, so they are loaded once per worker
+into flat arrays and answered from memory. A keyword matches a name when it is
+a prefix of the name or of any word in it ("york" finds "New York"), compared
+case-insensitively; results are ordered by name like the old ILIKE queries.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import heapq
+import logging
+import threading
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import database
+from app.models import City, Country, State
+
+logger = logging.getLogger(__name__)
+
+LIMIT = 10
+
+
+def _word_suffixes(name: str):
+    """'New York City' -> ['new york city', 'york city', 'city']"""
+    words = name.casefold().split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class _Table:
+    """One geo table: rows sorted by name, plus a sorted (suffix, row) index."""
+
+    def __init__(self, rows):
+        # rows: (id, name, country_id, state_id); position in the sorted list is
+        # the row's rank, so "first N by name" is "N smallest ranks".
+        rows = sorted(rows, key=lambda r: ((r[1] or "").casefold(), r[0]))
+        self.ids = [r[0] for r in rows]
+        self.names = [r[1] for r in rows]
+        self.country_ids = [r[2] for r in rows]
+        self.state_ids = [r[3] for r in rows]
+
+        entries = sorted(
+            (suffix, rank)
+            for rank, name in enumerate(self.names)
+            for suffix in _word_suffixes(name or "")
+        )
+        self.suffixes = [e[0] for e in entries]
+        self.suffix_ranks = [e[1] for e in entries]
+
+        self.by_country = {}
+        self.by_state = {}
+        for rank in range(len(self.ids)):
+            self.by_country.setdefault(self.country_ids[rank], []).append(rank)
+            self.by_state.setdefault(self.state_ids[rank], []).append(rank)
+
+    def _matches(self, rank, keyword):
+        return any(s.startswith(keyword) for s in _word_suffixes(self.names[rank] or ""))
+
+    def search(self, keyword: str, country_id=None, state_id=None, limit=LIMIT):
+        keyword = " ".join(keyword.casefold().split())
+
+        if state_id is not None or country_id is not None:
+            # Scoped lookups scan one parent's rows, already in name order.
+            bucket = (
+                self.by_state.get(state_id, [])
+                if state_id is not None
+                else self.by_country.get(country_id, [])
+            )
+            found = []
+            for rank in bucket:
+                if country_id is not None and self.country_ids[rank] != country_id:
+                    continue
+                if keyword and not self._matches(rank, keyword):
+                    continue
+                found.append(rank)
+                if limit is not None and len(found) == limit:
+                    break
+            return found
+
+        if not keyword:
+            return list(range(len(self.ids) if limit is None else min(limit, len(self.ids))))
+
+        lo = bisect.bisect_left(self.suffixes, keyword)
+        hi = bisect.bisect_left(self.suffixes, keyword + "\U0010ffff")
+        ranks = set(self.suffix_ranks[lo:hi])
+        if limit is None:
+            return sorted(ranks)
+        return heapq.nsmallest(limit, ranks)
+
+
+class GeoIndex:
+    def __init__(self, countries, states, cities):
+        self.currency_by_country = {c[0]: c[2] for c in countries}
+        self.countries = _Table([(c[0], c[1], c[0], None) for c in countries])
+        self.states = _Table([(s[0], s[1], s[2], None) for s in states])
+        self.cities = _Table([(c[0], c[1], c[3], c[2]) for c in cities])
+        self.loaded_at = time.time()
+
+    def _rows(self, table, ranks):
+        return [
+            {
+                "id": table.ids[rank],
+                "name": table.names[rank],
+                "currency": self.currency_by_country.get(table.country_ids[rank]),
+            }
+            for rank in ranks
+        ]
+
+    def search_countries(self, keyword: str = ""):
+        # Like the old query: the full list when there is no keyword.
+        return self._rows(
+            self.countries,
+            self.countries.search(keyword, limit=LIMIT if keyword else None),
+        )
+
+    def search_states(self, keyword: str = "", country_id: int = None):
+        return self._rows(self.states, self.states.search(keyword, country_id=country_id))
+
+    def search_cities(self, keyword: str = "", country_id: int = None, state_id: int = None):
+        return self._rows(
+            self.cities,
+            self.cities.search(keyword, country_id=country_id, state_id=state_id),
+        )
+
+    def stats(self):
+        return {
+            "countries": len(self.countries.ids),
+            "states": len(self.states.ids),
+            "cities": len(self.cities.ids),
+            "loaded_at": self.loaded_at,
+        }
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def load(db: Session) -> GeoIndex:
+    start = time.perf_counter()
+    index = GeoIndex(
+        db.execute(select(Country.id, Country.name, Country.currency)).all(),
+        db.execute(select(State.id, State.name, State.country_id)).all(),
+        db.execute(select(City.id, City.name, City.state_id, City.country_id)).all(),
+    )
+    logger.info(
+        f"Geo index loaded in {time.perf_counter() - start:.2f}s: {index.stats()}"
+    )
+    return index
+
+
+def _load_once():
+    global _index
+    with _lock:
+        if _index is None:
+            with contextlib.contextmanager(database.get_read_db)() as db:
+                _index = load(db)
+    return _index
+
+
+async def get() -> GeoIndex:
+    """The worker's index. Only the first call touches the database, loading
+    it in a thread with a session of its own; after that, lookups need no
+    connection at all."""
+    if _index is not None:
+        return _index
+    return await asyncio.to_thread(_load_once)
+
+
+def refresh(db: Session) -> GeoIndex:
+    """Reload from the database and swap the new index in."""
+    global _index
+    index = load(db)
+    with _lock:
+        _index = index
+    return index
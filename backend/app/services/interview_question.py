@@ -43,10 +43,14 @@ def get_interview_question_by_job_id(job_id: int, db: Session):
 def update_interview_question(
     question_data: schemas.UpdateInterviewQuestion, db: Session
 ):
+    values = question_data.model_dump(exclude_unset=True)
+    if "question" in values:
+        # The old audio is of the old text
+        values["audio_url"] = None
     stmt = (
         update(InterviewQuestion)
         .where(InterviewQuestion.id == question_data.id)
-        .values(question_data.model_dump(exclude_unset=True))
+        .values(values)
     )
     db.execute(stmt)
     db.commit()
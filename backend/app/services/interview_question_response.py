@@ -1,39 +1,46 @@
 from sqlalchemy import insert, select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import schemas
 from app.models import InterviewQuestion, InterviewQuestionResponse
 
 
-def create_interview_question_response(
+async def create_interview_question_response(
     response_data: schemas.CreateInterviewQuestionResponse,
     interview_id: int,
-    db: Session,
+    db: AsyncSession,
 ):
-    data = response_data.model_dump()
-    data["interview_id"] = interview_id
-    stmt = insert(InterviewQuestionResponse).values(data)
-    db.execute(stmt)
-    db.commit()
-    return
+    stmt = (
+        insert(InterviewQuestionResponse)
+        .values(
+            interview_question_id=response_data.question_id,
+            answer=response_data.answer,
+            interview_id=interview_id,
+        )
+        .returning(InterviewQuestionResponse.id)
+    )
+    response_id = (await db.execute(stmt)).scalar_one()
+    await db.commit()
+    return response_id
 
 
-def get_interview_question_response_by_interview_id(interview_id: int, db: Session):
+async def get_interview_question_response_by_interview_id(interview_id: int, db: AsyncSession):
     stmt = (
         select(
             InterviewQuestionResponse.answer,
-            InterviewQuestionResponse.question_id,
+            InterviewQuestionResponse.evaluation,
+            InterviewQuestionResponse.interview_question_id.label("question_id"),
             InterviewQuestionResponse.interview_id,
             InterviewQuestionResponse.created_at,
-            InterviewQuestion.job_id,
+            InterviewQuestion.ai_interviewed_job_id.label("job_id"),
             InterviewQuestion.order_number,
             InterviewQuestion.question,
             InterviewQuestion.question_type,
         )
         .join(
             InterviewQuestion,
-            InterviewQuestion.id == InterviewQuestionResponse.question_id,
+            InterviewQuestion.id == InterviewQuestionResponse.interview_question_id,
         )
         .where(InterviewQuestionResponse.interview_id == interview_id)
     )
-    return db.execute(stmt).mappings().all()
+    return (await db.execute(stmt)).mappings().all()
@@ -0,0 +1,180 @@
+"""Content-addressed cache for deterministic chat completions.
+
+The key is a SHA-256 of the model, messages and request parameters, so the
+same prompt returns the stored answer without calling OpenAI. Only use it for
+low-temperature calls whose prompt fully determines the answer.
+
+Backends (LLM_CACHE_BACKEND): "memory" (per-worker LRU), "postgres" (the
+llm_cache_entries table, shared by all workers) or "none".
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import time
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app import database
+from app.config import settings
+from app.lib.cache import TTLCache
+from app.models import LLMCacheEntry
+from app.services import llm_gateway
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, messages: list, **params) -> str:
+    payload = {"model": model, "messages": messages, "params": params}
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class MemoryBackend:
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self._cache = TTLCache("llm", ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    async def get(self, key):
+        return self._cache.get(key)
+
+    async def set(self, key, model, content, total_tokens):
+        self._cache.set(key, (content, total_tokens))
+
+    async def purge(self, expired_only=True):
+        if not expired_only:
+            self._cache.invalidate()
+
+    def size(self):
+        return self._cache.stats()["entries"]
+
+
+class PostgresBackend:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, key):
+        async with database.AsyncSessionLocal() as db:
+            row = (
+                await db.execute(
+                    select(LLMCacheEntry.content, LLMCacheEntry.total_tokens).where(
+                        LLMCacheEntry.key == key,
+                        LLMCacheEntry.expires_at > datetime.datetime.utcnow(),
+                    )
+                )
+            ).first()
+        return tuple(row) if row else None
+
+    async def set(self, key, model, content, total_tokens):
+        expires_at = datetime.datetime.utcnow() + datetime.timedelta(
+            seconds=self.ttl_seconds
+        )
+        stmt = insert(LLMCacheEntry).values(
+            key=key,
+            model=model,
+            content=content,
+            total_tokens=total_tokens,
+            expires_at=expires_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={
+                "content": stmt.excluded.content,
+                "total_tokens": stmt.excluded.total_tokens,
+                "expires_at": stmt.excluded.expires_at,
+            },
+        )
+        async with database.AsyncSessionLocal() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+    async def purge(self, expired_only=True):
+        stmt = delete(LLMCacheEntry)
+        if expired_only:
+            stmt = stmt.where(LLMCacheEntry.expires_at <= datetime.datetime.utcnow())
+        async with database.AsyncSessionLocal() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+    def size(self):
+        return None
+
+
+def _build_backend():
+    name = settings.LLM_CACHE_BACKEND
+    if name == "memory":
+        return MemoryBackend(settings.LLM_CACHE_TTL_SECONDS, settings.LLM_CACHE_MAX_ENTRIES)
+    if name == "postgres":
+        return PostgresBackend(settings.LLM_CACHE_TTL_SECONDS)
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown LLM_CACHE_BACKEND {name!r}")
+
+
+backend = _build_backend()
+
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "backend_errors": 0,
+    "tokens_saved": 0,
+    "hit_seconds": 0.0,
+    "miss_seconds": 0.0,
+}
+
+
+async def complete(endpoint: str, model: str, messages: list, **params) -> str:
+    """Content of `llm_gateway.chat(endpoint, model=..., messages=...,
+    **params)`, served from the cache when the same request was seen before."""
+    start = time.perf_counter()
+    key = cache_key(model, messages, **params)
+
+    cached = None
+    if backend is not None:
+        try:
+            cached = await backend.get(key)
+        except Exception:
+            # A cache outage must not take the endpoint down with it.
+            _stats["backend_errors"] += 1
+            logger.exception("LLM cache read failed")
+    if cached is not None:
+        content, total_tokens = cached
+        _stats["hits"] += 1
+        _stats["tokens_saved"] += total_tokens
+        _stats["hit_seconds"] += time.perf_counter() - start
+        return content
+
+    response = await llm_gateway.chat(endpoint, model=model, messages=messages, **params)
+    content = response.choices[0].message.content
+    total_tokens = response.usage.total_tokens if response.usage else 0
+    _stats["misses"] += 1
+
+    if backend is not None and content and response.choices[0].finish_reason == "stop":
+        try:
+            await backend.set(key, model, content, total_tokens)
+        except Exception:
+            _stats["backend_errors"] += 1
+            logger.exception("LLM cache write failed")
+    _stats["miss_seconds"] += time.perf_counter() - start
+    return content
+
+
+async def purge(expired_only: bool = True):
+    if backend is not None:
+        await backend.purge(expired_only)
+
+
+def stats():
+    hits, misses = _stats["hits"], _stats["misses"]
+    return {
+        "backend": settings.LLM_CACHE_BACKEND,
+        "entries": backend.size() if backend is not None else 0,
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / (hits + misses) if hits + misses else None,
+        "backend_errors": _stats["backend_errors"],
+        "tokens_saved": _stats["tokens_saved"],
+        "avg_hit_ms": _stats["hit_seconds"] * 1000 / hits if hits else None,
+        "avg_miss_ms": _stats["miss_seconds"] * 1000 / misses if misses else None,
+    }
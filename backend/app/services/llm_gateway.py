@@ -0,0 +1,499 @@
+"""The one way out to OpenAI.
+
+Every call goes through the same limits, in this order:
+
+- a token bucket per model for requests and tokens per minute, so a burst of
+  interviews queues here instead of tripping OpenAI's rate limits;
+- a global and a per-model concurrency semaphore;
+- a deadline for the whole call, waiting and retries included;
+- jittered exponential backoff on 429, 5xx, timeouts and connection errors.
+
+When the limits or retries run out the call raises CustomException with 503
+(busy) or 504 (too slow), so endpoints answer "try again" instead of a bare 500.
+Other OpenAI errors (bad request, auth) are raised as they are.
+
+Limits are per worker. Tune them with LLM_MAX_CONCURRENCY and
+LLM_MODEL_LIMITS, a JSON object merged over MODEL_LIMITS below, e.g.
+'{"gpt-4": {"concurrency": 2, "rpm": 200, "tpm": 10000}}'. 0 means unlimited.
+
+`endpoint` names the caller in the per-endpoint latency, token and error
+histograms at GET /admin/metrics/llm.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import time
+
+from app.config import settings
+from app.configs import openai
+from app.lib.errors import CustomException
+
+logger = logging.getLogger(__name__)
+
+# Per-worker defaults; "*" covers models not listed.
+MODEL_LIMITS = {
+    "gpt-4": {"concurrency": 8, "rpm": 5000, "tpm": 80000},
+    "gpt-3.5-turbo": {"concurrency": 16, "rpm": 3500, "tpm": 160000},
+    "whisper-1": {"concurrency": 8, "rpm": 500, "tpm": 0},
+    "gpt-4o-mini-tts": {"concurrency": 8, "rpm": 500, "tpm": 0},
+    "*": {"concurrency": 8, "rpm": 500, "tpm": 0},
+}
+
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+RETRYABLE = {"rate_limited", "server_error", "timeout", "connection"}
+
+# Output tokens assumed for rate limiting when the call sets no max_tokens.
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile."""
+        if not self.count:
+            return None
+        seen = 0
+        for bound, n in zip((*self.buckets, float("inf")), self.counts):
+            seen += n
+            if seen >= q * self.count:
+                return bound
+
+    def snapshot(self):
+        cumulative, le = 0, {}
+        for bound, n in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += n
+            le[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "le": le,
+        }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.errors = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queue_wait = Histogram(LATENCY_BUCKETS)
+        self.tokens = Histogram(TOKEN_BUCKETS)
+
+    def error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "errors": dict(self.errors),
+            "latency_seconds": self.latency.snapshot(),
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "tokens": self.tokens.snapshot(),
+        }
+
+
+class TokenBucket:
+    """`per_minute` units refilled continuously, with bursts up to ten
+    seconds' worth. A request bigger than the burst is let through once the
+    bucket is full and leaves it in debt."""
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60
+        self.capacity = max(per_minute / 6, 1)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def take(self, amount, deadline_at):
+        # The lock keeps waiters in arrival order.
+        async with self._lock:
+            while True:
+                self._refill()
+                needed = min(amount, self.capacity)
+                if self.level >= needed:
+                    self.level -= amount
+                    return
+                wait = (needed - self.level) / self.rate
+                if time.monotonic() + wait >= deadline_at:
+                    raise _Busy("rate limit")
+                await asyncio.sleep(wait)
+
+    def adjust(self, amount):
+        """Charge (or refund, when negative) the difference between the
+        estimate taken up front and what the call really used."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class _Busy(Exception):
+    """Could not get a slot before the deadline."""
+
+
+class ModelLimiter:
+    def __init__(self, concurrency, rpm, tpm):
+        self.semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.in_flight = 0
+        self.waiting = 0
+
+    async def acquire(self, tokens, deadline_at):
+        self.waiting += 1
+        try:
+            if self.requests is not None:
+                await self.requests.take(1, deadline_at)
+            if self.tokens is not None and tokens:
+                await self.tokens.take(tokens, deadline_at)
+            await _acquire(_global_semaphore(), deadline_at)
+            try:
+                await _acquire(self.semaphore, deadline_at)
+            except BaseException:
+                _global_semaphore().release()
+                raise
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        if self.semaphore is not None:
+            self.semaphore.release()
+        _global_semaphore().release()
+
+    def used_tokens(self, estimate, actual):
+        if self.tokens is not None and actual is not None:
+            self.tokens.adjust(actual - estimate)
+
+    def snapshot(self):
+        return {"in_flight": self.in_flight, "waiting": self.waiting}
+
+
+async def _acquire(semaphore, deadline_at):
+    if semaphore is None:
+        return
+    try:
+        await asyncio.wait_for(semaphore.acquire(), _remaining(deadline_at))
+    except asyncio.TimeoutError:
+        raise _Busy("concurrency limit")
+
+
+def _model_limits():
+    limits = {name: dict(values) for name, values in MODEL_LIMITS.items()}
+    if settings.LLM_MODEL_LIMITS:
+        for name, values in json.loads(settings.LLM_MODEL_LIMITS).items():
+            limits.setdefault(name, dict(limits["*"])).update(values)
+    return limits
+
+
+_limits = _model_limits()
+_limiters = {}
+_global = None
+_endpoints = {}
+
+
+def _global_semaphore():
+    global _global
+    if _global is None:
+        _global = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+    return _global
+
+
+def _limiter(model):
+    limiter = _limiters.get(model)
+    if limiter is None:
+        limiter = _limiters[model] = ModelLimiter(**_limits.get(model, _limits["*"]))
+    return limiter
+
+
+def _endpoint(name):
+    stats = _endpoints.get(name)
+    if stats is None:
+        stats = _endpoints[name] = EndpointStats()
+    return stats
+
+
+def _deadline_at(deadline):
+    return time.monotonic() + (deadline or settings.LLM_TIMEOUT_SECONDS)
+
+
+def _remaining(deadline_at):
+    return max(deadline_at - time.monotonic(), 0)
+
+
+def _classify(error):
+    import openai as openai_sdk
+
+    if isinstance(error, openai_sdk.RateLimitError):
+        return "rate_limited"
+    if isinstance(error, openai_sdk.APIStatusError):
+        return "server_error" if error.status_code >= 500 else f"http_{error.status_code}"
+    if isinstance(error, (openai_sdk.APITimeoutError, asyncio.TimeoutError)):
+        return "timeout"
+    if isinstance(error, openai_sdk.APIConnectionError):
+        return "connection"
+    return type(error).__name__
+
+
+def _backoff(attempt, error):
+    """Full-jitter exponential backoff, or the server's Retry-After if longer."""
+    delay = random.uniform(0, min(
+        settings.LLM_RETRY_MAX_SECONDS, settings.LLM_RETRY_BASE_SECONDS * 2**attempt
+    ))
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            delay = max(delay, float(response.headers.get("retry-after", 0)))
+        except ValueError:
+            pass
+    return delay
+
+
+def _give_up(kind, error):
+    if kind == "timeout":
+        return CustomException("The AI service took too long to respond, please try again", 504)
+    return CustomException("The AI service is busy, please try again", 503)
+
+
+async def _call(endpoint, model, tokens, deadline_at, call, hold=False):
+    """`await call()` under the model's limits, retrying transient failures
+    until the deadline. With hold=True the caller must release the slot."""
+    stats = _endpoint(endpoint)
+    limiter = _limiter(model)
+    attempt = 0
+    while True:
+        queued = time.monotonic()
+        try:
+            await limiter.acquire(tokens, deadline_at)
+        except _Busy as e:
+            stats.error("busy")
+            raise _give_up("busy", e) from e
+        stats.queue_wait.observe(time.monotonic() - queued)
+
+        try:
+            result = await asyncio.wait_for(call(), _remaining(deadline_at))
+        except Exception as e:
+            limiter.release()
+            kind = _classify(e)
+            stats.error(kind)
+            if kind not in RETRYABLE:
+                raise
+            delay = _backoff(attempt, e)
+            if attempt >= settings.LLM_MAX_RETRIES or time.monotonic() + delay >= deadline_at:
+                logger.warning(f"LLM call {endpoint} gave up after {attempt + 1} attempts: {e!r}")
+                raise _give_up(kind, e) from e
+            attempt += 1
+            stats.retries += 1
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            limiter.release()
+            raise
+
+        if not hold:
+            limiter.release()
+        return result
+
+
+@contextlib.contextmanager
+def _measure(endpoint):
+    stats = _endpoint(endpoint)
+    stats.calls += 1
+    start = time.monotonic()
+    try:
+        yield stats
+    except BaseException:
+        stats.failures += 1
+        raise
+    finally:
+        stats.latency.observe(time.monotonic() - start)
+
+
+def _estimate_tokens(messages, max_tokens):
+    # ~4 characters per token is close enough for admission control.
+    prompt = sum(len(str(message.get("content") or "")) for message in messages)
+    return prompt // 4 + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+async def chat(endpoint: str, *, deadline: float = None, **params):
+    """`client.chat.completions.create(**params)` through the gateway."""
+    model = params["model"]
+    estimate = _estimate_tokens(params["messages"], params.get("max_tokens"))
+    with _measure(endpoint) as stats:
+        response = await _call(
+            endpoint,
+            model,
+            estimate,
+            _deadline_at(deadline),
+            lambda: openai.client.chat.completions.create(**params),
+        )
+        used = response.usage.total_tokens if response.usage else None
+        _limiter(model).used_tokens(estimate, used)
+        if used is not None:
+            stats.tokens.observe(used)
+        return response
+
+
+@contextlib.asynccontextmanager
+async def chat_stream(endpoint: str, *, deadline: float = None, **params):
+    """Streaming `chat.completions.create`. Yields an async iterator of
+    chunks; the concurrency slot is held until the block exits.
+
+    Only opening the stream is retried. The deadline covers the whole
+    stream, checked between chunks.
+    """
+    model = params["model"]
+    estimate = _estimate_tokens(params["messages"], params.get("max_tokens"))
+    params = {**params, "stream": True, "stream_options": {"include_usage": True}}
+    deadline_at = _deadline_at(deadline)
+    limiter = _limiter(model)
+    used = []
+
+    with _measure(endpoint) as stats:
+        stream = await _call(
+            endpoint,
+            model,
+            estimate,
+            deadline_at,
+            lambda: openai.client.chat.completions.create(**params),
+            hold=True,
+        )
+
+        async def chunks():
+            iterator = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        iterator.__anext__(), _remaining(deadline_at)
+                    )
+                except StopAsyncIteration:
+                    return
+                except Exception as e:
+                    kind = _classify(e)
+                    stats.error(kind)
+                    if kind == "timeout":
+                        raise _give_up(kind, e) from e
+                    raise
+                if chunk.usage:
+                    used.append(chunk.usage.total_tokens)
+                yield chunk
+
+        try:
+            yield chunks()
+        finally:
+            limiter.release()
+            limiter.used_tokens(estimate, used[-1] if used else None)
+            if used:
+                stats.tokens.observe(used[-1])
+
+
+async def transcribe(endpoint: str, *, deadline: float = None, **params):
+    """`client.audio.transcriptions.create(**params)` through the gateway."""
+
+    async def call():
+        # A retry re-sends the file from the start.
+        if hasattr(params.get("file"), "seek"):
+            params["file"].seek(0)
+        return await openai.client.audio.transcriptions.create(**params)
+
+    with _measure(endpoint):
+        return await _call(endpoint, params["model"], 0, _deadline_at(deadline), call)
+
+
+async def speech(endpoint: str, *, deadline: float = None, **params) -> bytes:
+    """Audio bytes from `client.audio.speech.create(**params)`."""
+
+    async def call():
+        async with openai.client.audio.speech.with_streaming_response.create(
+            **params
+        ) as response:
+            return await response.read()
+
+    with _measure(endpoint):
+        return await _call(endpoint, params["model"], 0, _deadline_at(deadline), call)
+
+
+@contextlib.asynccontextmanager
+async def speech_stream(endpoint: str, *, deadline: float = None, chunk_size: int = 16384, **params):
+    """Streaming `audio.speech.create`. Yields an async iterator of audio
+    bytes as OpenAI sends them; the concurrency slot is held until the block
+    exits.
+
+    Only opening the stream is retried. The deadline covers the whole
+    stream, checked between chunks.
+    """
+    model = params["model"]
+    deadline_at = _deadline_at(deadline)
+    limiter = _limiter(model)
+
+    async def call():
+        manager = openai.client.audio.speech.with_streaming_response.create(**params)
+        return manager, await manager.__aenter__()
+
+    with _measure(endpoint) as stats:
+        manager, response = await _call(endpoint, model, 0, deadline_at, call, hold=True)
+
+        async def chunks():
+            iterator = response.iter_bytes(chunk_size).__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        iterator.__anext__(), _remaining(deadline_at)
+                    )
+                except StopAsyncIteration:
+                    return
+                except Exception as e:
+                    kind = _classify(e)
+                    stats.error(kind)
+                    if kind == "timeout":
+                        raise _give_up(kind, e) from e
+                    raise
+                yield chunk
+
+        try:
+            yield chunks()
+        finally:
+            limiter.release()
+            await manager.__aexit__(None, None, None)
+
+
+def stats():
+    return {
+        "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+        "timeout_seconds": settings.LLM_TIMEOUT_SECONDS,
+        "max_retries": settings.LLM_MAX_RETRIES,
+        "models": {
+            model: {**_limits.get(model, _limits["*"]), **limiter.snapshot()}
+            for model, limiter in _limiters.items()
+        },
+        "endpoints": {name: s.snapshot() for name, s in _endpoints.items()},
+    }
@@ -0,0 +1,176 @@
+"""Token budgets for the variable parts of LLM prompts.
+
+Transcripts, resumes and job descriptions go into prompts as-is, so a long
+interview or a pasted ten-page JD makes a huge, slow prompt and can overflow
+the context. `fit()` counts tokens and shrinks those sections to the
+endpoint's budget:
+
+1. compact: strip indentation, markdown decoration, blank-line runs and
+   repeated lines, such as requirements pasted into the description too
+   (free, and usually a good chunk of a transcript);
+2. share the budget between sections, so short ones stay whole and the long
+   ones split what is left;
+3. inside a section, cut the longest lines first, so every question of a
+   transcript survives and only rambling answers get shortened.
+
+Counts use tiktoken when it is installed, and ~4 characters per token
+otherwise.
+"""
+
+import functools
+import logging
+import math
+import re
+
+logger = logging.getLogger(__name__)
+
+# Tokens for the variable sections of each endpoint's prompt; the fixed
+# instructions around them come on top.
+BUDGETS = {
+    "generate_feedback": 6000,
+    "generate_questions": 4000,
+    "analyze_resume": 4000,
+    "score_answer": 2500,
+    "summarize_interview": 3000,
+}
+
+# Below this a line is cut away entirely rather than shortened.
+MIN_LINE_TOKENS = 12
+
+_stats = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        # Unknown model, or the encoding files could not be fetched.
+        logger.warning(f"No tiktoken encoding for {model}, estimating token counts")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text))
+
+
+def _truncate(text, max_tokens, model):
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[: max_tokens * 4]
+    return encoding.decode(encoding.encode(text)[:max_tokens])
+
+
+_DECORATION = re.compile(r"^(?:#{1,6}\s+|[-*_=]{3,}\s*$)|\*\*|`{3}\w*")
+_SPACES = re.compile(r"[ \t]+")
+
+
+def compact(text: str, seen: set = None) -> str:
+    """Same content, fewer tokens: no indentation, markdown decoration,
+    blank-line runs or repeated lines.
+
+    A line is dropped when it repeats the one before it, or when it is in
+    `seen` (lines of earlier sections; this text's lines are added). Lines
+    repeated further apart within one text stay: in a transcript that is the
+    same answer to two questions.
+    """
+    seen = set() if seen is None else seen
+    own = set()
+    lines = []
+    for line in text.splitlines():
+        line = _SPACES.sub(" ", _DECORATION.sub("", line)).strip()
+        if not line:
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        key = line.lower()
+        previous = next((l for l in reversed(lines) if l), "")
+        # Short lines ("Candidate: no answer") repeat legitimately.
+        if key == previous.lower() or (len(line) > 40 and key in seen):
+            continue
+        own.add(key)
+        lines.append(line)
+    seen.update(own)
+    return "\n".join(lines).strip()
+
+
+def _water_level(sizes, budget):
+    """Largest per-item cap such that sum(min(size, cap)) fits the budget."""
+    remaining = budget
+    ordered = sorted(sizes)
+    for i, size in enumerate(ordered):
+        share = remaining / (len(ordered) - i)
+        if size > share:
+            return int(share)
+        remaining -= size
+    return ordered[-1] if ordered else 0
+
+
+def fit_text(text: str, max_tokens: int, model: str) -> str:
+    """Cut `text` to about `max_tokens`, shortening the longest lines first."""
+    lines = text.split("\n")
+    # +1 for the newline.
+    sizes = [count_tokens(line, model) + 1 for line in lines]
+    if sum(sizes) <= max_tokens:
+        return text
+
+    cap = _water_level(sizes, max_tokens)
+    if cap >= MIN_LINE_TOKENS:
+        return "\n".join(
+            line if size <= cap else _truncate(line, cap - 2, model) + " [...]"
+            for line, size in zip(lines, sizes)
+        )
+
+    # Too many lines to keep a useful piece of each: keep the first ones.
+    kept, used = [], 0
+    for line, size in zip(lines, sizes):
+        if used + min(size, MIN_LINE_TOKENS) > max_tokens:
+            break
+        kept.append(line if size <= MIN_LINE_TOKENS else _truncate(line, MIN_LINE_TOKENS - 2, model) + " [...]")
+        used += min(size, MIN_LINE_TOKENS)
+    kept.append(f"[... {len(lines) - len(kept)} more lines omitted]")
+    return "\n".join(kept)
+
+
+def fit(endpoint: str, model: str, budget: int = None, **sections) -> dict:
+    """Compacted `sections`, trimmed so together they fit the endpoint's
+    budget. None values are passed through untouched."""
+    budget = budget or BUDGETS[endpoint]
+    seen = set()
+    texts = {name: compact(text, seen) for name, text in sections.items() if text is not None}
+    before = sum(count_tokens(text, model) for name, text in sections.items() if text is not None)
+    sizes = {name: count_tokens(text, model) for name, text in texts.items()}
+
+    if sum(sizes.values()) > budget:
+        cap = _water_level(list(sizes.values()), budget)
+        texts = {
+            name: fit_text(text, cap, model) if sizes[name] > cap else text
+            for name, text in texts.items()
+        }
+    after = sum(count_tokens(text, model) for text in texts.values())
+
+    stats = _stats.setdefault(endpoint, {"calls": 0, "trimmed": 0, "tokens_in": 0, "tokens_out": 0})
+    stats["calls"] += 1
+    stats["trimmed"] += sum(sizes.values()) > budget
+    stats["tokens_in"] += before
+    stats["tokens_out"] += after
+    if before - after > 0:
+        logger.info(f"Prompt for {endpoint}: {before} -> {after} tokens ({before - after} saved)")
+
+    return {name: texts.get(name) for name in sections}
+
+
+def stats():
+    return {
+        endpoint: {**values, "tokens_saved": values["tokens_in"] - values["tokens_out"]}
+        for endpoint, values in _stats.items()
+    }
@@ -0,0 +1,68 @@
+"""Response caches for the hot public read endpoints and their invalidation.
+
+Write paths that change cached data call the matching `*_changed` helper after
+committing. Helpers take the affected id when the write knows it and clear the
+whole cache otherwise.
+"""
+
+from app.config import settings
+from app.lib.cache import TTLCache
+
+# Candidate-facing job page: job details plus hasDSATest / hasQuiz.
+ai_interviewed_job = TTLCache("ai_interviewed_job", ttl_seconds=60, max_entries=2048)
+# Interview questions of an AI-interviewed job.
+interview_questions = TTLCache("interview_questions", ttl_seconds=300, max_entries=2048)
+# The whole DSA pool, one entry.
+dsapool_questions = TTLCache("dsapool_questions", ttl_seconds=600, max_entries=1)
+# Public company profile.
+company_profile = TTLCache("company_profile", ttl_seconds=300, max_entries=4096)
+# Job posting shown to job seekers (without the per-seeker "applied" flag).
+jobseeker_job = TTLCache("jobseeker_job", ttl_seconds=120, max_entries=4096)
+
+CACHES = [
+    ai_interviewed_job,
+    interview_questions,
+    dsapool_questions,
+    company_profile,
+    jobseeker_job,
+]
+
+for _cache in CACHES:
+    _cache.enabled = settings.RESPONSE_CACHE_ENABLED
+
+
+def _invalidate(cache, key_id):
+    if key_id is None:
+        cache.invalidate()
+    else:
+        cache.invalidate(cache.key(id=int(key_id)))
+
+
+def ai_interviewed_job_changed(job_id=None):
+    """Job fields, or its DSA / quiz questions, changed."""
+    _invalidate(ai_interviewed_job, job_id)
+
+
+def interview_questions_changed(job_id=None):
+    _invalidate(interview_questions, job_id)
+
+
+def dsapool_changed():
+    dsapool_questions.invalidate()
+
+
+def company_changed(company_id=None):
+    _invalidate(company_profile, company_id)
+
+
+def job_changed(job_id=None):
+    _invalidate(jobseeker_job, job_id)
+
+
+def stats():
+    return {cache.name: cache.stats() for cache in CACHES}
+
+
+def clear():
+    for cache in CACHES:
+        cache.invalidate()
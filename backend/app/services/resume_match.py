@@ -0,0 +1,177 @@
+"""Local resume-to-job match scores, no LLM involved.
+
+Resumes and jobs (description + requirements) are tokenized once into term
+counts, stored in match_documents and refreshed when their text changes.
+Scoring a job weighs every candidate's resume with BM25 (IDF over that job's
+candidates, so terms every resume has count for little) and the job with
+IDF x log-TF. The score is their cosine similarity, for all candidates at
+once in NumPy.
+
+Good for ranking candidates. The written match feedback, and the
+resume_match_score candidates see, still come from /interview/analyze-resume.
+"""
+
+import hashlib
+import re
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import AiInterviewedJob, Interview, MatchDocument
+
+# BM25 parameters.
+K1 = 1.2
+B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOPWORDS = frozenset(
+    """a an and are as at be been but by can do for from has have i in into is
+    it its me my of on or our that the their this to was we were will with you
+    your he she they them us am not no so if than then also etc per via""".split()
+)
+
+
+def tokenize(text: str) -> Counter:
+    """Term counts. Keeps tech names whole: c++, c#, node.js, ci/cd -> ci, cd."""
+    return Counter(
+        token
+        for token in _TOKEN.findall((text or "").lower())
+        if token not in STOPWORDS and (len(token) > 1 or token in "cr")
+    )
+
+
+def _job_text(description, requirements):
+    return f"{description or ''}\n{requirements or ''}"
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+async def _documents(db, kind, texts):
+    """Stored term counts for {ref_id: text}, (re)building the ones that are
+    missing or whose text changed."""
+    if not texts:
+        return {}
+    stored = {
+        row.ref_id: row
+        for row in (
+            await db.execute(
+                select(MatchDocument).where(
+                    MatchDocument.kind == kind, MatchDocument.ref_id.in_(list(texts))
+                )
+            )
+        ).scalars()
+    }
+    documents, stale = {}, []
+    for ref_id, text in texts.items():
+        digest = _digest(text)
+        row = stored.get(ref_id)
+        if row is not None and row.text_hash == digest:
+            documents[ref_id] = row.terms
+            continue
+        terms = dict(tokenize(text))
+        documents[ref_id] = terms
+        stale.append(
+            {"kind": kind, "ref_id": ref_id, "text_hash": digest, "terms": terms,
+             "length": sum(terms.values())}
+        )
+
+    if stale:
+        stmt = insert(MatchDocument).values(stale)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["kind", "ref_id"],
+            set_={
+                "text_hash": stmt.excluded.text_hash,
+                "terms": stmt.excluded.terms,
+                "length": stmt.excluded.length,
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(stmt)
+        await db.commit()
+    return documents
+
+
+def score(job_terms: dict, resumes: list) -> np.ndarray:
+    """Cosine similarity (0..1) of each resume's BM25 vector with the job's."""
+    if not resumes or not job_terms:
+        return np.zeros(len(resumes))
+
+    vocabulary = {}
+    rows, term_ids, counts = [], [], []
+    for row, terms in enumerate(resumes):
+        for term, count in terms.items():
+            rows.append(row)
+            term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+    for term in job_terms:
+        vocabulary.setdefault(term, len(vocabulary))
+    rows = np.asarray(rows, dtype=np.int64)
+    term_ids = np.asarray(term_ids, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.float64)
+
+    n = len(resumes)
+    df = np.bincount(term_ids, minlength=len(vocabulary))
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+
+    lengths = np.bincount(rows, weights=counts, minlength=n)
+    avg_length = lengths.mean() or 1.0
+    norm = K1 * (1 - B + B * lengths[rows] / avg_length)
+    weights = counts * (K1 + 1) / (counts + norm) * idf[term_ids]
+
+    query = np.zeros(len(vocabulary))
+    for term, count in job_terms.items():
+        query[vocabulary[term]] = (1 + np.log(count)) * idf[vocabulary[term]]
+
+    dots = np.bincount(rows, weights=weights * query[term_ids], minlength=n)
+    resume_norms = np.sqrt(np.bincount(rows, weights=weights**2, minlength=n))
+    denominator = resume_norms * np.linalg.norm(query)
+    return np.divide(dots, denominator, out=np.zeros(n), where=denominator > 0)
+
+
+async def rank(db, job_id: int):
+    """The job's candidates with a resume, best match first, scored 0-100."""
+    job = (
+        await db.execute(
+            select(AiInterviewedJob.description, AiInterviewedJob.requirements).where(
+                AiInterviewedJob.id == job_id
+            )
+        )
+    ).one()
+    candidates = (
+        await db.execute(
+            select(
+                Interview.id,
+                Interview.firstname,
+                Interview.lastname,
+                Interview.email,
+                Interview.resume_text,
+                Interview.resume_match_score,
+            ).where(
+                Interview.ai_interviewed_job_id == job_id,
+                Interview.resume_text.is_not(None),
+                Interview.resume_text != "",
+            )
+        )
+    ).mappings().all()
+
+    job_terms = (await _documents(db, "job", {job_id: _job_text(*job)}))[job_id]
+    resumes = await _documents(db, "resume", {c.id: c.resume_text for c in candidates})
+    scores = score(job_terms, [resumes[c.id] for c in candidates])
+
+    ranking = [
+        {
+            "interview_id": c.id,
+            "firstname": c.firstname,
+            "lastname": c.lastname,
+            "email": c.email,
+            "prescore": round(float(s) * 100, 1),
+            "resume_match_score": c.resume_match_score,
+        }
+        for c, s in zip(candidates, scores)
+    ]
+    ranking.sort(key=lambda r: r["prescore"], reverse=True)
+    return ranking
@@ -0,0 +1,248 @@
+"""Content-addressed cache of synthesized speech.
+
+Generated questions, greetings and the fallback question repeat across
+candidates, and the same text in the same voice is the same audio. The key is
+a SHA-256 of the text, voice, model and instructions.
+
+Backends (SPEECH_CACHE_BACKEND): "memory" (per-worker LRU), "gcs" (objects
+under speech-cache/ in GCS_BUCKET_NAME, shared by all workers) or "none".
+
+`stream()` forwards OpenAI's audio as it arrives and stores it once the
+stream completes; a hit is served straight from the cache, and requests for
+a text already being synthesized follow that synthesis instead of starting
+another.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import time
+
+from app.config import settings
+from app.configs import registry
+from app.lib.cache import TTLCache
+from app.services import llm_gateway
+
+logger = logging.getLogger(__name__)
+
+# How the interviewer sounds.
+INTERVIEWER = {
+    "model": "gpt-4o-mini-tts",
+    "voice": "ash",
+    "instructions": "Speak as an interviewer",
+}
+MEDIA_TYPE = "audio/mpeg"
+CHUNK_SIZE = 16384
+
+
+def cache_key(text: str, voice: str, model: str, instructions: str = None) -> str:
+    payload = {"text": text, "voice": voice, "model": model, "instructions": instructions}
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class MemoryBackend:
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self._cache = TTLCache("speech", ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    async def get(self, key):
+        return self._cache.get(key)
+
+    async def set(self, key, audio):
+        self._cache.set(key, audio)
+
+    def size(self):
+        return self._cache.stats()["entries"]
+
+
+class GCSBackend:
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+
+    def blob(self, key):
+        return registry.get("gcs").bucket(self.bucket_name).blob(f"speech-cache/{key}.mp3")
+
+    async def get(self, key):
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return await asyncio.to_thread(self.blob(key).download_as_bytes)
+        except NotFound:
+            return None
+
+    async def set(self, key, audio):
+        await asyncio.to_thread(
+            self.blob(key).upload_from_file, io.BytesIO(audio), content_type=MEDIA_TYPE
+        )
+
+    def size(self):
+        return None
+
+
+def _build_backend():
+    name = settings.SPEECH_CACHE_BACKEND
+    if name == "memory":
+        return MemoryBackend(settings.SPEECH_CACHE_TTL_SECONDS, settings.SPEECH_CACHE_MAX_ENTRIES)
+    if name == "gcs":
+        return GCSBackend(settings.GCS_BUCKET_NAME)
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown SPEECH_CACHE_BACKEND {name!r}")
+
+
+backend = _build_backend()
+
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "shared": 0,
+    "backend_errors": 0,
+    "bytes_from_cache": 0,
+    "bytes_synthesized": 0,
+    "hit_seconds": 0.0,
+}
+
+
+async def _cached(key):
+    if backend is None:
+        return None
+    try:
+        return await backend.get(key)
+    except Exception:
+        # A cache outage must not take the endpoint down with it.
+        _stats["backend_errors"] += 1
+        logger.exception("Speech cache read failed")
+        return None
+
+
+async def _store(key, audio):
+    if backend is None or not audio:
+        return
+    try:
+        await backend.set(key, audio)
+    except Exception:
+        _stats["backend_errors"] += 1
+        logger.exception("Speech cache write failed")
+
+
+class Synthesis:
+    """One text being synthesized, as its own task.
+
+    Any number of requests can `follow()` the audio as it arrives, so
+    candidates who reach the same question at the same time share one OpenAI
+    call. The task runs to the end (and fills the cache) even if they all
+    disconnect.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.chunks = []
+        self.error = None
+        self.done = False
+        self._changed = asyncio.Condition()
+        self.task = None
+
+    async def _publish(self, chunk=None, error=None, done=False):
+        async with self._changed:
+            if chunk is not None:
+                self.chunks.append(chunk)
+            if error is not None:
+                self.error = error
+            self.done = self.done or done
+            self._changed.notify_all()
+
+    async def follow(self):
+        """Yield every chunk, from the first; raises if synthesis failed."""
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.chunks) > sent or self.done)
+                pending = self.chunks[sent:]
+                finished = self.done
+            for chunk in pending:
+                yield chunk
+            sent += len(pending)
+            if finished and sent == len(self.chunks):
+                if self.error is not None:
+                    raise self.error
+                return
+
+    async def run(self, params):
+        try:
+            async with llm_gateway.speech_stream(
+                "text_to_speech", chunk_size=CHUNK_SIZE, **params
+            ) as chunks:
+                async for chunk in chunks:
+                    await self._publish(chunk)
+            await self._publish(done=True)
+            audio = b"".join(self.chunks)
+            _stats["bytes_synthesized"] += len(audio)
+            # Stays in _synthesizing until stored, so it is never missed.
+            await _store(self.key, audio)
+        except Exception as e:
+            await self._publish(error=e, done=True)
+        finally:
+            _synthesizing.pop(self.key, None)
+
+
+_synthesizing = {}
+
+
+async def stream(text: str, voice: str, model: str, instructions: str = None):
+    """Async iterator of the audio for `text`, in chunks as they are
+    synthesized (or read from the cache)."""
+    start = time.perf_counter()
+    key = cache_key(text, voice, model, instructions)
+    synthesis = _synthesizing.get(key)
+    if synthesis is None:
+        audio = await _cached(key)
+        if audio is not None:
+            _stats["hits"] += 1
+            _stats["bytes_from_cache"] += len(audio)
+            _stats["hit_seconds"] += time.perf_counter() - start
+            for offset in range(0, len(audio), CHUNK_SIZE):
+                yield audio[offset : offset + CHUNK_SIZE]
+            return
+        # Re-check: the cache read may have let another request start one.
+        synthesis = _synthesizing.get(key)
+
+    if synthesis is None:
+        _stats["misses"] += 1
+        params = {"model": model, "voice": voice, "input": text}
+        if instructions:
+            params["instructions"] = instructions
+        synthesis = Synthesis(key)
+        _synthesizing[key] = synthesis
+        synthesis.task = asyncio.create_task(synthesis.run(params))
+    else:
+        _stats["shared"] += 1
+
+    async for chunk in synthesis.follow():
+        yield chunk
+
+
+async def synthesize(text: str, voice: str, model: str, instructions: str = None) -> bytes:
+    """The whole audio for `text`."""
+    audio = bytearray()
+    async for chunk in stream(text, voice, model, instructions):
+        audio += chunk
+    return bytes(audio)
+
+
+def stats():
+    hits, misses = _stats["hits"], _stats["misses"]
+    return {
+        "backend": settings.SPEECH_CACHE_BACKEND,
+        "entries": backend.size() if backend is not None else 0,
+        "hits": hits,
+        "misses": misses,
+        # Requests that joined a synthesis already in flight
+        "shared": _stats["shared"],
+        "hit_ratio": hits / (hits + misses) if hits + misses else None,
+        "backend_errors": _stats["backend_errors"],
+        "bytes_from_cache": _stats["bytes_from_cache"],
+        "bytes_synthesized": _stats["bytes_synthesized"],
+        "avg_hit_ms": _stats["hit_seconds"] * 1000 / hits if hits else None,
+    }
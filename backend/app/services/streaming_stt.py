@@ -0,0 +1,205 @@
+"""Speech-to-text while the candidate is still speaking.
+
+The browser's recorder chunks are piped into ffmpeg as they arrive; ffmpeg
+decodes them to 16 kHz mono PCM, which is cut into segments at pauses. Each
+segment is sent to Whisper in the background as soon as it is cut, so when
+recording stops only the last few seconds are left to transcribe.
+
+A segment ends at the first pause of PAUSE_SECONDS once it is at least
+MIN_SEGMENT_SECONDS long (cutting in the middle of words hurts accuracy), or
+at MAX_SEGMENT_SECONDS regardless. Segments with almost no sound are
+skipped: Whisper makes up text for silence. Sound is anything above
+SILENCE_RMS, or above PEAK_RATIO of the loudest frame so far for a quiet
+microphone, so a quiet candidate is still heard.
+"""
+
+import asyncio
+import io
+import logging
+import wave
+
+import numpy as np
+
+from app.lib.errors import CustomException
+from app.services import llm_gateway
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# 16-bit mono
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+FRAME_BYTES = BYTES_PER_SECOND * 30 // 1000
+
+MIN_SEGMENT_SECONDS = 4
+MAX_SEGMENT_SECONDS = 20
+PAUSE_SECONDS = 0.5
+MIN_VOICED_SECONDS = 0.3
+SILENCE_RMS = 300
+# Speech is at most this far below the loudest frame (-20 dB).
+PEAK_RATIO = 0.1
+
+# Whisper's upload limit, as a bound on what one stream may send.
+MAX_INPUT_BYTES = 25 * 1024 * 1024
+
+
+def to_wav(pcm: bytes) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    buffer.seek(0)
+    buffer.name = "segment.wav"
+    return buffer
+
+
+class Segmenter:
+    """Cuts a PCM stream into segments at pauses."""
+
+    def __init__(self):
+        self.pending = b""
+        self.segment = bytearray()
+        # RMS of each frame in the segment
+        self.levels = []
+        self.silent_run = 0
+        # Loudest frame of the stream so far
+        self.peak = 0.0
+
+    def _threshold(self, peak):
+        # Digital silence (all zeros) stays silent.
+        return np.clip(peak * PEAK_RATIO, 1, SILENCE_RMS)
+
+    def feed(self, pcm: bytes):
+        """Segments completed by `pcm`."""
+        data = self.pending + pcm
+        usable = len(data) - len(data) % FRAME_BYTES
+        self.pending = data[usable:]
+        if not usable:
+            return []
+
+        frames = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32)
+        frames = frames.reshape(-1, FRAME_BYTES // 2)
+        rms = np.sqrt(np.mean(frames**2, axis=1))
+        peaks = np.maximum.accumulate(np.maximum(rms, self.peak))
+        loud = rms >= self._threshold(peaks)
+        self.peak = float(peaks[-1])
+
+        segments = []
+        for i, voiced in enumerate(loud):
+            self.segment += data[i * FRAME_BYTES : (i + 1) * FRAME_BYTES]
+            self.levels.append(rms[i])
+            self.silent_run = 0 if voiced else self.silent_run + 1
+            seconds = len(self.segment) / BYTES_PER_SECOND
+            paused = self.silent_run * FRAME_BYTES >= PAUSE_SECONDS * BYTES_PER_SECOND
+            if (seconds >= MIN_SEGMENT_SECONDS and paused) or seconds >= MAX_SEGMENT_SECONDS:
+                segments.append(self._cut())
+        return [segment for segment in segments if segment]
+
+    def flush(self):
+        self.segment += self.pending
+        self.pending = b""
+        return self._cut()
+
+    def _cut(self):
+        """The segment so far, or None when it is (nearly) silent."""
+        segment, levels = bytes(self.segment), np.asarray(self.levels)
+        self.segment = bytearray()
+        self.levels = []
+        self.silent_run = 0
+        # Judged against the loudest frame yet, which may have come after it.
+        voiced = np.count_nonzero(levels >= self._threshold(self.peak))
+        if voiced * FRAME_BYTES < MIN_VOICED_SECONDS * BYTES_PER_SECOND:
+            return None
+        return segment
+
+
+class StreamingTranscription:
+    """One recording: `feed()` it the encoded audio chunks, then `finish()`.
+
+    `on_segment(index, text)` is awaited as each segment's transcript comes
+    in, in completion order.
+    """
+
+    def __init__(self, on_segment=None):
+        self.on_segment = on_segment
+        self.segmenter = Segmenter()
+        self.tasks = []
+        self.received = 0
+        self.process = None
+        self.reader = None
+
+    async def start(self):
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-i",
+                "pipe:0",
+                "-f",
+                "s16le",
+                "-ac",
+                "1",
+                "-ar",
+                str(SAMPLE_RATE),
+                "pipe:1",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except FileNotFoundError:
+            raise CustomException("Streaming transcription is not available", code=503)
+        self.reader = asyncio.create_task(self._read())
+
+    async def feed(self, chunk: bytes):
+        self.received += len(chunk)
+        if self.received > MAX_INPUT_BYTES:
+            raise CustomException("Recording is too long", code=413)
+        self.process.stdin.write(chunk)
+        await self.process.stdin.drain()
+
+    async def _read(self):
+        while pcm := await self.process.stdout.read(BYTES_PER_SECOND // 4):
+            for segment in self.segmenter.feed(pcm):
+                self._transcribe(segment)
+        segment = self.segmenter.flush()
+        if segment:
+            self._transcribe(segment)
+
+    def _transcribe(self, segment):
+        index = len(self.tasks)
+
+        async def run():
+            result = await llm_gateway.transcribe(
+                "speech_to_text_stream", model="whisper-1", file=to_wav(segment), language="en"
+            )
+            text = (result.text or "").strip()
+            if self.on_segment is not None:
+                await self.on_segment(index, text)
+            return text
+
+        self.tasks.append(asyncio.create_task(run()))
+
+    async def finish(self) -> str:
+        """The whole transcript, once the last segment is in. Empty when
+        Whisper heard nothing, or nothing voiced was sent (see `segments`)."""
+        self.process.stdin.close()
+        await self.reader
+        await self.process.wait()
+        texts = await asyncio.gather(*self.tasks)
+        return " ".join(text for text in texts if text)
+
+    @property
+    def segments(self) -> int:
+        """Segments sent to Whisper so far."""
+        return len(self.tasks)
+
+    def abort(self):
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+        if self.reader is not None:
+            self.reader.cancel()
+        for task in self.tasks:
+            task.cancel()
@@ -0,0 +1,276 @@
+"""Load-test the candidate flow end to end against a running app.
+
+Each virtual candidate does what the frontend does: parse resume -> create
+interview -> analyze resume -> generate questions -> for each answered
+question, text-to-speech then speech-to-text then submit the answer ->
+generate feedback (enqueue the report and wait for its job to succeed).
+Run the app against benchmarks/fake_openai.py so no tokens are spent:
+
+    python -m benchmarks.fake_openai --port 8900 &
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 uvicorn app.main:app --port 8000 &
+    python -m benchmarks.candidate_flow --job-id 1 --candidates 50 --ramp 10
+
+--stream-stt answers through the /speech-to-text/stream websocket instead of
+uploading the recording (needs ffmpeg on the app's PATH and the websockets
+package). --job-id must be an existing AI-interviewed job. The feedback step uploads
+the PDF report to GCS; pass --no-feedback where GCS is not configured.
+
+Usage (from backend/):
+    python -m benchmarks.candidate_flow --job-id 1 [--candidates 20] [--answers 3]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+from fpdf import FPDF
+
+RESUME_LINES = [
+    "Load Tester - load.tester@example.com - Bengaluru",
+    "Software engineer, 5 years. Python, FastAPI, PostgreSQL, Redis.",
+    "Built a job search service handling 2k requests per second.",
+    "B.Tech in Computer Science.",
+]
+REPORT_POLL_SECONDS = 0.5
+
+
+def sample_resume() -> bytes:
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    for line in RESUME_LINES:
+        pdf.cell(0, 10, line, ln=1)
+    return pdf.output(dest="S").encode("latin-1")
+
+
+class Recorder:
+    def __init__(self):
+        self.timings = {}
+        self.errors = {}
+
+    async def step(self, name, request):
+        async def checked():
+            response = await request
+            response.raise_for_status()
+            return response
+
+        return await self.measure(name, checked())
+
+    async def measure(self, name, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        except Exception as e:
+            key = f"{name}: {getattr(getattr(e, 'response', None), 'status_code', type(e).__name__)}"
+            self.errors[key] = self.errors.get(key, 0) + 1
+            raise
+        finally:
+            self.timings.setdefault(name, []).append(time.perf_counter() - start)
+
+    def report(self, elapsed, completed, candidates):
+        print(f"{completed}/{candidates} candidates finished in {elapsed:.1f}s")
+        print(f"{'step':<22}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for name, values in self.timings.items():
+            values = sorted(values)
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            print(
+                f"{name:<22}{len(values):>6}{statistics.median(values) * 1000:>10.0f}"
+                f"{p95 * 1000:>10.0f}{values[-1] * 1000:>10.0f}"
+            )
+        for key, count in sorted(self.errors.items()):
+            print(f"error {key}: {count}")
+
+
+async def speak(client, recorder, text):
+    """The question's audio from the streaming endpoint; time to first byte
+    is what delays the candidate hearing it."""
+    start = time.perf_counter()
+    audio = bytearray()
+    async with client.stream("GET", "/api/v1/text-to-speech/stream", params={"text": text}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            if not audio:
+                recorder.timings.setdefault("text_to_speech_first_byte", []).append(
+                    time.perf_counter() - start
+                )
+            audio += chunk
+    return bytes(audio)
+
+
+async def stream_answer(args, recorder, token, audio):
+    """Speak `audio` into the streaming speech-to-text at real-time pace; only
+    the wait after the last chunk is timed, as that is what the candidate
+    sees."""
+    import websockets
+
+    url = args.url.replace("http", "ws", 1) + f"/api/v1/speech-to-text/stream?i_token={token}"
+    async with websockets.connect(url) as ws:
+        # 250 ms of the 16 kHz 16-bit mono WAV per message.
+        chunk = 8000
+        for start in range(0, len(audio), chunk):
+            await ws.send(audio[start : start + chunk])
+            await asyncio.sleep(0.25)
+
+        async def transcript():
+            await ws.send(json.dumps({"event": "stop"}))
+            async for message in ws:
+                message = json.loads(message)
+                if message["event"] == "transcript":
+                    return message["transcript"]
+                if message["event"] == "error":
+                    raise RuntimeError(message["detail"])
+            raise RuntimeError("closed without a transcript")
+
+        return await recorder.measure("speech_to_text_stream", transcript())
+
+
+async def generate_feedback(client, headers):
+    """Enqueue the report and poll its job until it is done, as the frontend
+    does; the report is only useful to the candidate once it succeeded."""
+    api = "/api/v1/interview/generate-feedback"
+    response = await client.put(api, headers=headers, json={})
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    while True:
+        response = await client.get(f"{api}/{job_id}", headers=headers)
+        response.raise_for_status()
+        job = response.json()
+        if job["status"] == "succeeded":
+            return job
+        if job["status"] == "failed":
+            raise RuntimeError(f"report job {job_id} failed: {job.get('error')}")
+        await asyncio.sleep(REPORT_POLL_SECONDS)
+
+
+async def candidate(client, recorder, args, resume, run_id, n):
+    api = "/api/v1"
+    parsed = (
+        await recorder.step(
+            "parse_resume",
+            client.post(
+                f"{api}/parse-resume",
+                files={"file": ("resume.pdf", resume, "application/pdf")},
+            ),
+        )
+    ).json()
+
+    skills = parsed.get("skills")
+    try:
+        work_experience = int(parsed.get("work_experience"))
+    except (TypeError, ValueError):
+        work_experience = None
+    response = await recorder.step(
+        "create_interview",
+        client.post(
+            f"{api}/interview",
+            json={
+                "firstname": parsed.get("firstname") or "Load",
+                "lastname": parsed.get("lastname") or "Tester",
+                "email": f"load-{run_id}-{n}@example.com",
+                "work_experience": work_experience,
+                "education": parsed.get("education"),
+                "skills": ", ".join(skills) if isinstance(skills, list) else skills,
+                "resume_text": parsed.get("resume_text"),
+                "ai_interviewed_job_id": args.job_id,
+            },
+        ),
+    )
+    headers = {"Authorization": response.headers["Authorization"]}
+
+    await recorder.step(
+        "analyze_resume", client.post(f"{api}/interview/analyze-resume", headers=headers)
+    )
+    questions = (
+        await recorder.step(
+            "generate_questions",
+            client.post(f"{api}/interview/generate-interview-questions", headers=headers),
+        )
+    ).json()
+
+    for question in questions[: args.answers]:
+        # Answer with the interviewer's own audio; only the round trip matters.
+        audio = await recorder.measure(
+            "text_to_speech", speak(client, recorder, question["question"])
+        )
+        if args.stream_stt:
+            transcript = await stream_answer(
+                args, recorder, headers["Authorization"].removeprefix("Bearer "), audio
+            )
+        else:
+            transcript = (
+                await recorder.step(
+                    "speech_to_text",
+                    client.post(
+                        f"{api}/speech-to-text",
+                        files={"audio_file": ("answer.wav", io.BytesIO(audio), "audio/wav")},
+                    ),
+                )
+            ).json()["transcript"]
+        await recorder.step(
+            "submit_answer",
+            client.put(
+                f"{api}/interview/interview-question/submit-text-response",
+                headers=headers,
+                json={"question_order": question["order_number"], "answer": transcript},
+            ),
+        )
+
+    if args.feedback:
+        await recorder.measure(
+            "generate_feedback",
+            asyncio.wait_for(generate_feedback(client, headers), args.timeout),
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--job-id", type=int, required=True)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which candidates start")
+    parser.add_argument("--answers", type=int, default=3, help="questions answered by voice")
+    parser.add_argument("--resume", help="PDF to upload (default: a generated one)")
+    parser.add_argument("--no-feedback", dest="feedback", action="store_false")
+    parser.add_argument(
+        "--stream-stt",
+        action="store_true",
+        help="answer through the speech-to-text websocket, speaking in real time",
+    )
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    if args.resume:
+        with open(args.resume, "rb") as f:
+            resume = f.read()
+    else:
+        resume = sample_resume()
+
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    completed = 0
+
+    async def start(client, n):
+        nonlocal completed
+        await asyncio.sleep(args.ramp * n / args.candidates)
+        try:
+            await candidate(client, recorder, args, resume, run_id, n)
+            completed += 1
+        except Exception:
+            pass
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        start_time = time.perf_counter()
+        await asyncio.gather(*(start(client, n) for n in range(args.candidates)))
+        elapsed = time.perf_counter() - start_time
+
+    recorder.report(elapsed, completed, args.candidates)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
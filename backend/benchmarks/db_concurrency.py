@@ -0,0 +1,64 @@
+"""Compare request throughput of the sync and async database sessions.
+
+Simulates N concurrent route handlers that each run a slow query
+(``SELECT pg_sleep(...)``) from inside the event loop, once through the
+blocking ``SessionLocal`` and once through ``AsyncSessionLocal``.
+
+Usage (from backend/):
+    python -m benchmarks.db_concurrency --requests 50 --sleep 0.1
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.database import AsyncSessionLocal, SessionLocal, async_engine, engine
+
+QUERY = text("SELECT pg_sleep(:seconds)")
+
+
+async def sync_handler(seconds: float):
+    # What an `async def` route did before: a blocking call on the event loop.
+    db = SessionLocal()
+    try:
+        db.execute(QUERY, {"seconds": seconds})
+    finally:
+        db.close()
+
+
+async def async_handler(seconds: float):
+    async with AsyncSessionLocal() as db:
+        await db.execute(QUERY, {"seconds": seconds})
+
+
+async def run(handler, requests: int, seconds: float) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(seconds) for _ in range(requests)))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--sleep", type=float, default=0.1)
+    args = parser.parse_args()
+
+    # Warm both pools so connection setup is not part of the measurement.
+    await run(sync_handler, 1, 0)
+    await run(async_handler, 1, 0)
+
+    for name, handler in (("sync", sync_handler), ("async", async_handler)):
+        elapsed = await run(handler, args.requests, args.sleep)
+        print(
+            f"{name:>5}: {args.requests} requests in {elapsed:.2f}s "
+            f"({args.requests / elapsed:.1f} req/s)"
+        )
+
+    engine.dispose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,306 @@
+"""OpenAI stand-in for load tests: no tokens spent, latency you choose.
+
+Implements the endpoints the app calls through app/configs/openai.py:
+chat completions (plain, JSON mode and streamed), audio transcriptions and
+audio speech. Point the app at it with
+
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1
+
+Answers are canned and shaped like what each prompt asks for (parsed
+resume, match score, question array, feedback report, plain text). With
+--responses, a JSONL file of recorded answers is tried first: each line is
+{"match": "<regex searched in the prompt>", "content": "<answer>"}.
+Synthesized speech is a tone broken by pauses, so answering with it
+exercises the silence detection of the streaming speech-to-text.
+Transcription of a WAV takes longer the longer the audio
+(--transcription-per-second).
+
+Latencies are distributions: "fixed:0.2", "uniform:0.2:1.5" or
+"lognormal:0.8:0.5" (median seconds, sigma). --error-rate makes that share
+of requests fail with --error-status (429 by default) to exercise retries.
+
+Usage (from backend/):
+    python -m benchmarks.fake_openai --port 8900 --chat-latency lognormal:1.5:0.4
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import random
+import re
+import struct
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Form, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def parse_latency(spec: str):
+    kind, *args = spec.split(":")
+    args = [float(a) for a in args]
+    if kind == "fixed":
+        return lambda: args[0]
+    if kind == "uniform":
+        return lambda: random.uniform(args[0], args[1])
+    if kind == "lognormal":
+        median, sigma = args
+        return lambda: random.lognormvariate(0, sigma) * median
+    raise argparse.ArgumentTypeError(f"Unknown latency distribution {spec!r}")
+
+
+def load_recorded(path):
+    recorded = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recorded.append((re.compile(entry["match"]), entry["content"]))
+    return recorded
+
+
+QUESTIONS = [
+    {"question": "Walk me through a project on your resume you are most proud of.", "type": "technical"},
+    {"question": "How would you design a rate limiter for a public API?", "type": "technical"},
+    {"question": "What happens when you type a URL into the browser?", "type": "technical"},
+    {"question": "How do you find and fix a slow database query?", "type": "technical"},
+    {"question": "Explain the difference between a process and a thread.", "type": "technical"},
+    {"question": "How would you test a function that depends on the current time?", "type": "technical"},
+    {"question": "Tell me about a disagreement with a teammate and how you resolved it.", "type": "behavioral"},
+    {"question": "How would you split a monolith that has grown too big to deploy safely?", "type": "problem_solving"},
+]
+
+PARSED_RESUME = {
+    "firstname": "Load",
+    "lastname": "Tester",
+    "email": "load.tester@example.com",
+    "phone": "9999999999",
+    "location": "Bengaluru",
+    "linkedin_url": "",
+    "portfolio_url": "",
+    "resume_text": "Software engineer with five years of Python, FastAPI and PostgreSQL.",
+    "work_experience": "5",
+    "education": "B.Tech",
+    "skills": ["Python", "FastAPI", "PostgreSQL"],
+}
+
+RESUME_MATCH = {
+    "resume_match_score": 64,
+    "resume_match_feedback": (
+        "Breakdown: Skills: 28/40, Experience: 20/30, Education: 8/10, "
+        "Achievements: 4/10, Other: 4/10. Overall, a reasonable match."
+    ),
+}
+
+FEEDBACK = {
+    "feedback_for_candidate": "Clear answers on backend topics; add concrete examples.",
+    "feedback_for_recruiter": "Solid fundamentals, light on system design depth.",
+    "score": 58,
+    "scoreBreakdown": {
+        "technicalSkills": 60,
+        "communication": 65,
+        "problemSolving": 50,
+        "culturalFit": 55,
+    },
+    "suggestions": ["Give an example for each claim", "Quantify the impact of your work"],
+    "keywords": [{"term": "python", "count": 3, "sentiment": "positive"}],
+}
+
+ANSWER_EVALUATION = {
+    "score": 62,
+    "scoreBreakdown": {
+        "technicalSkills": 65,
+        "communication": 70,
+        "problemSolving": 55,
+        "culturalFit": None,
+    },
+    "notes": "Named a sensible first step but gave no concrete example.",
+    "keywords": [{"term": "measurement", "count": 2, "sentiment": "positive"}],
+}
+
+TEXT = (
+    "- Build and maintain backend services\n"
+    "- Review code and mentor junior engineers\n"
+    "- Work with product to scope features"
+)
+
+TRANSCRIPT = (
+    "I would start by measuring where the time goes, then fix the biggest "
+    "cost first and check the result with the same measurement."
+)
+
+
+def canned_answer(prompt: str, params: dict) -> str:
+    if params.get("stream"):
+        return json.dumps(QUESTIONS)
+    if "resume_match_score" in prompt:
+        return json.dumps(RESUME_MATCH)
+    if "feedback_for_candidate" in prompt:
+        return json.dumps(FEEDBACK)
+    if '"notes"' in prompt:
+        return json.dumps(ANSWER_EVALUATION)
+    if '"firstname"' in prompt:
+        return json.dumps(PARSED_RESUME)
+    if (params.get("response_format") or {}).get("type") == "json_object":
+        return "{}"
+    return TEXT
+
+
+def speech_wav(seconds: float, rate: int = 16000) -> bytes:
+    """A WAV that sounds enough like speech for silence detection: 0.3s
+    "words" (a 220 Hz tone) with short gaps, and a 0.7s pause every 12 words."""
+    word, gap, pause = int(0.3 * rate), int(0.08 * rate), int(0.7 * rate)
+    tone = struct.pack(
+        f"<{word}h", *(int(8000 * math.sin(2 * math.pi * 220 * i / rate)) for i in range(word))
+    )
+    samples = bytearray()
+    words = 0
+    while len(samples) < seconds * rate * 2:
+        samples += tone
+        words += 1
+        samples += bytes((pause if words % 12 == 0 else gap) * 2)
+    header = b"RIFF" + struct.pack("<I", 36 + len(samples)) + b"WAVEfmt "
+    header += struct.pack("<IHHIIHH", 16, 1, 1, rate, rate * 2, 2, 16)
+    return header + b"data" + struct.pack("<I", len(samples)) + bytes(samples)
+
+
+def wav_seconds(data: bytes) -> float:
+    """Duration of a PCM WAV upload; 0 for anything else."""
+    if data[:4] != b"RIFF" or len(data) < 44:
+        return 0.0
+    byte_rate = struct.unpack("<I", data[28:32])[0]
+    return (len(data) - 44) / byte_rate if byte_rate else 0.0
+
+
+def create_app(args) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    recorded = load_recorded(args.responses) if args.responses else []
+    counts = {}
+
+    async def admit(name, latency):
+        counts[name] = counts.get(name, 0) + 1
+        await asyncio.sleep(latency())
+        if random.random() < args.error_rate:
+            return JSONResponse(
+                status_code=args.error_status,
+                content={"error": {"message": "Injected failure", "type": "fake_error"}},
+                headers={"retry-after": "1"} if args.error_status == 429 else None,
+            )
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        params = await request.json()
+        prompt = "\n".join(str(m.get("content") or "") for m in params["messages"])
+        error = await admit("chat", args.chat_latency)
+        if error is not None:
+            return error
+
+        content = next((c for p, c in recorded if p.search(prompt)), None)
+        if content is None:
+            content = canned_answer(prompt, params)
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4,
+        }
+        base = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "created": int(time.time()),
+            "model": params["model"],
+        }
+
+        if not params.get("stream"):
+            return {
+                **base,
+                "object": "chat.completion",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+
+        include_usage = (params.get("stream_options") or {}).get("include_usage")
+
+        async def events():
+            def event(choices, usage=None):
+                chunk = {**base, "object": "chat.completion.chunk", "choices": choices}
+                if include_usage:
+                    chunk["usage"] = usage
+                return f"data: {json.dumps(chunk)}\n\n"
+
+            # Roughly one token (4 characters) per chunk.
+            for i in range(0, len(content), 4):
+                await asyncio.sleep(args.token_delay)
+                yield event([{"index": 0, "delta": {"content": content[i : i + 4]}}])
+            yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if include_usage:
+                yield event([], usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(file: UploadFile, model: str = Form(...)):
+        audio = await file.read()
+        # Whisper takes longer for longer audio.
+        await asyncio.sleep(wav_seconds(audio) * args.transcription_per_second)
+        error = await admit("transcriptions", args.transcription_latency)
+        if error is not None:
+            return error
+        return {"text": TRANSCRIPT}
+
+    @app.post("/v1/audio/speech")
+    async def speech(request: Request):
+        params = await request.json()
+        error = await admit("speech", args.speech_latency)
+        if error is not None:
+            return error
+        # About 15 characters of speech per second.
+        audio = speech_wav(max(len(params["input"]) / 15, 0.5))
+
+        async def body():
+            buffer = io.BytesIO(audio)
+            while chunk := buffer.read(8192):
+                yield chunk
+                await asyncio.sleep(args.token_delay)
+
+        return StreamingResponse(body(), media_type="audio/wav")
+
+    @app.get("/stats")
+    async def stats():
+        return counts
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--chat-latency", type=parse_latency, default="lognormal:1.0:0.4")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds per streamed chunk")
+    parser.add_argument("--transcription-latency", type=parse_latency, default="lognormal:0.8:0.3")
+    parser.add_argument(
+        "--transcription-per-second",
+        type=float,
+        default=0.05,
+        help="extra transcription seconds per second of WAV audio",
+    )
+    parser.add_argument("--speech-latency", type=parse_latency, default="lognormal:0.6:0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--responses", help="JSONL file of recorded answers")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Latency of the country/state/city autocomplete: in-memory index vs ILIKE.
+
+Replays typed-prefix keywords ("d", "de", "del", ...) against both paths on
+the same database and prints per-lookup percentiles.
+
+Usage (from backend/, against a database with the geo tables loaded):
+    python -m benchmarks.geo_lookup --words delhi york san --runs 20
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import select
+
+from app import database
+from app.models import City, Country
+from app.services import geo_index
+
+
+def ilike_lookup(db, keyword):
+    stmt = (
+        select(City.id, City.name, Country.currency)
+        .join(Country)
+        .where(City.name.ilike(f"%{keyword}%"))
+        .order_by(City.name)
+        .limit(geo_index.LIMIT)
+    )
+    return db.execute(stmt).mappings().all()
+
+
+def time_lookups(lookup, keywords, runs):
+    samples = []
+    for _ in range(runs):
+        for keyword in keywords:
+            start = time.perf_counter()
+            lookup(keyword)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"{name:>6}: median {statistics.median(samples) * 1000:.3f} ms, "
+        f"p99 {p99 * 1000:.3f} ms over {len(samples)} lookups"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", nargs="+", default=["delhi", "york", "san", "mum"])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    keywords = [word[:i] for word in args.words for i in range(1, len(word) + 1)]
+    db = database.SessionLocal()
+    try:
+        start = time.perf_counter()
+        index = geo_index.load(db)
+        print(f"index load: {(time.perf_counter() - start) * 1000:.0f} ms, {index.stats()}")
+
+        report("index", time_lookups(index.search_cities, keywords, args.runs))
+        report("ilike", time_lookups(lambda k: ilike_lookup(db, k), keywords, args.runs))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
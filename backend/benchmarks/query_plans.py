@@ -0,0 +1,153 @@
+"""Query-plan regression check for the hot lookups.
+
+Builds the schema from the models in a throwaway Postgres schema, seeds it
+with enough rows for the planner to prefer indexes, runs EXPLAIN on each hot
+query and exits non-zero if any of them falls back to a sequential scan on
+the table it is meant to hit through an index.
+
+Point it at a database you can create schemas in (never production):
+    EXPLAIN_DATABASE_URL=postgresql://... python -m benchmarks.query_plans
+"""
+
+import os
+import sys
+
+from sqlalchemy import create_engine, desc, select, text
+
+from app import models
+from app.database import Base
+from app.job_seeker import search as job_search
+
+SCHEMA = "query_plan_check"
+
+SEED = [
+    "INSERT INTO companies (id, name, email, password_hash) VALUES (1, 'Acme', 'acme@example.com', 'x')",
+    """INSERT INTO ai_interviewed_jobs (id, company_id, title, status)
+       SELECT g, 1, 'Job ' || g, 'active' FROM generate_series(1, 200) g""",
+    """INSERT INTO interviews (id, firstname, lastname, email, ai_interviewed_job_id, status, created_at)
+       SELECT g, 'F', 'L', 'c' || g || '@example.com', 1 + g % 200,
+              CASE WHEN g % 3 = 0 THEN 'completed' ELSE 'incomplete' END,
+              now() - (g || ' minutes')::interval
+       FROM generate_series(1, 50000) g""",
+    """INSERT INTO interview_question_and_responses (interview_id, order_number, question)
+       SELECT i, o, 'Question' FROM generate_series(1, 20000) i, generate_series(1, 5) o""",
+    """INSERT INTO quiz_questions (id, description, ai_interviewed_job_id)
+       SELECT g, 'Question', 1 + g % 200 FROM generate_series(1, 10000) g""",
+    """INSERT INTO quiz_options (label, correct, quiz_question_id)
+       SELECT 'Option', o = 1, q FROM generate_series(1, 10000) q, generate_series(1, 4) o""",
+    "INSERT INTO dsa_questions (id, title) VALUES (1, 'Two sum')",
+    """INSERT INTO dsa_test_cases (id, dsa_question_id)
+       SELECT g, 1 FROM generate_series(1, 10) g""",
+    """INSERT INTO dsa_responses (id, interview_id, dsa_question_id)
+       SELECT g, g, 1 FROM generate_series(1, 5000) g""",
+    """INSERT INTO dsa_test_case_responses (dsa_response_id, dsa_test_case_id, task_id, status)
+       SELECT r, t, md5(r || '-' || t), 'pending'
+       FROM generate_series(1, 5000) r, generate_series(1, 10) t""",
+    """INSERT INTO jobs (company_id, job_title, min_work_experience, max_work_experience,
+                         min_salary_per_month, max_salary_per_month)
+       SELECT 1, 'Job ' || g, g % 30, g % 30 + 3, 10000 + g % 500 * 1000, 20000 + g % 500 * 1000
+       FROM generate_series(1, 30000) g""",
+]
+
+# (description, statement, table that must not be sequentially scanned)
+HOT_QUERIES = [
+    (
+        "DSA execution callback by task id",
+        select(models.DSATestCaseResponse).where(
+            models.DSATestCaseResponse.task_id == "not-a-real-task"
+        ),
+        "dsa_test_case_responses",
+    ),
+    (
+        "Recruiter interview list for a job",
+        select(models.Interview)
+        .where(
+            models.Interview.ai_interviewed_job_id == 7,
+            models.Interview.status == "completed",
+        )
+        .order_by(desc(models.Interview.created_at))
+        .limit(20),
+        "interviews",
+    ),
+    (
+        "Quiz options for a question",
+        select(models.QuizOption).where(models.QuizOption.quiz_question_id == 42),
+        "quiz_options",
+    ),
+    (
+        "Interview questions and answers",
+        select(models.InterviewQuestionAndResponse).where(
+            models.InterviewQuestionAndResponse.interview_id == 42
+        ),
+        "interview_question_and_responses",
+    ),
+    (
+        "Jobs above a salary floor",
+        select(models.Job).where(models.Job.min_salary_per_month >= 505000),
+        "jobs",
+    ),
+    (
+        "Jobs requiring little experience",
+        select(models.Job).where(models.Job.max_work_experience <= 3),
+        "jobs",
+    ),
+    (
+        "Job search",
+        select(models.Job).where(job_search.matches("Job 12345")),
+        "jobs",
+    ),
+]
+
+
+def seq_scanned_tables(plan):
+    tables = set()
+    if plan.get("Node Type") == "Seq Scan":
+        tables.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        tables |= seq_scanned_tables(child)
+    return tables
+
+
+def main():
+    url = os.getenv("EXPLAIN_DATABASE_URL")
+    if not url:
+        sys.exit("EXPLAIN_DATABASE_URL is not set")
+
+    engine = create_engine(url, connect_args={"options": f"-c search_path={SCHEMA}"})
+    failures = 0
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.commit()
+        try:
+            Base.metadata.create_all(bind=conn)
+            for statement in SEED:
+                conn.execute(text(statement))
+            conn.commit()
+            for table in Base.metadata.sorted_tables:
+                conn.execute(text(f"ANALYZE {table.name}"))
+
+            for description, stmt, table in HOT_QUERIES:
+                compiled = stmt.compile(
+                    dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+                )
+                plan = conn.execute(
+                    text(f"EXPLAIN (FORMAT JSON) {compiled}")
+                ).scalar()[0]["Plan"]
+                if table in seq_scanned_tables(plan):
+                    failures += 1
+                    print(f"FAIL {description}: sequential scan on {table}")
+                else:
+                    print(f"ok   {description}: {plan['Node Type']}")
+        finally:
+            conn.rollback()
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.commit()
+
+    engine.dispose()
+    if failures:
+        sys.exit(f"{failures} hot quer{'y' if failures == 1 else 'ies'} regressed to a sequential scan")
+
+
+if __name__ == "__main__":
+    main()
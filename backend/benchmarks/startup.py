@@ -0,0 +1,89 @@
+"""Measure cold-start cost: import time of app.main and time-to-first-request.
+
+Each run uses a fresh interpreter so module caches do not hide the cost.
+
+Usage (from backend/):
+    python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+IMPORT_SNIPPET = (
+    "import time; s = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - s)"
+)
+
+
+def measure_import():
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_request(timeout: float):
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--log-level", "warning",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError("server exited before answering")
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/api/v1", timeout=1)
+                if response.status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(name, samples):
+    print(
+        f"{name:>18}: median {statistics.median(samples) * 1000:.0f} ms, "
+        f"min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    report("import app.main", [measure_import() for _ in range(args.runs)])
+    report(
+        "first request",
+        [measure_first_request(args.timeout) for _ in range(args.runs)],
+    )
+
+
+if __name__ == "__main__":
+    main()
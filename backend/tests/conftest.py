@@ -0,0 +1,61 @@
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+# app.database builds its engines at import; tests that need a database use
+# TEST_DATABASE_URL through the fixtures below instead.
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://localhost/unused")
+
+from app import models  # noqa: E402
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+needs_postgres = pytest.mark.skipif(not TEST_DATABASE_URL, reason="needs TEST_DATABASE_URL")
+
+TABLES = [
+    models.Company.__table__,
+    models.AiInterviewedJob.__table__,
+    models.Interview.__table__,
+    models.CompanyDailyStats.__table__,
+    models.ReportJob.__table__,
+]
+
+
+class ScratchSchema:
+    """A schema of its own in TEST_DATABASE_URL holding TABLES."""
+
+    def __init__(self, name):
+        self.name = name
+        self.engine = create_engine(
+            TEST_DATABASE_URL, connect_args={"options": f"-c search_path={name}"}
+        )
+
+    def async_engine(self):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        return create_async_engine(
+            make_url(TEST_DATABASE_URL).set(drivername="postgresql+asyncpg"),
+            connect_args={"server_settings": {"search_path": self.name}},
+        )
+
+
+@pytest.fixture(scope="module")
+def schema():
+    name = f"test_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as connection:
+        connection.execute(text(f"CREATE SCHEMA {name}"))
+    schema = ScratchSchema(name)
+    with schema.engine.begin() as connection:
+        for table in TABLES:
+            table.create(connection)
+    try:
+        yield schema
+    finally:
+        schema.engine.dispose()
+        with admin.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA {name} CASCADE"))
+        admin.dispose()
@@ -0,0 +1,144 @@
+"""The company_daily_stats rollup (app/services/company_stats.py) against a
+real Postgres: after any sequence of changes it must equal a rebuild from
+`interviews`.
+
+Needs TEST_DATABASE_URL (see conftest.py). Run from backend/ with
+`python -m pytest tests`.
+"""
+
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services import company_stats
+from conftest import needs_postgres
+
+pytestmark = needs_postgres
+
+TODAY = datetime.datetime(2026, 3, 10, 12, 0)
+YESTERDAY = TODAY - datetime.timedelta(days=1)
+
+
+@pytest.fixture
+def db(schema):
+    with Session(schema.engine) as db:
+        db.add_all([models.Company(id=c, name=f"C{c}", email=f"{c}@x", password_hash="x") for c in (1, 2)])
+        db.add_all(
+            [
+                models.AiInterviewedJob(id=10, company_id=1, title="A"),
+                models.AiInterviewedJob(id=11, company_id=1, title="B"),
+                models.AiInterviewedJob(id=20, company_id=2, title="C"),
+            ]
+        )
+        db.flush()
+        yield db
+        db.rollback()
+
+
+def _create(db, job_id, created_at):
+    interview = models.Interview(
+        firstname="f", lastname="l", email=f"{uuid.uuid4().hex}@x",
+        ai_interviewed_job_id=job_id, created_at=created_at,
+    )
+    db.add(interview)
+    db.flush()
+    db.execute(company_stats.interview_created(interview.id))
+    return interview.id
+
+
+def _change(db, interview_id, **values):
+    stmt = company_stats.interview_changed(interview_id, values)
+    if stmt is not None:
+        db.execute(stmt)
+    db.execute(update(models.Interview).where(models.Interview.id == interview_id).values(values))
+
+
+def _complete(db, interview_id, score):
+    db.execute(company_stats.interview_completed(interview_id, score))
+    db.execute(
+        update(models.Interview)
+        .where(models.Interview.id == interview_id)
+        .values(status="completed", overall_score=score)
+    )
+
+
+def _rollup(db):
+    stats = models.CompanyDailyStats
+    rows = db.execute(
+        select(stats.company_id, stats.day, *[getattr(stats, name) for name in company_stats.COUNTERS])
+    ).all()
+    return {(row[0], row[1]): tuple(row[2:]) for row in rows if any(row[2:])}
+
+
+def _assert_matches_rebuild(db):
+    incremental = _rollup(db)
+    for stmt in company_stats.rebuild():
+        db.execute(stmt)
+    assert incremental == _rollup(db)
+    return incremental
+
+
+def test_created_and_deleted(db):
+    first = _create(db, 10, TODAY)
+    _create(db, 11, TODAY)
+    _create(db, 20, YESTERDAY)
+    assert _rollup(db) == {
+        (1, TODAY.date()): (2, 0, 0, 0),
+        (2, YESTERDAY.date()): (1, 0, 0, 0),
+    }
+
+    db.execute(company_stats.interview_deleted(first))
+    db.execute(delete(models.Interview).where(models.Interview.id == first))
+    assert _assert_matches_rebuild(db) == {
+        (1, TODAY.date()): (1, 0, 0, 0),
+        (2, YESTERDAY.date()): (1, 0, 0, 0),
+    }
+
+
+def test_completed_and_rescored(db):
+    interview = _create(db, 10, TODAY)
+    unscored = _create(db, 10, TODAY)
+    _complete(db, interview, 60)
+    _complete(db, unscored, None)
+    assert _rollup(db) == {(1, TODAY.date()): (2, 2, 60, 1)}
+
+    _complete(db, interview, 80)
+    assert _assert_matches_rebuild(db) == {(1, TODAY.date()): (2, 2, 80, 1)}
+
+
+def test_changed(db):
+    interview = _create(db, 10, TODAY)
+    other = _create(db, 10, TODAY)
+    _complete(db, interview, 70)
+    _complete(db, other, 50)
+
+    # An admin score edit, then the status moving away from "completed" and back.
+    _change(db, interview, overall_score=90)
+    assert _rollup(db) == {(1, TODAY.date()): (2, 2, 140, 2)}
+    _change(db, interview, status="Quiz Completed")
+    assert _rollup(db) == {(1, TODAY.date()): (2, 1, 50, 1)}
+    _change(db, interview, status="completed", overall_score=None)
+    assert _assert_matches_rebuild(db) == {(1, TODAY.date()): (2, 2, 50, 1)}
+
+    # Moving to another company's job moves the whole contribution.
+    _change(db, other, ai_interviewed_job_id=20)
+    assert _assert_matches_rebuild(db) == {
+        (1, TODAY.date()): (1, 1, 0, 0),
+        (2, TODAY.date()): (1, 1, 50, 1),
+    }
+
+    assert company_stats.interview_changed(interview, {"feedback": "x"}) is None
+
+
+def test_job_deleted(db):
+    for created_at in (TODAY, TODAY, YESTERDAY):
+        _complete(db, _create(db, 10, created_at), 40)
+    _create(db, 11, TODAY)
+
+    db.execute(company_stats.job_deleted(10))
+    db.execute(delete(models.Interview).where(models.Interview.ai_interviewed_job_id == 10))
+    assert _assert_matches_rebuild(db) == {(1, TODAY.date()): (1, 0, 0, 0)}
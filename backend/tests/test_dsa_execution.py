@@ -0,0 +1,112 @@
+"""The local DSA executor (app/interview/dsa_execution.py) end to end, minus
+the database: compile and run real submissions through the process pool.
+
+Run from backend/ with `python -m pytest tests`; needs gcc.
+"""
+
+import asyncio
+import base64
+import os
+import shutil
+import tempfile
+import threading
+
+import pytest
+
+# app.database builds its engines at import; nothing here connects.
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://localhost/unused")
+
+from app.interview import dsa_execution  # noqa: E402
+
+C_SUM = """
+#include <stdio.h>
+int main() {
+    long a, b;
+    scanf("%ld %ld", &a, &b);
+    printf("%ld\\n", a + b);
+}
+"""
+
+TEST_CASES = [
+    {"input": "1 2\n", "expected_output": "3\n"},
+    {"input": "5 7\n", "expected_output": "12\n"},
+    {"input": "100 1\n", "expected_output": "101\n"},
+]
+
+
+# Root ignores RLIMIT_NPROC; run programs as an unprivileged user then.
+SANDBOX_USER = "nobody" if os.geteuid() == 0 else None
+
+FORK_BOMB = """
+#include <stdio.h>
+#include <unistd.h>
+int main() {
+    int forked = 0;
+    for (int i = 0; i < 1000; i++) {
+        int pid = fork();
+        if (pid == 0) { sleep(10); _exit(0); }
+        if (pid > 0) forked++;
+    }
+    printf("%d\\n", forked);
+}
+"""
+
+
+def _payloads(language, code, test_cases=TEST_CASES, user=None):
+    executor = dsa_execution.LocalExecutor(workers=2, user=user)
+    workdir = tempfile.mkdtemp(prefix="dsa-test-")
+    task_ids = [str(i) for i in range(len(test_cases))]
+
+    async def results():
+        return [
+            payload
+            async for payload in executor._results(workdir, language, code, test_cases, task_ids)
+        ]
+
+    try:
+        return asyncio.run(results())
+    finally:
+        executor.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _statuses(language, code, test_cases=TEST_CASES):
+    return sorted(payload["runResult"]["runStatus"] for payload in _payloads(language, code, test_cases))
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_c_compiles_and_runs_while_the_app_holds_many_threads():
+    # RLIMIT_NPROC counts all of the user's threads; the app's own (and every
+    # other worker's) must not leave the compiler unable to fork.
+    release = threading.Event()
+    threads = [threading.Thread(target=release.wait) for _ in range(dsa_execution.MAX_PROCESSES * 3)]
+    for thread in threads:
+        thread.start()
+    try:
+        assert _statuses("C", C_SUM) == ["successful"] * len(TEST_CASES)
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_c_failures_are_graded():
+    assert _statuses("C", "int main() { oops }") == ["compilation-error"] * len(TEST_CASES)
+    assert _statuses("C", "int main() { for (;;); }", TEST_CASES[:1]) == ["time-limit-exceeded"]
+    wrong = C_SUM.replace("a + b", "a - b")
+    assert _statuses("C", wrong) == ["wrong-answer"] * len(TEST_CASES)
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="needs gcc")
+def test_fork_bomb_is_capped():
+    test_case = {"input": "", "expected_output": ""}
+    [payload] = _payloads("C", FORK_BOMB, [test_case], user=SANDBOX_USER)
+    stdout = payload["runResult"]["programRunData"]["stdoutBase64UrlEncoded"]
+    forked = int(base64.urlsafe_b64decode(stdout + "=" * (-len(stdout) % 4)))
+    if SANDBOX_USER:
+        # The program itself is one of MAX_PROCESSES.
+        assert 0 < forked < dsa_execution.MAX_PROCESSES
+    else:
+        # On top of a snapshot of the app user's tasks, which drifts a little.
+        assert 0 < forked < 2 * dsa_execution.MAX_PROCESSES
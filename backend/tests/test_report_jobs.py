@@ -0,0 +1,167 @@
+"""Report jobs (app/interview/report_jobs.py) on the lease queue against a
+real Postgres: a job whose worker died is taken over where it stopped, and
+a failing stage is retried later without redoing the ones before it.
+
+Needs TEST_DATABASE_URL (see conftest.py). Run from backend/ with
+`python -m pytest tests`.
+"""
+
+import asyncio
+import datetime
+
+import pytest
+from sqlalchemy import delete, func, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app import database, models
+from app.interview import report_jobs
+from app.services import gcs
+from conftest import needs_postgres
+
+pytestmark = needs_postgres
+
+ANALYSIS = {
+    "feedback_for_candidate": "Good answers.",
+    "feedback_for_recruiter": "Solid candidate.",
+    "score": 72,
+    "scoreBreakdown": {"technicalSkills": 80, "communication": 70, "problemSolving": 65, "culturalFit": 60},
+    "suggestions": ["Practice system design."],
+    "keywords": ["python"],
+}
+
+
+@pytest.fixture
+def db(schema):
+    with Session(schema.engine) as db:
+        db.add(models.Company(id=1, name="C", email="c@x", password_hash="x"))
+        db.add(models.AiInterviewedJob(id=1, company_id=1, title="Backend engineer"))
+        db.add(models.Interview(id=1, firstname="Ada", lastname="L", email="ada@x", ai_interviewed_job_id=1))
+        db.commit()
+        yield db
+        db.rollback()
+        for model in (models.ReportJob, models.CompanyDailyStats, models.Interview, models.AiInterviewedJob, models.Company):
+            db.execute(delete(model))
+        db.commit()
+
+
+class Uploads:
+    """Stands in for GCS; the first `failures` uploads raise."""
+
+    def __init__(self):
+        self.files = []
+        self.failures = 0
+
+    def upload(self, bucket, name, file, content_type=None):
+        self.files.append(file.read())
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("GCS unavailable")
+        return f"https://storage.example/{name}"
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    uploads = Uploads()
+    monkeypatch.setattr(gcs, "upload_file_to_gcs", uploads.upload)
+
+    async def analyze(*args):
+        raise AssertionError("the analysis is already stored on the job")
+
+    monkeypatch.setattr(report_jobs, "_analyze", analyze)
+    return uploads
+
+
+def _work(schema, *steps):
+    """Run `steps` (coroutine functions taking the queue) against the scratch
+    schema, as the queue's worker would."""
+
+    async def main():
+        engine = schema.async_engine()
+        original = database.AsyncSessionLocal
+        database.AsyncSessionLocal = async_sessionmaker(
+            bind=engine, autoflush=False, expire_on_commit=False
+        )
+        try:
+            return [await step(report_jobs.queue) for step in steps]
+        finally:
+            database.AsyncSessionLocal = original
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def _claim_and_run(queue):
+    job = await queue._claim()
+    if job is not None:
+        await queue._run(job)
+    return job
+
+
+def _job_at_render(db, locked_until):
+    job = models.ReportJob(
+        interview_id=1,
+        status="running",
+        stage="render",
+        payload={},
+        analysis=ANALYSIS,
+        locked_until=locked_until,
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_expired_lease_resumes_at_render(schema, db, uploads):
+    now = db.scalar(func.now()).replace(tzinfo=None)
+    job = _job_at_render(db, now + datetime.timedelta(minutes=5))
+
+    # Another worker still holds the lease.
+    assert _work(schema, _claim_and_run) == [None]
+
+    db.execute(
+        update(models.ReportJob)
+        .where(models.ReportJob.id == job.id)
+        .values(locked_until=now - datetime.timedelta(seconds=1))
+    )
+    db.commit()
+    [claimed] = _work(schema, _claim_and_run)
+    assert claimed.id == job.id
+
+    db.expire_all()
+    job = db.get(models.ReportJob, job.id)
+    assert (job.status, job.stage, job.attempts) == ("succeeded", "done", 0)
+    assert job.result["score"] == 72
+    assert len(uploads.files) == 1 and uploads.files[0].startswith(b"%PDF")
+
+    interview = db.get(models.Interview, 1)
+    assert interview.status == "completed"
+    assert interview.overall_score == 72
+    assert interview.report_file_url == job.report_file_url
+    stats = db.query(models.CompanyDailyStats).one()
+    assert (stats.interviews_completed, stats.completed_score_sum) == (1, 72)
+
+
+def test_failed_stage_is_retried_with_backoff(schema, db, uploads):
+    uploads.failures = 1
+    job = _job_at_render(db, None)
+
+    _work(schema, _claim_and_run)
+    db.expire_all()
+    job = db.get(models.ReportJob, job.id)
+    assert (job.status, job.stage, job.attempts) == ("queued", "render", 1)
+    assert "GCS unavailable" in job.error
+    assert job.locked_until is None
+    assert job.run_after > db.scalar(func.now()).replace(tzinfo=None)
+
+    # Not due yet; then due.
+    assert _work(schema, _claim_and_run) == [None]
+    db.execute(
+        update(models.ReportJob).where(models.ReportJob.id == job.id).values(run_after=func.now())
+    )
+    db.commit()
+    _work(schema, _claim_and_run)
+    db.expire_all()
+    job = db.get(models.ReportJob, job.id)
+    assert (job.status, job.stage, job.attempts) == ("succeeded", "done", 0)
+    assert len(uploads.files) == 2
@@ -26,6 +26,7 @@ export function useInterviewResponseProcessor() {
     | {
         question: string;
         type: string;
+        audio_url?: string;
       }[]
     | null
   > => {
@@ -172,7 +172,7 @@ export default function VideoInterview({ onComplete }: { onComplete?: () => void
     Array<{ role: string; content: string }>
   >([]);
   const [interviewFlow, setInterviewFlow] = useState<
-    Array<{ type: string; question: string }>
+    Array<{ type: string; question: string; audio_url?: string }>
   >([]);
   const [speech, setSpeech] = useState("");
   const currentAudioRef = useRef<HTMLAudioElement | null>(null);
@@ -221,6 +221,9 @@ export default function VideoInterview({ onComplete }: { onComplete?: () => void
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
   const recordedChunksRef = useRef<Blob[]>([]);
   const audioChunksRef = useRef<Blob[]>([]);
+  const transcriptionStreamRef = useRef<ReturnType<
+    typeof interviewApi.streamSpeechToText
+  > | null>(null);
   const recordingTimerRef = useRef<NodeJS.Timeout | null>(null);
   const streamRef = useRef<MediaStream | null>(null);
   const audioStreamRef = useRef<MediaStream | null>(null);
@@ -310,11 +313,13 @@ export default function VideoInterview({ onComplete }: { onComplete?: () => void
       // Start text-to-speech conversion
       const text_to_speech = async () => {
         try {
-          const response = await interviewApi.textToSpeech(currentQuestion);
+          // Pre-synthesized when the questions were generated; otherwise
+          // streamed, so playback starts with the first chunk of audio.
+          const audioUrl =
+            interviewFlow.find((q) => q.question === currentQuestion)
+              ?.audio_url || interviewApi.textToSpeechUrl(currentQuestion);
           // Create and prepare audio element before setting speech state
-          const newAudio = new Audio(
-            "data:audio/mpeg;base64," + response.data.audio_base64
-          );
+          const newAudio = new Audio(audioUrl);
 
           // Add event listeners for audio playback
           newAudio.onplay = () => {
@@ -339,7 +344,7 @@ export default function VideoInterview({ onComplete }: { onComplete?: () => void
           });
 
           // Set speech state after audio is prepared
-          setSpeech(response.data.audio_base64);
+          setSpeech(audioUrl);
         } catch (error) {
           console.error("Error in text-to-speech:", error);
           setIsAiTyping(false);
@@ -351,7 +356,7 @@ export default function VideoInterview({ onComplete }: { onComplete?: () => void
 
   useEffect(() => {
     if (speech && !currentAudioRef.current) {
-      const newAudio = new Audio("data:audio/mpeg;base64," + speech);
+      const newAudio = new Audio(speech);
       newAudio.onplay = () => {
         setIsAiSpeaking(true);
         setIsAiTyping(false);
@@ -524,8 +529,10 @@ export default function VideoInterview({ onComplete }: { onComplete?: () => void
     audioChunksRef.current = [];
     recordingStartTimeRef.current = performance.now();
 
-    // Start recording with 1-second chunks
-    audioRecorderRef.current.start(1000);
+    // Transcription starts while the candidate speaks; short chunks keep
+    // the part left to send after they stop small.
+    transcriptionStreamRef.current = interviewApi.streamSpeechToText();
+    audioRecorderRef.current.start(250);
     setIsRecording(true);
     setRecordingTime(0);
 
@@ -554,15 +561,27 @@ export default function VideoInterview({ onComplete }: { onComplete?: () => void
     }
   };
 
-  const transcribeAudio = async (audioBlob: Blob): Promise<string | null> => {
+  const transcribeAudio = async (
+    audioBlob: Blob,
+    stream: ReturnType<typeof interviewApi.streamSpeechToText> | null
+  ): Promise<string | null> => {
     try {
       setIsProcessingResponse(true);
       const startTime = performance.now();
 
       if (audioBlob.size < 1000) {
+        stream?.close();
         return null;
       }
 
+      if (stream) {
+        try {
+          return await stream.stop();
+        } catch (error) {
+          // Upload the recording instead.
+        }
+      }
+
       try {
         // Create a File object from the audio blob
         const audioFile = new File([audioBlob], "audio.webm", {
@@ -769,11 +788,33 @@ export default function VideoInterview({ onComplete }: { onComplete?: () => void
     }
   };
 
+  const refreshAudioUrls = async () => {
+    try {
+      const { data } = await interviewApi.generateQuestions();
+      const urls = new Map<string, string>(
+        data.map((q: { question: string; audio_url?: string }) => [
+          q.question,
+          q.audio_url,
+        ])
+      );
+      setInterviewFlow((flow) =>
+        flow.map((q) => ({ ...q, audio_url: q.audio_url || urls.get(q.question) }))
+      );
+    } catch (error) {
+      console.error("Error refreshing question audio:", error);
+    }
+  };
+
   const handleNextQuestion = () => {
     if (currentQuestionIndex < interviewFlow.length - 1) {
       const nextIndex = currentQuestionIndex + 1;
       setCurrentQuestionIndex(nextIndex);
       const nextQuestion = interviewFlow[nextIndex].question;
+      if (interviewFlow.slice(nextIndex + 1).some((q) => !q.audio_url)) {
+        // Question audio is synthesized in the background; pick up the
+        // URLs that are ready now for the questions still to come.
+        refreshAudioUrls();
+      }
       setCurrentQuestion(nextQuestion);
       addAssistantMessage(nextQuestion);
       setConversationHistory((prev) => [
@@ -921,6 +962,7 @@ export default function VideoInterview({ onComplete }: { onComplete?: () => void
       audioRecorder.ondataavailable = (e) => {
         if (e.data.size > 0) {
           audioChunksRef.current.push(e.data);
+          transcriptionStreamRef.current?.send(e.data);
         }
       };
 
@@ -928,12 +970,16 @@ export default function VideoInterview({ onComplete }: { onComplete?: () => void
         const audioBlob = new Blob(audioChunksRef.current, {
           type: "audio/webm",
         });
+        const stream = transcriptionStreamRef.current;
+        transcriptionStreamRef.current = null;
 
         if (audioBlob.size > 0) {
-          const transcript = await transcribeAudio(audioBlob);
+          const transcript = await transcribeAudio(audioBlob, stream);
           if (transcript) {
             handleResponseRecorded(transcript);
           }
+        } else {
+          stream?.close();
         }
       };
 
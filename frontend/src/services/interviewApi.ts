@@ -102,6 +102,10 @@ export const interviewApi = {
     return res;
   },
 
+  // Audio streamed while it is synthesized; use as an <audio> src.
+  textToSpeechUrl: (text: string) =>
+    `${config.API_BASE_URL}/text-to-speech/stream?${new URLSearchParams({ text })}`,
+
   speechToText: async (file: File) => {
     const formData = new FormData();
     formData.append("audio_file", file);
@@ -120,6 +124,46 @@ export const interviewApi = {
     return res;
   },
 
+  // Transcribes the answer while it is being recorded: send() each recorder
+  // chunk, then stop() resolves with the transcript. stop() rejects when the
+  // stream failed; fall back to speechToText with the whole recording then.
+  streamSpeechToText: () => {
+    const url = new URL(
+      `${config.API_BASE_URL}/speech-to-text/stream`,
+      window.location.href
+    );
+    url.protocol = url.protocol === "https:" ? "wss:" : "ws:";
+    url.searchParams.set("i_token", localStorage.getItem("i_token") || "");
+    const socket = new WebSocket(url);
+    const queued: (Blob | string)[] = [];
+
+    const transcript = new Promise<string>((resolve, reject) => {
+      socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.event === "transcript") resolve(message.transcript);
+        if (message.event === "error") reject(new Error(message.detail));
+      };
+      socket.onerror = () => reject(new Error("Transcription stream failed"));
+      socket.onclose = () => reject(new Error("Transcription stream closed"));
+    });
+    // Rejections are handled by whoever calls stop().
+    transcript.catch(() => {});
+    socket.onopen = () => queued.splice(0).forEach((data) => socket.send(data));
+
+    const send = (data: Blob | string) => {
+      if (socket.readyState === WebSocket.OPEN) socket.send(data);
+      else if (socket.readyState === WebSocket.CONNECTING) queued.push(data);
+    };
+    return {
+      send: (chunk: Blob) => send(chunk),
+      stop: () => {
+        send(JSON.stringify({ event: "stop" }));
+        return transcript;
+      },
+      close: () => socket.close(),
+    };
+  },
+
   submitTextResponse: async (question_order: number, answer: string) => {
     const iToken = localStorage.getItem("i_token");
     const res = await axios.put(
@@ -151,7 +195,24 @@ export const interviewApi = {
         },
       }
     );
-    return res.data;
+
+    // The report is built in the background; poll until it is done.
+    let job = res.data;
+    let delay = 1000;
+    const deadline = Date.now() + 5 * 60 * 1000;
+    while (job.status !== "succeeded") {
+      if (job.status === "failed" || Date.now() > deadline) {
+        throw new Error(job.error || "Feedback generation timed out");
+      }
+      await new Promise((resolve) => setTimeout(resolve, delay));
+      delay = Math.min(delay * 1.5, 5000);
+      const poll = await axios.get(
+        `${config.API_BASE_URL}/interview/generate-feedback/${job.job_id}`,
+        { headers: { Authorization: `Bearer ${iToken}` } }
+      );
+      job = poll.data;
+    }
+    return job.result;
   },
 
   generateQuestions: async () => {
@@ -3,6 +3,7 @@ export interface InterviewQuestion {
   question?: string;
   question_type?: "technical" | "behavioral" | "problem_solving" | "custom";
   order_number?: number;
+  audio_url?: string;
 }
 
 export interface TestCase {